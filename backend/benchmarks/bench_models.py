@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da camada de modelos Pydantic
+
+Compara o estilo v1 que o server.py usava (@validator, min_items, Model(**doc)
+por documento e .dict()) com a versão v2 nativa atual (field_validator
+compartilhado, model_validate, TypeAdapter compilado e model_dump).
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_models.py [--items 1000] [--repeat 20]
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+import uuid
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bench_serialization import build_documents  # noqa: E402
+from pydantic import BaseModel, EmailStr, Field  # noqa: E402
+
+from server import PortfolioItem, PortfolioItemListAdapter, UserCreate  # noqa: E402
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from pydantic import validator
+
+    class LegacyUserCreate(BaseModel):
+        email: EmailStr
+        password: str
+        full_name: str
+        role: str = Field(default="user", pattern="^(admin|user)$")
+
+        @validator('password')
+        def validate_password(cls, v):
+            if len(v) < 8:
+                raise ValueError('A senha deve ter pelo menos 8 caracteres')
+            if not re.search(r'[A-Z]', v):
+                raise ValueError('A senha deve conter pelo menos uma letra maiúscula')
+            if not re.search(r'[a-z]', v):
+                raise ValueError('A senha deve conter pelo menos uma letra minúscula')
+            if not re.search(r'\d', v):
+                raise ValueError('A senha deve conter pelo menos um número')
+            return v
+
+    class LegacyPortfolioItem(BaseModel):
+        id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+        title: str
+        category: str
+        image: str
+        metric: str
+        description: str
+        technologies: List[str] = Field(..., min_items=1)
+        results: Dict[str, str]
+        challenge: str
+        solution: str
+        outcome: str
+        created_at: datetime = Field(default_factory=datetime.utcnow)
+        updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+USER_PAYLOAD = {
+    "email": "lead@vertextarget.com",
+    "password": "SenhaForte123",
+    "full_name": "Cliente de Teste",
+    "role": "user",
+}
+
+
+def measure(func, repeat):
+    func()  # aquecimento
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = build_documents(args.items)
+    payloads = [dict(USER_PAYLOAD) for _ in range(args.items)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        scenarios = [
+            (
+                f"UserCreate x{args.items}",
+                lambda: [LegacyUserCreate(**p) for p in payloads],
+                lambda: [UserCreate.model_validate(p) for p in payloads],
+            ),
+            (
+                f"lista PortfolioItem ({args.items})",
+                lambda: [LegacyPortfolioItem(**d) for d in documents],
+                lambda: PortfolioItemListAdapter.validate_python(documents),
+            ),
+            (
+                f"dump PortfolioItem ({args.items})",
+                lambda: [item.dict() for item in legacy_items],
+                lambda: [item.model_dump() for item in current_items],
+            ),
+        ]
+        legacy_items = [LegacyPortfolioItem(**d) for d in documents]
+        current_items = [PortfolioItem.model_validate(d) for d in documents]
+
+        print(f"\n📊 Camada de modelos ({args.repeat} repetições, mediana em ms)")
+        print("=" * 72)
+        print(f"{'cenário':<32}{'estilo v1':>12}{'v2 nativo':>12}{'speedup':>10}")
+        for name, legacy, current in scenarios:
+            legacy_ms = measure(legacy, args.repeat)
+            current_ms = measure(current, args.repeat)
+            print(f"{name:<32}{legacy_ms:>12.2f}{current_ms:>12.2f}{legacy_ms / current_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark do caminho de serialização das listas da API
+
+Compara, para uma lista de 1000 itens do portfólio vindos do MongoDB:
+  - caminho atual: PortfolioItem(**item) por documento + serialize_response
+    do FastAPI (revalidação contra o response_model) + JSONResponse
+  - caminho atual com ORJSONResponse no lugar do json da stdlib
+  - caminho rápido: TypeAdapter(List[PortfolioItem]) valida uma vez e
+    dump_json gera os bytes (FAST_JSON_RESPONSES=true)
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_serialization.py [--items 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bson import ObjectId  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+import server  # noqa: E402
+from server import PortfolioItem, PortfolioItemListAdapter, fast_list_response  # noqa: E402
+
+
+def build_documents(count: int) -> List[dict]:
+    """Gera documentos no formato em que o Motor os devolve (incluindo _id)"""
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "title": f"Projeto {i}",
+            "category": ["E-commerce", "FinTech", "HealthTech"][i % 3],
+            "image": f"https://placehold.co/600x400?text=Projeto+{i}",
+            "metric": f"+{100 + i}% conversão",
+            "description": "Plataforma digital com foco em performance e experiência do usuário. " * 3,
+            "technologies": ["React", "FastAPI", "MongoDB", "Gemini"],
+            "results": {"conversion": f"+{i}%", "revenue": "R$ 2.4M", "users": "50K+"},
+            "challenge": "Desafio detalhado do cliente com contexto de mercado. " * 5,
+            "solution": "Solução completa com automação e integrações sob medida. " * 5,
+            "outcome": "Resultados mensuráveis ao longo de seis meses de operação. " * 5,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+        }
+        for i in range(count)
+    ]
+
+
+async def current_path(documents, field, response_class):
+    content = [PortfolioItem(**item) for item in documents]
+    serialized = await serialize_response(field=field, response_content=content)
+    return response_class(serialized).body
+
+
+async def fast_path(documents):
+    return fast_list_response(PortfolioItemListAdapter, documents).body
+
+
+async def measure(name, factory, repeat):
+    await factory()  # aquecimento
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await factory()
+        timings.append((time.perf_counter() - start) * 1000)
+    return name, statistics.median(timings), min(timings), len(body)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = build_documents(args.items)
+    field = create_response_field(name="Response_get_portfolio_items", type_=List[PortfolioItem])
+
+    results = [
+        await measure("atual (json stdlib)", lambda: current_path(documents, field, JSONResponse), args.repeat),
+    ]
+    if server.ORJSON_AVAILABLE:
+        results.append(
+            await measure("atual (ORJSONResponse)", lambda: current_path(documents, field, ORJSONResponse), args.repeat)
+        )
+    results.append(await measure("rápido (TypeAdapter.dump_json)", lambda: fast_path(documents), args.repeat))
+
+    baseline = results[0][1]
+    print(f"\n📊 Serialização de {args.items} itens do portfólio ({args.repeat} repetições)")
+    print("=" * 72)
+    print(f"{'caminho':<34}{'mediana (ms)':>14}{'mínimo (ms)':>13}{'speedup':>10}")
+    for name, median, best, size in results:
+        print(f"{name:<34}{median:>14.2f}{best:>13.2f}{baseline / median:>9.1f}x")
+    print(f"\nTamanho do corpo: {results[-1][3] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
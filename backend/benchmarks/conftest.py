@@ -0,0 +1,45 @@
+"""
+Configuração da suíte de microbenchmarks (pytest-benchmark)
+
+Os resultados são salvos em benchmarks/results/<máquina>/ a cada execução
+(--benchmark-autosave). Para comparar com a última execução salva e falhar
+em caso de regressão, antes do deploy:
+
+    cd backend
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:20%
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BENCHMARKS_DIR.parent))
+
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+
+def pytest_configure(config):
+    # Resultados sempre na mesma pasta, independente do diretório de onde o pytest foi chamado
+    if getattr(config.option, "benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BENCHMARKS_DIR / 'results'}"
+        config.option.benchmark_autosave = True
+
+
+def drive(coroutine):
+    """
+    Executa até o fim uma corrotina que não suspende (ex.: cache sem MongoDB),
+    sem o custo de um event loop, que dominaria a medição.
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("a corrotina suspendeu; use um event loop")
+
+
+@pytest.fixture
+def run():
+    return drive
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Orçamento de inicialização do backend (cold start)
+
+Mede, sempre em processos Python novos:
+  - tempo de importação do módulo server
+  - tempo até a primeira resposta: do spawn do uvicorn até o primeiro
+    200 em GET /api/ (inclui importação, startup e o ping ao MongoDB)
+
+Termina com código 1 se a mediana de qualquer uma das medidas passar do
+orçamento, para poder rodar em CI antes do deploy no Render. Com --top N
+lista os módulos mais lentos de importar (python -X importtime).
+
+O startup faz ping no MongoDB: rode com um banco acessível ou o ping vai
+esperar MONGO_SERVER_SELECTION_TIMEOUT_MS (30s no default do driver).
+
+Uso (a partir da pasta backend):
+    python benchmarks/startup_budget.py [--repeat 5] [--import-budget-ms 1500]
+                                        [--first-response-budget-ms 3000] [--top 10]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import server; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    """Segundos para importar server em um interpretador novo"""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> List[Tuple[int, str]]:
+    """Módulos com maior tempo cumulativo de importação (microssegundos)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # Só módulos de primeiro nível de aninhamento, para não repetir a mesma árvore
+        if module.startswith("   ") and not module.startswith("    "):
+            entries.append((int(cumulative), module.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+
+def measure_first_response(timeout: float) -> float:
+    """Segundos entre o spawn do uvicorn e o primeiro 200 em GET /api/"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn terminou com código {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.01)
+        raise TimeoutError(f"Sem resposta de {url} em {timeout:.0f}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def check(label: str, samples: List[float], budget_ms: float) -> bool:
+    median_ms = statistics.median(samples) * 1000
+    ok = median_ms <= budget_ms
+    print(
+        f"{'✅' if ok else '❌'} {label:<22} mediana {median_ms:8.1f} ms   "
+        f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms   "
+        f"(orçamento {budget_ms:.0f} ms)"
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o cold start do backend e compara com um orçamento")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float,
+                        default=float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--first-response-budget-ms", type=float,
+                        default=float(os.environ.get("STARTUP_FIRST_RESPONSE_BUDGET_MS", "3000")))
+    parser.add_argument("--timeout", type=float, default=60.0, help="Tempo máximo de espera pela primeira resposta (s)")
+    parser.add_argument("--top", type=int, default=0, help="Lista os N módulos mais lentos de importar")
+    args = parser.parse_args()
+
+    import_samples = [measure_import() for _ in range(args.repeat)]
+    response_samples = [measure_first_response(args.timeout) for _ in range(args.repeat)]
+
+    print(f"Cold start do backend ({args.repeat} execuções)\n")
+    ok = check("importação do server", import_samples, args.import_budget_ms)
+    ok = check("primeira resposta", response_samples, args.first_response_budget_ms) and ok
+
+    if args.top:
+        print(f"\nMódulos mais lentos de importar:")
+        for cumulative, module in slowest_imports(args.top):
+            print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
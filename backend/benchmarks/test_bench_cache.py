@@ -0,0 +1,76 @@
+"""
+Microbenchmarks do AIStrategyCache em memória (sem MongoDB)
+
+get, set e get_stats com 10, 1k e 100k entradas: todos chamam
+_cleanup_expired, que percorre o cache inteiro, então o custo cresce com o
+tamanho do cache.
+"""
+
+from datetime import datetime
+from itertools import count
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from server import AIStrategyCache, CacheEntry  # noqa: E402
+
+SIZES = [10, 1_000, 100_000]
+
+
+def filled_cache(size: int) -> AIStrategyCache:
+    cache = AIStrategyCache(ttl_hours=24)
+    now = datetime.utcnow()
+    for i in range(size):
+        key = cache._generate_cache_key(f"Setor {i}", f"Objetivo {i}")
+        cache.cache[key] = CacheEntry(strategy=f"Estratégia {i} " * 40, timestamp=now)
+    return cache
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}_entries")
+def cache(request):
+    return filled_cache(request.param)
+
+
+@pytest.mark.benchmark(group="ai_cache.get")
+def test_get_hit(benchmark, cache, run):
+    size = len(cache.cache)
+    sequence = count()
+
+    def get_hit():
+        i = next(sequence) % size
+        return run(cache.get(f"Setor {i}", f"Objetivo {i}"))
+
+    assert benchmark(get_hit) is not None
+
+
+@pytest.mark.benchmark(group="ai_cache.get")
+def test_get_miss(benchmark, cache, run):
+    assert benchmark(lambda: run(cache.get("Setor inexistente", "Objetivo inexistente"))) is None
+
+
+@pytest.mark.benchmark(group="ai_cache.set")
+def test_set_overwrite(benchmark, cache, run):
+    # Sobrescreve chaves existentes para o tamanho do cache não mudar durante a medição
+    size = len(cache.cache)
+    sequence = count()
+
+    def set_existing():
+        i = next(sequence) % size
+        run(cache.set(f"Setor {i}", f"Objetivo {i}", "Nova estratégia " * 40))
+
+    benchmark(set_existing)
+    assert len(cache.cache) == size
+
+
+@pytest.mark.benchmark(group="ai_cache.get_stats")
+def test_get_stats(benchmark, cache):
+    stats = benchmark(cache.get_stats)
+    assert stats.total_entries == len(cache.cache)
+
+
+@pytest.mark.benchmark(group="ai_cache.key")
+def test_generate_cache_key(benchmark):
+    cache = AIStrategyCache()
+    key = benchmark(cache._generate_cache_key, "  E-commerce ", "Aumentar as vendas online em 30% ")
+    assert len(key) == 32
@@ -0,0 +1,38 @@
+"""
+Microbenchmarks da construção de listas de PortfolioItem a partir de
+documentos do MongoDB: um modelo por documento (como as rotas fazem) e o
+TypeAdapter compilado (FAST_JSON_RESPONSES)
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from bench_serialization import build_documents  # noqa: E402
+from server import PortfolioItem, PortfolioItemListAdapter  # noqa: E402
+
+SIZES = [10, 1_000]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}_items")
+def documents(request):
+    return build_documents(request.param)
+
+
+@pytest.mark.benchmark(group="models.portfolio_list")
+def test_portfolio_items_per_document(benchmark, documents):
+    items = benchmark(lambda: [PortfolioItem(**document) for document in documents])
+    assert len(items) == len(documents)
+
+
+@pytest.mark.benchmark(group="models.portfolio_list")
+def test_portfolio_items_type_adapter(benchmark, documents):
+    items = benchmark(PortfolioItemListAdapter.validate_python, documents)
+    assert len(items) == len(documents)
+
+
+@pytest.mark.benchmark(group="models.portfolio_list")
+def test_portfolio_items_dump(benchmark, documents):
+    items = PortfolioItemListAdapter.validate_python(documents)
+    body = benchmark(PortfolioItemListAdapter.dump_json, items)
+    assert body.startswith(b"[")
@@ -0,0 +1,229 @@
+# backend/cache_invalidation.py
+"""
+Invalidação dos caches em memória entre workers via change streams
+
+Cada worker (processo) tem seus próprios caches: respostas públicas do
+portfólio e dos depoimentos e o cache de usuários do get_current_user. Os
+handlers de escrita invalidam o cache do próprio worker, mas os demais só
+ficariam sabendo da mudança quando a entrada expirasse.
+
+O ChangeStreamInvalidator abre um change stream no banco (um por worker,
+filtrado pelas coleções observadas) e repassa cada evento aos handlers
+registrados, que invalidam os caches locais. Escritas feitas fora da API
+(seed.py, update_admin_role.py, mongosh) também chegam por aqui.
+
+Change streams exigem replica set (um nó único local basta). Num mongod
+standalone o invalidador fica em modo TTL: `active` é False e os caches
+usam um TTL curto, de modo que a defasagem entre workers fica limitada a
+esse TTL. Se o stream cair depois de aberto, o invalidador volta ao modo
+TTL, tenta reabrir com backoff e retoma do último resume token (ou, sem
+ele, invalida tudo, pois eventos podem ter se perdido).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Códigos de erro de servidor que indicam "change streams indisponíveis"
+CHANGE_STREAM_UNSUPPORTED_CODES = {
+    40573,  # The $changeStream stage is only supported on replica sets
+    40324,  # Unrecognized pipeline stage name: '$changeStream' (versões antigas)
+}
+
+# handler(coleção, operationType, documentKey)
+ChangeHandler = Callable[[str, str, Dict[str, Any]], None]
+
+
+class UserCache:
+    """
+    Cache em memória dos documentos de usuário lidos por get_current_user.
+
+    Indexado pelo campo id (o "sub" do JWT); também guarda o _id de cada
+    documento, pois os eventos de update/delete do change stream trazem só o
+    documentKey (_id).
+
+    Como o evento pode trazer um _id ainda não mapeado (usuário sendo lido
+    naquele momento), toda invalidação avança a geração: quem leu o banco
+    antes dela passa a geração lida ao store() e o documento não é guardado.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: Dict[str, tuple] = {}  # id -> (documento, criado_em)
+        self.ids_by_object_id: Dict[Any, str] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(user_id)
+        if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds:
+            self._drop(user_id)
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def store(self, document: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """Guarda o documento, exceto se houve invalidação desde a leitura (generation)"""
+        if self.ttl_seconds <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        if len(self.entries) >= self.max_entries:
+            # Descarta a entrada mais antiga (ordem de inserção do dict)
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+        self.entries[document["id"]] = (document, time.monotonic())
+        if "_id" in document:
+            self.ids_by_object_id[document["_id"]] = document["id"]
+
+    def _drop(self, user_id: str) -> None:
+        entry = self.entries.pop(user_id, None)
+        if entry is not None and "_id" in entry[0]:
+            self.ids_by_object_id.pop(entry[0]["_id"], None)
+
+    def invalidate(self, user_id: Optional[str] = None, object_id: Any = None) -> None:
+        """Remove um usuário (por id ou _id) ou, sem argumentos, todos"""
+        self.generation += 1
+        if user_id is None and object_id is None:
+            self.entries.clear()
+            self.ids_by_object_id.clear()
+            return
+        if user_id is None:
+            user_id = self.ids_by_object_id.get(object_id)
+        if user_id is not None:
+            self._drop(user_id)
+
+
+class ChangeStreamInvalidator:
+    """Observa as coleções via change stream e chama os handlers a cada escrita"""
+
+    def __init__(
+        self,
+        collections: Iterable[str],
+        retry_initial_seconds: float = 1.0,
+        retry_max_seconds: float = 60.0,
+    ):
+        self.collections = list(collections)
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.handlers: List[ChangeHandler] = []
+        self.mode_listeners: List[Callable[[bool], None]] = []
+        self.active = False
+        self.supported: Optional[bool] = None
+        self.events = 0
+        self.resume_token = None
+        self._task: Optional[asyncio.Task] = None
+        self._opened: Optional[asyncio.Event] = None
+
+    def add_handler(self, handler: ChangeHandler) -> None:
+        self.handlers.append(handler)
+
+    def on_mode_change(self, listener: Callable[[bool], None]) -> None:
+        """listener(active) é chamado ao entrar e ao sair do modo change stream"""
+        self.mode_listeners.append(listener)
+
+    def _set_active(self, active: bool) -> None:
+        if active == self.active:
+            return
+        self.active = active
+        for listener in self.mode_listeners:
+            listener(active)
+
+    async def start(self, db, open_timeout_seconds: float = 5.0) -> bool:
+        """
+        Inicia o watcher e espera a primeira tentativa de abertura. Retorna
+        True se o change stream está ativo; False se o servidor não suporta
+        (modo TTL permanente) ou se a abertura ainda não terminou.
+        """
+        self._opened = asyncio.Event()
+        self._task = asyncio.create_task(self._run(db), name="change-stream-invalidator")
+        try:
+            await asyncio.wait_for(self._opened.wait(), open_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Change stream não abriu a tempo - caches seguem com TTL curto por enquanto")
+        return self.active
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._set_active(False)
+
+    def _dispatch(self, change: Dict[str, Any]) -> None:
+        self.events += 1
+        self.resume_token = change.get("_id")
+        collection = change.get("ns", {}).get("coll", "")
+        operation = change.get("operationType", "")
+        document_key = change.get("documentKey") or {}
+        for handler in self.handlers:
+            try:
+                handler(collection, operation, document_key)
+            except Exception as e:
+                logger.error(f"Erro no handler de invalidação ({collection}/{operation}): {e}")
+
+    def _invalidate_all(self) -> None:
+        # Eventos podem ter sido perdidos: trata como escrita em todas as coleções
+        for collection in self.collections:
+            for handler in self.handlers:
+                handler(collection, "invalidate", {})
+
+    async def _run(self, db) -> None:
+        pipeline = [{"$match": {"ns.coll": {"$in": self.collections}}}]
+        delay = self.retry_initial_seconds
+        while True:
+            try:
+                async with db.watch(pipeline, resume_after=self.resume_token) as stream:
+                    if self.resume_token is None and self.supported:
+                        # Reabertura sem resume token: o que mudou no intervalo é desconhecido
+                        self._invalidate_all()
+                    self.supported = True
+                    self._set_active(True)
+                    self._opened.set()
+                    logger.info(f"Change stream ativo para {', '.join(self.collections)} - caches com TTL longo")
+                    delay = self.retry_initial_seconds
+                    async for change in stream:
+                        self._dispatch(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    self.supported = False
+                    self._opened.set()
+                    logger.info(f"Change streams indisponíveis (sem replica set) - caches entre workers usam TTL curto: {e}")
+                    return
+                if e.code == 286:  # ChangeStreamHistoryLost: resume token fora do oplog
+                    self.resume_token = None
+                self._lost(e)
+            except PyMongoError as e:
+                self._lost(e)
+            else:
+                self._lost("stream encerrado pelo servidor")
+            self._opened.set()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max_seconds)
+
+    def _lost(self, reason) -> None:
+        if self.active:
+            logger.warning(f"Change stream interrompido - caches voltam ao TTL curto até reabrir: {reason}")
+        self._set_active(False)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "supported": self.supported,
+            "collections": self.collections,
+            "events": self.events,
+        }
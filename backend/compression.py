@@ -0,0 +1,311 @@
+# backend/compression.py
+"""
+Compressão de respostas HTTP (gzip e brotli)
+
+- CompressionMiddleware: middleware ASGI que comprime respostas acima de um
+  tamanho mínimo e apenas para os content-types permitidos
+- PrecompressedResponseCache: cache de respostas públicas (ex.: lista do
+  portfólio) que guarda o corpo já comprimido em cada codificação, para que
+  não seja recomprimido a cada requisição
+"""
+
+import gzip
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:  # brotli é opcional; sem ele apenas gzip é oferecido
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MINIMUM_SIZE = 500
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/javascript",
+)
+
+
+def _parse_accept_encoding(header_value: str) -> Dict[str, float]:
+    """Converte 'br;q=1.0, gzip;q=0.8, *;q=0' em {'br': 1.0, 'gzip': 0.8, '*': 0.0}"""
+    accepted = {}
+    for part in header_value.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    Escolhe a melhor codificação suportada pelo cliente entre as disponíveis
+    (na ordem de preferência do servidor). Retorna None para identidade.
+    """
+    if not accept_encoding:
+        return None
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def server_encodings() -> List[str]:
+    """Codificações oferecidas pelo servidor, em ordem de preferência"""
+    return ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas com brotli ou gzip conforme o Accept-Encoding.
+
+    Respostas são ignoradas (enviadas como estão) quando:
+    - o content-type não está na lista permitida (ex.: imagens, event-stream)
+    - o corpo é menor que minimum_size
+    - já possuem Content-Encoding (ex.: vindas do PrecompressedResponseCache)
+    - são transmitidas em vários pedaços (streaming)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        content_types: Iterable[str] = DEFAULT_CONTENT_TYPES,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"), server_encodings())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                if "content-encoding" in headers or content_type not in self.content_types:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message  # aguarda o corpo para decidir
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+@dataclass
+class CachedBody:
+    """Corpo de uma resposta em identidade e em cada codificação suportada"""
+    variants: Dict[str, bytes]
+    media_type: str
+    etag: str
+    created_at: float = field(default_factory=time.monotonic)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag forte de uma variante: cada codificação tem bytes diferentes, então tag própria"""
+        if not encoding or encoding == "identity":
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """If-None-Match com a tag de qualquer variante (ou *) valida a entrada"""
+        if if_none_match.strip() == "*":
+            return True
+        tags = {self.etag_for(encoding) for encoding in self.variants}
+        return any(tag.strip().removeprefix("W/") in tags for tag in if_none_match.split(","))
+
+
+class PrecompressedResponseCache:
+    """
+    Cache em memória de respostas públicas já serializadas e comprimidas.
+
+    A compressão acontece uma única vez, no momento do store(); as leituras
+    apenas escolhem a variante adequada ao Accept-Encoding do cliente.
+    As entradas expiram após ttl_seconds e são invalidadas pelos handlers de
+    escrita através de invalidate(prefix). O número de entradas é limitado
+    (max_entries, LRU) porque as chaves dependem de filtros da requisição.
+
+    Para não guardar dados antigos, o handler lê a geração antes de consultar
+    o banco e a passa ao store(): se houve invalidação no meio, a resposta é
+    servida mas não entra no cache.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        max_entries: int = 256,
+        gzip_level: int = 9,
+        brotli_quality: int = 5,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.minimum_size = minimum_size
+        self.max_entries = max_entries
+        self.gzip_level = gzip_level
+        # Qualidade moderada: a 11 o brotli leva dezenas de ms por lista, no event loop
+        self.brotli_quality = brotli_quality
+        self.entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(path: str, **params: Union[None, str, Sequence[str]]) -> str:
+        """
+        Chave com o caminho e apenas os filtros declarados pelo endpoint
+        (normalizados: listas sem repetição e ordenadas); parâmetros
+        desconhecidos na URL não criam entradas novas
+        """
+        parts = []
+        for name, value in sorted(params.items()):
+            if value is None or value == [] or value == "":
+                continue
+            values = sorted(set(value)) if isinstance(value, (list, tuple, set)) else [value]
+            parts.extend(f"{name}={item}" for item in values)
+        return f"{path}?{'&'.join(parts)}"
+
+    def _is_expired(self, entry: CachedBody) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        entry = self.entries.get(key)
+        if entry is not None and self._is_expired(entry):
+            del self.entries[key]
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def store(
+        self,
+        key: str,
+        body: bytes,
+        media_type: str = "application/json",
+        generation: Optional[int] = None,
+    ) -> CachedBody:
+        """
+        Comprime e guarda o corpo. Com generation (lida antes da consulta ao
+        banco), não guarda se houve invalidação desde então; a entrada é
+        devolvida de qualquer forma para responder à requisição atual.
+        """
+        variants = {"identity": body}
+        if len(body) >= self.minimum_size:
+            for encoding in server_encodings():
+                variants[encoding] = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        entry = CachedBody(
+            variants=variants,
+            media_type=media_type,
+            etag=f'"{hashlib.md5(body).hexdigest()}"',
+        )
+        if generation is not None and generation != self.generation:
+            return entry
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Remove as entradas cuja chave começa com prefix (todas, se vazio)"""
+        self.generation += 1
+        keys = [key for key in self.entries if key.startswith(prefix)]
+        for key in keys:
+            del self.entries[key]
+        if keys:
+            logger.info(f"Cache de respostas invalidado para '{prefix or '*'}' - {len(keys)} entradas")
+        return len(keys)
+
+    def respond(self, request: Request, entry: CachedBody) -> Response:
+        """Monta a resposta com a variante que o cliente aceita (304 se o ETag coincide)"""
+        encoding = choose_encoding(
+            request.headers.get("accept-encoding"),
+            [enc for enc in server_encodings() if enc in entry.variants],
+        )
+        headers = {"ETag": entry.etag_for(encoding), "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=entry.variants[encoding or "identity"],
+            media_type=entry.media_type,
+            headers=headers,
+        )
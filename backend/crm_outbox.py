@@ -0,0 +1,259 @@
+# backend/crm_outbox.py
+"""
+Outbox transacional para sincronização de leads com o CRM
+
+Cada contato é gravado já com o marcador `crm_sync` (status 'pending') no
+mesmo documento, portanto de forma atômica com a captura do lead. Um
+dispatcher em background envia os leads pendentes em lotes para o endpoint
+HTTP do CRM, usando um cliente httpx com pool de conexões, chaves de
+idempotência e retentativas com backoff exponencial.
+
+Estados de crm_sync.status:
+    pending   -> aguardando envio (ou nova tentativa em next_attempt_at)
+    in_flight -> reivindicado por um dispatcher (lease até locked_until)
+    synced    -> aceito pelo CRM
+    failed    -> rejeitado definitivamente (4xx) ou tentativas esgotadas
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SYNC_PENDING = "pending"
+SYNC_IN_FLIGHT = "in_flight"
+SYNC_SYNCED = "synced"
+SYNC_FAILED = "failed"
+
+# Campos do lead enviados ao CRM
+LEAD_FIELDS = ("id", "name", "email", "company", "phone", "message", "service_interest", "created_at")
+
+
+def new_outbox_marker(idempotency_key: str) -> Dict[str, Any]:
+    """Marcador gravado junto com o contato para que o dispatcher o sincronize"""
+    return {
+        "status": SYNC_PENDING,
+        "idempotency_key": idempotency_key,
+        "attempts": 0,
+        "next_attempt_at": datetime.utcnow(),
+        "locked_until": None,
+        "last_error": None,
+    }
+
+
+class CRMOutboxDispatcher:
+    """
+    Envia em lotes os contatos com crm_sync pendente para o CRM.
+
+    O corpo de cada requisição é {"leads": [...]} e cada lead leva seu
+    `idempotency_key`; o cabeçalho Idempotency-Key identifica o lote.
+    Um CRM lento ou fora do ar apenas atrasa a sincronização: a captura do
+    lead nunca espera por ele.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str],
+        api_key: Optional[str] = None,
+        collection_name: str = "contact_submissions",
+        batch_size: int = 50,
+        interval_seconds: float = 5.0,
+        linger_seconds: float = 1.0,
+        max_attempts: int = 8,
+        base_delay_seconds: float = 5.0,
+        max_delay_seconds: float = 600.0,
+        request_timeout_seconds: float = 10.0,
+        max_connections: int = 10,
+    ):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.linger_seconds = linger_seconds
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self.max_connections = max_connections
+
+        self.collection = None
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.endpoint)
+
+    async def start(self, db) -> None:
+        self.collection = db[self.collection_name]
+        await self.collection.create_index([("crm_sync.status", 1), ("crm_sync.next_attempt_at", 1)])
+        # _claim_batch relê o lote por batch_id; só os leads já reivindicados entram no índice
+        await self.collection.create_index(
+            "crm_sync.batch_id", partialFilterExpression={"crm_sync.batch_id": {"$exists": True}}
+        )
+        if not self.enabled:
+            logger.info("CRM_ENDPOINT não configurado - leads ficam pendentes no outbox até a integração ser ativada")
+            return
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        self.http_client = httpx.AsyncClient(
+            headers=headers,
+            timeout=self.request_timeout_seconds,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+        )
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="crm-outbox-dispatcher")
+        logger.info(f"Dispatcher do CRM iniciado (lotes de até {self.batch_size} leads)")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if self._task:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def notify(self) -> None:
+        """Acorda o dispatcher após a captura de um novo lead"""
+        self._wakeup.set()
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _claim_batch(self) -> List[Dict[str, Any]]:
+        """Reivindica um lote de leads prontos, seguro com vários workers/processos"""
+        now = datetime.utcnow()
+        candidates = await self.collection.find(
+            {
+                "$or": [
+                    {"crm_sync.status": SYNC_PENDING, "crm_sync.next_attempt_at": {"$lte": now}},
+                    {"crm_sync.status": SYNC_IN_FLIGHT, "crm_sync.locked_until": {"$lte": now}},
+                ]
+            },
+            {"_id": 0, "id": 1},
+        ).sort([("crm_sync.next_attempt_at", 1)]).limit(self.batch_size).to_list(self.batch_size)
+        if not candidates:
+            return []
+
+        batch_id = str(uuid.uuid4())
+        lease = now + timedelta(seconds=self.request_timeout_seconds * 3)
+        await self.collection.update_many(
+            {
+                "id": {"$in": [c["id"] for c in candidates]},
+                "$or": [
+                    {"crm_sync.status": SYNC_PENDING, "crm_sync.next_attempt_at": {"$lte": now}},
+                    {"crm_sync.status": SYNC_IN_FLIGHT, "crm_sync.locked_until": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {"crm_sync.status": SYNC_IN_FLIGHT, "crm_sync.batch_id": batch_id, "crm_sync.locked_until": lease},
+                "$inc": {"crm_sync.attempts": 1},
+            },
+        )
+        # Só os documentos efetivamente marcados com este batch_id pertencem a este dispatcher
+        return await self.collection.find({"crm_sync.batch_id": batch_id, "crm_sync.status": SYNC_IN_FLIGHT}).to_list(self.batch_size)
+
+    @staticmethod
+    def _lead_payload(document: Dict[str, Any]) -> Dict[str, Any]:
+        lead = {field: document.get(field) for field in LEAD_FIELDS}
+        if isinstance(lead["created_at"], datetime):
+            lead["created_at"] = lead["created_at"].isoformat()
+        lead["idempotency_key"] = document["crm_sync"]["idempotency_key"]
+        return lead
+
+    async def _mark(self, leads: List[Dict[str, Any]], fields: Dict[str, Any]) -> None:
+        # Só grava se o lote ainda é deste dispatcher: uma resposta lenta do CRM pode
+        # chegar depois do lease, quando outro dispatcher já reivindicou os leads
+        await self.collection.update_many(
+            {
+                "id": {"$in": [lead["id"] for lead in leads]},
+                "crm_sync.batch_id": leads[0]["crm_sync"]["batch_id"],
+                "crm_sync.status": SYNC_IN_FLIGHT,
+            },
+            {"$set": {f"crm_sync.{key}": value for key, value in fields.items()}},
+        )
+
+    async def _handle_failure(self, leads: List[Dict[str, Any]], error: str, permanent: bool) -> None:
+        now = datetime.utcnow()
+        retry, give_up = [], []
+        for lead in leads:
+            attempts = lead["crm_sync"]["attempts"]
+            (give_up if permanent or attempts >= self.max_attempts else retry).append(lead)
+
+        if give_up:
+            logger.error(f"CRM: {len(give_up)} leads marcados como falha definitiva: {error}")
+            await self._mark(give_up, {"status": SYNC_FAILED, "last_error": error, "locked_until": None})
+        for lead in retry:
+            delay = self._backoff(lead["crm_sync"]["attempts"])
+            await self._mark([lead], {
+                "status": SYNC_PENDING,
+                "last_error": error,
+                "locked_until": None,
+                "next_attempt_at": now + timedelta(seconds=delay),
+            })
+        if retry:
+            logger.warning(f"CRM: {len(retry)} leads reagendados após erro: {error}")
+
+    async def dispatch_once(self) -> int:
+        """Envia um lote ao CRM. Retorna o número de leads sincronizados."""
+        leads = await self._claim_batch()
+        if not leads:
+            return 0
+
+        payload = [self._lead_payload(lead) for lead in leads]
+        batch_key = hashlib.sha256("|".join(sorted(p["idempotency_key"] for p in payload)).encode()).hexdigest()
+        try:
+            response = await self.http_client.post(
+                self.endpoint,
+                json={"leads": payload},
+                headers={"Idempotency-Key": batch_key},
+            )
+        except httpx.HTTPError as e:
+            await self._handle_failure(leads, f"{type(e).__name__}: {e}", permanent=False)
+            return 0
+
+        if response.is_success:
+            await self._mark(leads, {"status": SYNC_SYNCED, "synced_at": datetime.utcnow(), "locked_until": None, "last_error": None})
+            logger.info(f"CRM: {len(leads)} leads sincronizados")
+            return len(leads)
+
+        error = f"HTTP {response.status_code}: {response.text[:200]}"
+        retryable = response.status_code == 429 or response.status_code >= 500
+        await self._handle_failure(leads, error, permanent=not retryable)
+        return 0
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                synced = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"CRM: erro inesperado no dispatcher: {e}")
+                synced = 0
+
+            if synced >= self.batch_size:
+                continue  # ainda há backlog: envia o próximo lote imediatamente
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+                # Acordado por um novo lead: aguarda um pouco para juntar mais leads no mesmo lote
+                await asyncio.sleep(self.linger_seconds)
+            except asyncio.TimeoutError:
+                pass
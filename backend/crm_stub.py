@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Servidor CRM de teste para exercitar o outbox localmente
+
+Aceita POST {"leads": [...]} em qualquer caminho, deduplica os leads pelo
+idempotency_key e pode simular lentidão e falhas.
+
+Uso (a partir da pasta backend):
+    python crm_stub.py --port 8787 --latency 0.5 --fail-rate 0.2
+    CRM_ENDPOINT=http://localhost:8787/leads python -m uvicorn server:app --port 8001
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+received = {}
+lock = threading.Lock()
+
+
+def make_handler(latency: float, fail_rate: float, fail_status: int):
+    class CRMStubHandler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                leads = json.loads(self.rfile.read(length) or b"{}").get("leads", [])
+            except json.JSONDecodeError:
+                self._reply(400, {"error": "JSON inválido"})
+                return
+
+            if latency:
+                time.sleep(random.uniform(latency * 0.5, latency * 1.5))
+            if random.random() < fail_rate:
+                print(f"💥 Falha simulada ({fail_status}) para lote {self.headers.get('Idempotency-Key', '')[:12]}")
+                self._reply(fail_status, {"error": "falha simulada"})
+                return
+
+            created = duplicated = 0
+            with lock:
+                for lead in leads:
+                    key = lead.get("idempotency_key")
+                    if key in received:
+                        duplicated += 1
+                    else:
+                        received[key] = lead
+                        created += 1
+                total = len(received)
+            print(f"✅ Lote recebido: {created} novos, {duplicated} duplicados (total: {total})")
+            self._reply(200, {"created": created, "duplicated": duplicated})
+
+        def do_GET(self):
+            with lock:
+                self._reply(200, {"total": len(received), "leads": list(received.values())})
+
+        def log_message(self, format, *args):
+            pass
+
+    return CRMStubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor CRM de teste para o outbox de leads")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência média por requisição (segundos)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fração de requisições que falham (0 a 1)")
+    parser.add_argument("--fail-status", type=int, default=503, help="Status HTTP das falhas simuladas")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.fail_rate, args.fail_status))
+    print(f"🔌 CRM de teste ouvindo em http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
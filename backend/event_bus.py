@@ -0,0 +1,151 @@
+# backend/event_bus.py
+"""
+Pub/sub em processo para os eventos do painel administrativo (SSE)
+
+Os handlers de escrita publicam eventos (novo lead, item do portfólio ou
+depoimento criado/alterado/removido) e cada conexão de GET /api/admin/events
+é um assinante com uma fila própria e limitada. Publicar nunca bloqueia a
+requisição: se um assinante lento enche a fila, os eventos dele são
+descartados e ele recebe um único evento "resync" (o painel recarrega as
+listas).
+
+Os ids dos eventos são "<boot>-<seq>": o boot identifica o processo. Ao
+reconectar com Last-Event-ID, o assinante recebe o que perdeu a partir do
+buffer de replay; se o id é de outro processo (outro worker, reinício) ou já
+saiu do buffer, recebe "resync".
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+RESYNC_EVENT = "resync"
+
+
+@dataclass
+class Event:
+    id: str
+    type: str
+    data: Dict[str, Any]
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def encode(self) -> str:
+        """Formato text/event-stream (id, event, data em uma linha JSON)"""
+        payload = json.dumps(self.data, default=str, ensure_ascii=False)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, bus: "EventBus", max_queue: int):
+        self.bus = bus
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+        self.dropped = 0
+
+    def _offer(self, event: Event) -> None:
+        if self.overflowed:
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Descarta o que estava na fila: o assinante vai recarregar tudo mesmo
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = True
+            self.queue.put_nowait(self.bus.resync_event("fila cheia"))
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """Próximo evento, ou None se nada chegou dentro do timeout (hora do heartbeat)"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event.type == RESYNC_EVENT:
+            self.overflowed = False
+        return event
+
+    def close(self) -> None:
+        self.bus.subscribers.discard(self)
+
+
+class EventBus:
+    def __init__(self, replay_size: int = 500, max_queue: int = 100, max_subscribers: int = 100):
+        self.boot_id = uuid.uuid4().hex[:8]
+        self.replay: Deque[Event] = deque(maxlen=replay_size)
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.subscribers: Set[Subscription] = set()
+        self.published = 0
+        self._sequence = itertools.count(1)
+        # _id dos documentos escritos por este processo (ver is_local)
+        self._local_keys: "OrderedDict[str, None]" = OrderedDict()
+
+    def _next_id(self) -> str:
+        return f"{self.boot_id}-{next(self._sequence)}"
+
+    def resync_event(self, reason: str) -> Event:
+        return Event(id=self._next_id(), type=RESYNC_EVENT, data={"reason": reason})
+
+    def publish(self, event_type: str, data: Dict[str, Any], document_key: Any = None) -> Event:
+        event = Event(id=self._next_id(), type=event_type, data=data)
+        self.replay.append(event)
+        self.published += 1
+        if document_key is not None:
+            self._local_keys[str(document_key)] = None
+            while len(self._local_keys) > self.replay.maxlen:
+                self._local_keys.popitem(last=False)
+        for subscription in list(self.subscribers):
+            subscription._offer(event)
+        return event
+
+    def is_local(self, document_key: Any) -> bool:
+        """True se o documento foi escrito (e publicado) por este processo"""
+        return str(document_key) in self._local_keys
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[Subscription]:
+        """Novo assinante (None se o limite de conexões foi atingido)"""
+        if len(self.subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(self, self.max_queue)
+        if last_event_id:
+            missed = self._missed_since(last_event_id)
+            if missed is None:
+                subscription._offer(self.resync_event("eventos anteriores indisponíveis"))
+            else:
+                for event in missed:
+                    subscription._offer(event)
+        self.subscribers.add(subscription)
+        return subscription
+
+    @staticmethod
+    def _sequence_of(event_id: str) -> int:
+        return int(event_id.partition("-")[2])
+
+    def _missed_since(self, last_event_id: str) -> Optional[List[Event]]:
+        """Eventos posteriores a last_event_id, ou None se não for possível saber quais foram"""
+        boot_id, _, sequence = last_event_id.partition("-")
+        if boot_id != self.boot_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if self.replay and sequence < self._sequence_of(self.replay[0].id) - 1:
+            return None
+        return [event for event in self.replay if self._sequence_of(event.id) > sequence]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "boot_id": self.boot_id,
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "replay_buffer": len(self.replay),
+            "dropped": sum(subscription.dropped for subscription in self.subscribers),
+        }
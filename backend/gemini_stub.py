@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Gemini de teste para medir cache, coalescência e limites sem acesso à rede
+
+Gera textos de estratégia determinísticos (o mesmo prompt sempre produz o
+mesmo texto), com latência configurável, streaming token a token e injeção
+de erros de quota (429) e de servidor (5xx). Pode ser usado de dois jeitos:
+
+1. Em processo, sem rede e sem o SDK do Google:
+    GEMINI_BACKEND=fake GEMINI_FAKE_LATENCY=lognormal:800:0.4 python -m uvicorn server:app --port 8001
+
+2. Como servidor HTTP compatível com a API REST do Gemini, usado pelo SDK real:
+    python gemini_stub.py --port 8788 --latency normal:900:200 --quota-rate 0.05 --error-rate 0.02
+    GEMINI_API_ENDPOINT=http://localhost:8788 GEMINI_API_KEY=stub python -m uvicorn server:app --port 8001
+
+Distribuições de latência (tempo até o primeiro token, em ms):
+    fixed:800            sempre 800 ms
+    uniform:200:1500     uniforme entre 200 e 1500 ms
+    normal:800:150       média 800 ms, desvio padrão 150 ms (nunca negativa)
+    lognormal:800:0.4    mediana 800 ms, sigma 0.4 (cauda longa, como a API real)
+
+Depois do primeiro token, cada token leva --token-ms (padrão 0). Sem
+streaming, a resposta só é enviada quando o texto inteiro foi "gerado".
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# =============================================================================
+# LATÊNCIA E FALHAS
+# =============================================================================
+
+@dataclass
+class LatencyModel:
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, *raw = spec.strip().split(":")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(raw) != expected[kind]:
+            raise ValueError(f"Latência inválida: '{spec}' (ex.: fixed:800, uniform:200:1500, normal:800:150, lognormal:800:0.4)")
+        return cls(kind, tuple(float(value) for value in raw))
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+    def __str__(self) -> str:
+        return ":".join([self.kind] + [f"{value:g}" for value in self.params])
+
+
+class FakeGeminiError(Exception):
+    """
+    Erro simulado. As mensagens seguem as da google.api_core, para que o
+    server.py classifique como faria com a API real ("quota" -> 429).
+    """
+
+    def __init__(self, code: int, status_name: str, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.status_name = status_name
+        self.message = message
+
+
+QUOTA_ERROR = (429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota).")
+SERVER_ERRORS = [
+    (500, "INTERNAL", "An internal error has occurred. Please retry or report in https://developers.generativeai.google/guide/troubleshooting"),
+    (503, "UNAVAILABLE", "The model is overloaded. Please try again later."),
+]
+
+
+@dataclass
+class FakeGeminiConfig:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    token_ms: float = 0.0
+    quota_rate: float = 0.0
+    error_rate: float = 0.0
+    rpm: int = 0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "FakeGeminiConfig":
+        seed = os.environ.get("GEMINI_FAKE_SEED")
+        return cls(
+            latency=LatencyModel.parse(os.environ.get("GEMINI_FAKE_LATENCY", "lognormal:800:0.4")),
+            token_ms=float(os.environ.get("GEMINI_FAKE_TOKEN_MS", "0")),
+            quota_rate=float(os.environ.get("GEMINI_FAKE_QUOTA_RATE", "0")),
+            error_rate=float(os.environ.get("GEMINI_FAKE_ERROR_RATE", "0")),
+            rpm=int(os.environ.get("GEMINI_FAKE_RPM", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+
+class FaultInjector:
+    """Sorteia latência e falhas; com rpm > 0 também aplica um limite por minuto, como a quota real"""
+
+    def __init__(self, config: FakeGeminiConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.calls = 0
+        self.failures = {"quota": 0, "server": 0}
+
+    def plan(self) -> float:
+        """Retorna a latência até o primeiro token (s) ou levanta FakeGeminiError"""
+        with self.lock:
+            self.calls += 1
+            now = time.monotonic()
+            if self.config.rpm:
+                while self.recent and now - self.recent[0] > 60:
+                    self.recent.popleft()
+                if len(self.recent) >= self.config.rpm:
+                    self.failures["quota"] += 1
+                    raise FakeGeminiError(*QUOTA_ERROR)
+                self.recent.append(now)
+
+            roll = self.rng.random()
+            if roll < self.config.quota_rate:
+                self.failures["quota"] += 1
+                raise FakeGeminiError(*QUOTA_ERROR)
+            if roll < self.config.quota_rate + self.config.error_rate:
+                self.failures["server"] += 1
+                raise FakeGeminiError(*self.rng.choice(SERVER_ERRORS))
+            return self.config.latency.sample_ms(self.rng) / 1000
+
+# =============================================================================
+# TEXTO DETERMINÍSTICO
+# =============================================================================
+
+CONTEXTS = [
+    "O setor de {industry} vive uma fase de digitalização acelerada, em que clientes comparam opções online antes de qualquer contato.",
+    "Em {industry}, a concorrência disputa atenção nos mesmos canais; vence quem combina dados próprios com uma proposta de valor clara.",
+    "Empresas de {industry} costumam subutilizar os dados que já possuem, o que abre espaço para ganhos rápidos com automação e segmentação.",
+]
+TACTICS = [
+    "Campanhas de mídia paga segmentadas por intenção de compra, com criativos testados semanalmente",
+    "Landing pages específicas por público, com prova social e chamada para ação única",
+    "Automação de e-mail e WhatsApp para nutrir leads nas primeiras 72 horas",
+    "Conteúdo educativo otimizado para busca orgânica nas dúvidas mais frequentes do cliente",
+    "Programa de indicação com recompensa para clientes atuais",
+    "Chatbot com IA para qualificar contatos e agendar conversas com o time comercial",
+    "Remarketing dinâmico para quem visitou páginas de produto e não converteu",
+    "Parcerias com influenciadores de nicho e co-marketing com empresas complementares",
+]
+METRICS = [
+    "Custo por aquisição (CAC)", "Taxa de conversão por canal", "Retorno sobre investimento em mídia (ROAS)",
+    "Lifetime value (LTV)", "Tempo médio até o primeiro contato", "Taxa de retenção em 90 dias",
+]
+NEXT_STEPS = [
+    "Semana 1-2: auditoria dos canais atuais e definição das metas do trimestre",
+    "Semana 3-4: implementação do rastreamento e das primeiras landing pages",
+    "Mês 2: escala das campanhas vencedoras e ativação da automação",
+    "Mês 3: revisão dos resultados, corte do que não performa e novo ciclo de testes",
+]
+
+
+def prompt_digest(prompt: str) -> bytes:
+    return hashlib.sha256(prompt.encode("utf-8")).digest()
+
+
+def _field(prompt: str, label: str, default: str) -> str:
+    match = re.search(rf"{label}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else default
+
+
+def strategy_text(prompt: str) -> str:
+    """Estratégia no formato pedido pelo generate_ai_strategy; o mesmo prompt gera o mesmo texto"""
+    rng = random.Random(prompt_digest(prompt))
+    industry = _field(prompt, "SETOR", "seu setor")
+    objective = _field(prompt, "OBJETIVO", "crescer de forma sustentável")
+    tactics = rng.sample(TACTICS, 4)
+    metrics = rng.sample(METRICS, 3)
+    lines = [
+        f"**Estratégia para {industry}: {objective}**",
+        "",
+        "**1. Análise do contexto do setor**",
+        rng.choice(CONTEXTS).format(industry=industry),
+        "",
+        "**2. Táticas específicas**",
+        *[f"- {tactic}" for tactic in tactics],
+        "",
+        "**3. Métricas-chave**",
+        *[f"- {metric}" for metric in metrics],
+        "",
+        "**4. Próximos passos**",
+        *[f"- {step}" for step in NEXT_STEPS],
+    ]
+    return "\n".join(lines)
+
+
+CONTENT_AREAS = [
+    ("marketing", "Campanha de Performance", ["Google Ads", "Meta Ads", "GA4"]),
+    ("desenvolvimento", "App de Pagamentos", ["React Native", "Node.js", "MongoDB"]),
+    ("automação", "Assistente Inteligente", ["Python", "Gemini", "FastAPI"]),
+]
+CLIENTS = [
+    ("Ana Souza", "CEO", "Pagar Fácil", "ana@pagarfacil.com"),
+    ("Bruno Lima", "Diretor de Marketing", "Loja Norte", "bruno@lojanorte.com"),
+    ("Carla Mendes", "Head de Operações", "Clínica Viva", "carla@clinicaviva.com"),
+    ("Diego Rocha", "CTO", "Rota Certa", "diego@rotacerta.com"),
+]
+
+
+def portfolio_item_json(prompt: str) -> str:
+    """Um projeto de portfólio para a ÁREA do prompt (formato pedido pelo content_agent.py)"""
+    rng = random.Random(prompt_digest(prompt))
+    category = _field(prompt, "ÁREA", "Marketing Digital")
+    _, name, technologies = next(
+        (area for area in CONTENT_AREAS if area[0] in category.lower()), CONTENT_AREAS[0]
+    )
+    gain = rng.randint(20, 180)
+    title = f"{name} {rng.choice(['Alfa', 'Horizonte', 'Pulso', 'Vetor'])}"
+    return json.dumps({
+        "title": title,
+        "category": category,
+        "image": f"https://placehold.co/600x400/5d3a9b/ffffff?text={title.replace(' ', '+')}",
+        "metric": f"+{gain}% conversão",
+        "description": f"Projeto de {category.lower()} com foco em resultado mensurável.",
+        "technologies": technologies,
+        "results": {"conversao": f"+{gain}%", "prazo": f"{rng.randint(6, 16)} semanas"},
+        "challenge": "Baixa conversão e processos manuais.",
+        "solution": f"{name} com integrações sob medida.",
+        "outcome": f"Aumento de {gain}% na conversão em um trimestre.",
+    }, ensure_ascii=False, indent=2)
+
+
+def testimonial_json(prompt: str) -> str:
+    """Um depoimento sobre o PROJETO do prompt (formato pedido pelo content_agent.py)"""
+    rng = random.Random(prompt_digest(prompt))
+    project = _field(prompt, "PROJETO", "Projeto Vertex")
+    name, position, company, email = rng.choice(CLIENTS)
+    return json.dumps({
+        "name": name,
+        "position": position,
+        "company": company,
+        "avatar": f"https://i.pravatar.cc/150?u={email}",
+        "quote": f"O projeto {project} mudou a forma como trabalhamos.",
+        "rating": rng.choice([4, 5, 5]),
+        "project": project,
+    }, ensure_ascii=False, indent=2)
+
+
+def generate_text(prompt: str) -> str:
+    task = _field(prompt, "TAREFA", "").lower()
+    if task.startswith("projeto de portfólio"):
+        return portfolio_item_json(prompt)
+    if task.startswith("depoimento"):
+        return testimonial_json(prompt)
+    return strategy_text(prompt)
+
+
+def tokenize(text: str) -> List[str]:
+    """Divide em "tokens" (palavras com o espaço/quebra seguinte); juntar todos devolve o texto original"""
+    return re.findall(r"\S+\s*|\s+", text)
+
+# =============================================================================
+# MODELO EM PROCESSO (MESMA INTERFACE DO google.generativeai)
+# =============================================================================
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.parts = [self]
+
+
+class FakeGenerativeModel:
+    """
+    Substituto do genai.GenerativeModel: generate_content(prompt, stream=False)
+    bloqueia como o SDK (use asyncio.to_thread) e generate_content_async não
+    bloqueia o event loop.
+    """
+
+    def __init__(self, model_name: str = "gemini-1.5-pro-latest", injector: Optional[FaultInjector] = None):
+        self.model_name = model_name
+        self.injector = injector or FaultInjector(FakeGeminiConfig.from_env())
+
+    def _token_delay(self) -> float:
+        return self.injector.config.token_ms / 1000
+
+    def _stream(self, first_token: float, text: str) -> Iterator[FakeResponse]:
+        time.sleep(first_token)
+        for index, token in enumerate(tokenize(text)):
+            if index:
+                time.sleep(self._token_delay())
+            yield FakeResponse(token)
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config: Optional[dict] = None):
+        first_token = self.injector.plan()
+        text = generate_text(str(prompt))
+        if stream:
+            return self._stream(first_token, text)
+        time.sleep(first_token + self._token_delay() * max(len(tokenize(text)) - 1, 0))
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[dict] = None) -> FakeResponse:
+        first_token = self.injector.plan()
+        text = generate_text(str(prompt))
+        await asyncio.sleep(first_token + self._token_delay() * max(len(tokenize(text)) - 1, 0))
+        return FakeResponse(text)
+
+# =============================================================================
+# SERVIDOR HTTP (API REST v1beta)
+# =============================================================================
+
+def _candidate(text: str, finish: Optional[str]) -> dict:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finish:
+        candidate["finishReason"] = finish
+    return candidate
+
+
+def _prompt_from_body(body: dict) -> str:
+    return "".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def make_handler(injector: FaultInjector):
+    class GeminiStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: dict) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            match = re.fullmatch(r"/v1(?:beta)?/models/([^/:]+):(generateContent|streamGenerateContent)", url.path)
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            if not match:
+                self._reply(404, {"error": {"code": 404, "message": f"Caminho não suportado: {url.path}", "status": "NOT_FOUND"}})
+                return
+            try:
+                prompt = _prompt_from_body(json.loads(raw or b"{}"))
+            except json.JSONDecodeError:
+                self._reply(400, {"error": {"code": 400, "message": "JSON inválido", "status": "INVALID_ARGUMENT"}})
+                return
+
+            try:
+                first_token = injector.plan()
+            except FakeGeminiError as e:
+                print(f"💥 Falha simulada ({e.code}) para {match.group(1)}")
+                self._reply(e.code, {"error": {"code": e.code, "message": e.message, "status": e.status_name}})
+                return
+
+            text = generate_text(prompt)
+            tokens = tokenize(text)
+            usage = {"promptTokenCount": len(tokenize(prompt)), "candidatesTokenCount": len(tokens),
+                     "totalTokenCount": len(tokenize(prompt)) + len(tokens)}
+            token_delay = injector.config.token_ms / 1000
+
+            if match.group(2) == "generateContent":
+                time.sleep(first_token + token_delay * max(len(tokens) - 1, 0))
+                self._reply(200, {"candidates": [_candidate(text, "STOP")], "usageMetadata": usage})
+                print(f"✅ {match.group(1)}: {len(tokens)} tokens em {first_token * 1000:.0f} ms até o primeiro token")
+                return
+
+            # Streaming: SSE com ?alt=sse (padrão do SDK), senão um array JSON enviado aos poucos
+            sse = parse_qs(url.query).get("alt") == ["sse"]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream" if sse else "application/json; charset=UTF-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            time.sleep(first_token)
+            if not sse:
+                self.wfile.write(b"[")
+            for index, token in enumerate(tokens):
+                if index:
+                    time.sleep(token_delay)
+                last = index == len(tokens) - 1
+                chunk = {"candidates": [_candidate(token, "STOP" if last else None)]}
+                if last:
+                    chunk["usageMetadata"] = usage
+                data = json.dumps(chunk, ensure_ascii=False)
+                if sse:
+                    self.wfile.write(f"data: {data}\r\n\r\n".encode())
+                else:
+                    self.wfile.write(((",\r\n" if index else "") + data).encode())
+                self.wfile.flush()
+            if not sse:
+                self.wfile.write(b"]")
+            print(f"✅ {match.group(1)} (stream): {len(tokens)} tokens")
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/stats":
+                config = injector.config
+                self._reply(200, {"calls": injector.calls, "failures": injector.failures, "latency": str(config.latency),
+                                  "token_ms": config.token_ms, "quota_rate": config.quota_rate,
+                                  "error_rate": config.error_rate, "rpm": config.rpm})
+                return
+            self._reply(404, {"error": {"code": 404, "message": "Não encontrado", "status": "NOT_FOUND"}})
+
+        def log_message(self, format, *args):
+            pass
+
+    return GeminiStubHandler
+
+
+def main():
+    defaults = FakeGeminiConfig.from_env()
+    parser = argparse.ArgumentParser(description="Gemini de teste (API REST v1beta) com latência e falhas configuráveis")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--latency", default=str(defaults.latency), help="Distribuição até o primeiro token (ex.: lognormal:800:0.4)")
+    parser.add_argument("--token-ms", type=float, default=defaults.token_ms, help="Atraso entre tokens")
+    parser.add_argument("--quota-rate", type=float, default=defaults.quota_rate, help="Fração de respostas 429")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fração de respostas 5xx")
+    parser.add_argument("--rpm", type=int, default=defaults.rpm, help="Limite de requisições por minuto (0 = sem limite)")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Semente para latências e falhas reproduzíveis")
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(
+        latency=LatencyModel.parse(args.latency), token_ms=args.token_ms, quota_rate=args.quota_rate,
+        error_rate=args.error_rate, rpm=args.rpm, seed=args.seed,
+    )
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), make_handler(FaultInjector(config)))
+    print(f"🤖 Gemini de teste em http://localhost:{args.port} (latência {config.latency}, "
+          f"{config.token_ms:g} ms/token, quota {config.quota_rate:.0%}, 5xx {config.error_rate:.0%}, rpm {config.rpm or '∞'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
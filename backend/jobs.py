@@ -0,0 +1,327 @@
+# backend/jobs.py
+"""
+Fila de jobs assíncrona com persistência no MongoDB
+
+Os jobs ficam na coleção `jobs` e sobrevivem a reinícios do processo:
+- enqueue() grava o job como 'pending' e acorda os workers
+- cada worker reivindica um job de forma atômica (find_one_and_update),
+  marcando-o como 'running' com um prazo de concessão (lease)
+- jobs cujo lease expirou (ex.: processo morto no meio da execução) voltam
+  a ser reivindicáveis
+- falhas são reagendadas com backoff exponencial + jitter até max_attempts,
+  quando o job passa para 'failed' com o último erro registrado
+- enquanto o handler roda, o worker renova o lease a cada terço do prazo:
+  um envio lento (ex.: SMTP em thread, que não pode ser cancelado) não
+  deixa o job ser reivindicado e executado de novo por outro worker
+- um handler pode levantar PermanentJobError para um erro que se repetiria
+  em toda tentativa (ex.: payload que não monta um email válido): o job
+  passa direto para 'failed', sem gastar as tentativas restantes
+- jobs concluídos ou falhos recebem finished_at e são apagados por um
+  índice TTL depois de retention_seconds
+- relay() liga um tipo de job a um marcador gravado no próprio documento de
+  origem (ex.: o contato recebido pelo buffer de escrita): o job só é criado
+  depois que o documento está no banco, nunca antes
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Estados do marcador gravado no documento de origem (ver relay())
+MARKER_PENDING = "pending"
+MARKER_ENQUEUED = "enqueued"
+
+
+class PermanentJobError(Exception):
+    """Falha determinística do handler: o job não é tentado de novo"""
+
+
+def new_job_marker() -> Dict[str, Any]:
+    """Marcador gravado junto com o documento para que a fila crie o job dele"""
+    # O id do job é fixado aqui: repassar o mesmo marcador duas vezes não duplica o job
+    return {"status": MARKER_PENDING, "job_id": str(uuid.uuid4())}
+
+
+class JobQueue:
+    """
+    Fila de jobs em processo, com workers em corrotinas e estado no MongoDB.
+
+    Uso:
+        queue = JobQueue(workers=2)
+        queue.register("contact_notification", handler)
+        await queue.start(db)
+        await queue.enqueue("contact_notification", {...})
+        # ou, a partir de um marcador gravado com o documento:
+        queue.relay("contact_submissions", "contact_notification", ["name", "email"], marker_field="notification")
+        await queue.stop()
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "jobs",
+        workers: int = 2,
+        max_attempts: int = 5,
+        base_delay_seconds: float = 2.0,
+        max_delay_seconds: float = 300.0,
+        lease_seconds: float = 60.0,
+        timeout_seconds: float = 300.0,
+        poll_interval_seconds: float = 5.0,
+        retention_seconds: float = 7 * 24 * 3600,
+    ):
+        self.collection_name = collection_name
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.lease_seconds = lease_seconds
+        self.timeout_seconds = timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retention_seconds = retention_seconds
+
+        self.handlers: Dict[str, JobHandler] = {}
+        self.sources: List[Tuple[str, str, str, Sequence[str]]] = []
+        self.db = None
+        self.collection = None
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._relay_wakeup = asyncio.Event()
+        self._stopping = False
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """Associa um handler assíncrono a um tipo de job"""
+        self.handlers[job_type] = handler
+
+    def relay(self, collection_name: str, job_type: str, payload_fields: Sequence[str], marker_field: str = "job") -> None:
+        """
+        Cria um job `job_type` para cada documento de `collection_name` gravado
+        com new_job_marker() em `marker_field`. O payload leva os campos
+        `payload_fields` do documento.
+        """
+        self.sources.append((collection_name, job_type, marker_field, tuple(payload_fields)))
+
+    def notify(self) -> None:
+        """Acorda o relay após a gravação de um documento com marcador"""
+        self._relay_wakeup.set()
+
+    async def start(self, db) -> None:
+        """Cria os índices e inicia os workers"""
+        self.db = db
+        self.collection = db[self.collection_name]
+        await self.collection.create_index([("status", 1), ("run_at", 1)])
+        await self.collection.create_index("id", unique=True)
+        await self.collection.create_index("finished_at", expireAfterSeconds=int(self.retention_seconds))
+        for collection_name, _, marker_field, _ in self.sources:
+            await db[collection_name].create_index(f"{marker_field}.status")
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._relay_wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i), name=f"job-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        if self.sources:
+            self._workers.append(asyncio.create_task(self._relay_loop(), name="job-relay"))
+        logger.info(f"Fila de jobs iniciada com {self.worker_count} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Para os workers. Jobs em execução têm até `timeout` segundos para
+        terminar; os que forem cancelados voltam a ficar disponíveis quando o
+        lease expirar.
+        """
+        if not self._workers:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._relay_wakeup.set()
+        done, pending = await asyncio.wait(self._workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._workers = []
+        logger.info("Fila de jobs parada")
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], delay_seconds: float = 0) -> str:
+        """Persiste um novo job e acorda os workers. Retorna o id do job."""
+        if job_type not in self.handlers:
+            raise ValueError(f"Tipo de job sem handler registrado: {job_type}")
+
+        job_id = str(uuid.uuid4())
+        await self.collection.insert_one({"id": job_id, **self._new_job(job_type, payload, delay_seconds)})
+        self._wakeup.set()
+        return job_id
+
+    @staticmethod
+    def _new_job(job_type: str, payload: Dict[str, Any], delay_seconds: float = 0) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        return {
+            "type": job_type,
+            "payload": payload,
+            "status": JOB_PENDING,
+            "attempts": 0,
+            "run_at": now + timedelta(seconds=delay_seconds),
+            "locked_until": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def relay_pending(self, batch_size: int = 100) -> int:
+        """Cria os jobs dos documentos com marcador pendente. Retorna quantos foram repassados."""
+        relayed = 0
+        for collection_name, job_type, marker_field, payload_fields in self.sources:
+            source = self.db[collection_name]
+            documents = await source.find({f"{marker_field}.status": MARKER_PENDING}).limit(batch_size).to_list(batch_size)
+            for document in documents:
+                marker = document[marker_field]
+                payload = {name: document.get(name) for name in payload_fields}
+                # Upsert pelo id do marcador: se o processo morrer entre as duas
+                # escritas, o próximo repasse encontra o job já criado
+                await self.collection.update_one(
+                    {"id": marker["job_id"]},
+                    {"$setOnInsert": self._new_job(job_type, payload)},
+                    upsert=True,
+                )
+                await source.update_one(
+                    {"_id": document["_id"], f"{marker_field}.status": MARKER_PENDING},
+                    {"$set": {f"{marker_field}.status": MARKER_ENQUEUED}},
+                )
+                relayed += 1
+        if relayed:
+            self._wakeup.set()
+        return relayed
+
+    def _backoff(self, attempts: int) -> float:
+        """Atraso exponencial com jitter para a próxima tentativa"""
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Reivindica atomicamente o próximo job pronto (ou com lease expirado)"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "type": {"$in": list(self.handlers)},
+                "$or": [
+                    {"status": JOB_PENDING, "run_at": {"$lte": now}},
+                    {"status": JOB_RUNNING, "locked_until": {"$lte": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _renew_lease(self, job: Dict[str, Any]) -> None:
+        """Estende o lease do job enquanto o handler estiver rodando"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            now = datetime.utcnow()
+            result = await self.collection.update_one(
+                {"id": job["id"], "status": JOB_RUNNING, "attempts": job["attempts"]},
+                {"$set": {"locked_until": now + timedelta(seconds=self.lease_seconds), "updated_at": now}},
+            )
+            if not result.matched_count:
+                logger.warning(f"Job {job['id']} ({job['type']}) perdeu o lease durante a execução")
+                return
+
+    async def _finish(self, job: Dict[str, Any], update: Dict[str, Any]) -> bool:
+        """
+        Grava o resultado só se o job ainda é desta tentativa (mesmo filtro do
+        heartbeat): depois de perder o lease, outro worker pode estar rodando
+        o job e o resultado desta execução não pode sobrescrever o dele
+        """
+        result = await self.collection.update_one(
+            {"id": job["id"], "status": JOB_RUNNING, "attempts": job["attempts"]},
+            {"$set": update},
+        )
+        if not result.matched_count:
+            logger.warning(f"Job {job['id']} ({job['type']}) reivindicado por outro worker - resultado da tentativa {job['attempts']} descartado")
+            return False
+        return True
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        handler = self.handlers[job["type"]]
+        heartbeat = asyncio.create_task(self._renew_lease(job))
+        try:
+            await asyncio.wait_for(handler(job["payload"]), timeout=self.timeout_seconds)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            now = datetime.utcnow()
+            if isinstance(e, PermanentJobError) or job["attempts"] >= self.max_attempts:
+                logger.error(f"Job {job['id']} ({job['type']}) falhou definitivamente após {job['attempts']} tentativa(s): {error}")
+                update = {"status": JOB_FAILED, "last_error": error, "locked_until": None, "finished_at": now, "updated_at": now}
+            else:
+                delay = self._backoff(job["attempts"])
+                logger.warning(f"Job {job['id']} ({job['type']}) falhou (tentativa {job['attempts']}), nova tentativa em {delay:.1f}s: {error}")
+                update = {
+                    "status": JOB_PENDING,
+                    "last_error": error,
+                    "locked_until": None,
+                    "run_at": now + timedelta(seconds=delay),
+                    "updated_at": now,
+                }
+            await self._finish(job, update)
+            return
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        now = datetime.utcnow()
+        if await self._finish(job, {"status": JOB_DONE, "locked_until": None, "completed_at": now, "finished_at": now, "updated_at": now}):
+            logger.info(f"Job {job['id']} ({job['type']}) concluído")
+
+    async def _worker_loop(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Worker {index}: erro ao buscar jobs: {e}")
+                job = None
+
+            if job is None:
+                # Sem trabalho: espera um novo enqueue ou o próximo ciclo de polling
+                # (que também recolhe jobs reagendados e leases expirados)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _relay_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._relay_wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._relay_wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                await self.relay_pending()
+            except Exception as e:
+                logger.error(f"Erro ao repassar marcadores para a fila de jobs: {e}")
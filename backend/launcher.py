@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Ponto de entrada de produção do backend
+
+Sobe N workers do uvicorn compartilhando o mesmo socket, com:
+  - N dimensionado pelas CPUs disponíveis (afinidade e quota do cgroup do
+    container), limitado por WEB_MAX_WORKERS; WEB_CONCURRENCY fixa o valor
+  - uvloop e httptools quando instalados (senão asyncio e h11)
+  - reciclagem: cada worker encerra de forma graciosa depois de
+    WEB_MAX_REQUESTS requisições (+ até WEB_MAX_REQUESTS_JITTER, para não
+    reciclarem todos juntos) e o supervisor sobe outro no lugar. O worker
+    novo só aceita conexões depois do aquecimento (WARM_UP_BEFORE_SERVING),
+    então a reciclagem não gera 503
+  - keep-alive, backlog e tempo de desligamento configuráveis
+
+Cada worker é um processo com seus próprios caches em memória, pool do
+MongoDB e métricas (/metrics). O uvicorn 0.25 não repõe workers que saem,
+por isso o supervisor é próprio.
+
+Uso (a partir da pasta backend):
+    python launcher.py --port $PORT
+    WEB_CONCURRENCY=4 WEB_MAX_REQUESTS=20000 python launcher.py
+"""
+
+import argparse
+import importlib.util
+import logging
+import math
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("launcher")
+
+# Falha rápida: um worker que morre logo após subir espera antes de ser reposto
+CRASH_WINDOW_SECONDS = 5.0
+CRASH_BACKOFF_SECONDS = 1.0
+
+# =============================================================================
+# DIMENSIONAMENTO E DETECÇÃO DE RECURSOS
+# =============================================================================
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """Quota de CPU do container (cgroup v2 ou v1), em CPUs; None sem limite"""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def default_workers(max_workers: int) -> int:
+    """Um worker por CPU: a aplicação é async, então mais processos que CPUs só somam memória"""
+    return max(1, min(available_cpus(), max_workers))
+
+
+def pick_loop() -> str:
+    if sys.platform != "win32" and importlib.util.find_spec("uvloop"):
+        return "uvloop"
+    return "asyncio"
+
+
+def pick_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+# =============================================================================
+# CONFIGURAÇÃO
+# =============================================================================
+
+@dataclass
+class LauncherSettings:
+    host: str
+    port: int
+    workers: int
+    loop: str
+    http: str
+    max_requests: int
+    max_requests_jitter: int
+    keepalive_seconds: int
+    backlog: int
+    graceful_timeout_seconds: int
+    access_log: bool
+
+
+def build_config(settings: LauncherSettings, limit_max_requests: Optional[int]) -> uvicorn.Config:
+    return uvicorn.Config(
+        "server:app",
+        host=settings.host,
+        port=settings.port,
+        loop=settings.loop,
+        http=settings.http,
+        lifespan="on",
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keepalive_seconds,
+        timeout_graceful_shutdown=settings.graceful_timeout_seconds,
+        limit_max_requests=limit_max_requests,
+        proxy_headers=True,
+        access_log=settings.access_log,
+    )
+
+
+def _serve_worker(config: uvicorn.Config, sockets, env: Dict[str, str]) -> None:
+    """Alvo dos processos filhos (spawn): aplica o ambiente antes de importar o server"""
+    os.environ.update(env)
+    config.configure_logging()
+    uvicorn.Server(config).run(sockets=sockets)
+
+# =============================================================================
+# SUPERVISOR
+# =============================================================================
+
+class Supervisor:
+    """Mantém N workers vivos sobre um socket único e repõe os que saem (reciclagem ou falha)"""
+
+    def __init__(self, settings: LauncherSettings):
+        self.settings = settings
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.started_at: Dict[int, float] = {}
+        self.should_exit = threading.Event()
+        self.sockets: List = []
+        self.recycled = 0
+
+    def _limit_for_worker(self) -> Optional[int]:
+        if not self.settings.max_requests:
+            return None
+        return self.settings.max_requests + random.randint(0, self.settings.max_requests_jitter)
+
+    def spawn(self, slot: int, replacement: bool) -> None:
+        limit = self._limit_for_worker()
+        env = {"WARM_UP_BEFORE_SERVING": "true"} if replacement else {}
+        process = self.context.Process(
+            target=_serve_worker,
+            kwargs={"config": build_config(self.settings, limit), "sockets": self.sockets, "env": env},
+            name=f"worker-{slot}",
+        )
+        process.start()
+        self.processes[slot] = process
+        self.started_at[slot] = time.monotonic()
+        logger.info(f"Worker {slot} iniciado (pid {process.pid}, limite {limit or 'sem limite'} requisições)")
+
+    def _handle_exit_signal(self, signum, frame) -> None:
+        self.should_exit.set()
+
+    def run(self) -> None:
+        config = build_config(self.settings, None)
+        self.sockets = [config.bind_socket()]
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_exit_signal)
+
+        for slot in range(self.settings.workers):
+            self.spawn(slot, replacement=False)
+
+        while not self.should_exit.wait(0.5):
+            for slot, process in list(self.processes.items()):
+                if process.is_alive():
+                    continue
+                lifetime = time.monotonic() - self.started_at[slot]
+                if process.exitcode == 0:
+                    self.recycled += 1
+                    logger.info(f"Worker {slot} (pid {process.pid}) reciclado após {lifetime:.0f}s (total: {self.recycled})")
+                else:
+                    logger.warning(f"Worker {slot} (pid {process.pid}) saiu com código {process.exitcode} após {lifetime:.1f}s")
+                    if lifetime < CRASH_WINDOW_SECONDS:
+                        time.sleep(CRASH_BACKOFF_SECONDS)
+                if not self.should_exit.is_set():
+                    self.spawn(slot, replacement=True)
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """SIGTERM em todos (desligamento gracioso do uvicorn) e SIGKILL em quem passar do prazo"""
+        logger.info(f"Encerrando {len(self.processes)} workers...")
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.settings.graceful_timeout_seconds + 5
+        for slot, process in self.processes.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker {slot} (pid {process.pid}) não encerrou a tempo - SIGKILL")
+                process.kill()
+                process.join()
+        for sock in self.sockets:
+            sock.close()
+        logger.info("Launcher encerrado")
+
+
+def main() -> None:
+    max_workers = int(os.environ.get("WEB_MAX_WORKERS", "8"))
+    concurrency = os.environ.get("WEB_CONCURRENCY")
+
+    parser = argparse.ArgumentParser(description="Servidor de produção do backend VERTEX TARGET")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(concurrency) if concurrency else default_workers(max_workers),
+                        help="Padrão: WEB_CONCURRENCY ou uma por CPU disponível (até WEB_MAX_WORKERS)")
+    parser.add_argument("--loop", choices=["auto", "uvloop", "asyncio"], default=os.environ.get("WEB_LOOP", "auto"))
+    parser.add_argument("--http", choices=["auto", "httptools", "h11"], default=os.environ.get("WEB_HTTP", "auto"))
+    parser.add_argument("--max-requests", type=int, default=int(os.environ.get("WEB_MAX_REQUESTS", "0")),
+                        help="Recicla o worker após N requisições (0 = nunca)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.environ.get("WEB_MAX_REQUESTS_JITTER", "0")))
+    parser.add_argument("--keepalive", type=int, default=int(os.environ.get("WEB_KEEPALIVE_SECONDS", "5")),
+                        help="Segundos que uma conexão ociosa fica aberta")
+    parser.add_argument("--backlog", type=int, default=int(os.environ.get("WEB_BACKLOG", "2048")))
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.environ.get("WEB_GRACEFUL_TIMEOUT_SECONDS", "30")))
+    args = parser.parse_args()
+
+    settings = LauncherSettings(
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        loop=pick_loop() if args.loop == "auto" else args.loop,
+        http=pick_http() if args.http == "auto" else args.http,
+        max_requests=max(0, args.max_requests),
+        max_requests_jitter=max(0, args.max_requests_jitter),
+        keepalive_seconds=args.keepalive,
+        backlog=args.backlog,
+        graceful_timeout_seconds=args.graceful_timeout,
+        access_log=os.environ.get("WEB_ACCESS_LOG", "true").lower() == "true",
+    )
+    logger.info(
+        f"🚀 {settings.workers} worker(s) em {settings.host}:{settings.port} "
+        f"(CPUs disponíveis: {available_cpus()}, loop {settings.loop}, http {settings.http}, "
+        f"keep-alive {settings.keepalive_seconds}s, backlog {settings.backlog}, "
+        f"reciclagem {settings.max_requests or 'desligada'})"
+    )
+
+    if settings.workers == 1 and not settings.max_requests:
+        # Sem supervisor: um único processo, como python -m uvicorn
+        uvicorn.Server(build_config(settings, None)).run()
+        return
+    Supervisor(settings).run()
+
+
+if __name__ == "__main__":
+    main()
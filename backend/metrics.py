@@ -0,0 +1,385 @@
+# backend/metrics.py
+"""
+Métricas no formato de texto do Prometheus (sem dependências externas)
+
+- Counter, Gauge e Histogram com rótulos; cada combinação de rótulos vira
+  um "filho" criado uma única vez (preallocate() cria os conhecidos no
+  startup), então observar uma métrica custa um lookup em dict e um lock
+- CallbackGauge lê valores de objetos existentes (caches, pool) somente
+  no momento da coleta
+- PrometheusMiddleware mede latência e requisições em andamento por
+  template de rota (/api/portfolio/{item_id}), nunca pelo path bruto
+- MongoCommandMetrics: CommandListener do pymongo com a duração de cada
+  comando por operação e coleção
+
+Os listeners do pymongo rodam nas threads do executor do Motor, por isso
+cada filho protege seus valores com um threading.Lock.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latência de requisições HTTP e chamadas externas (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Comandos do MongoDB costumam ficar bem abaixo de 100ms
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Chamadas ao Gemini levam segundos
+AI_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} espera os rótulos {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def preallocate(self, label_sets: Iterable[Sequence[str]]) -> None:
+        """Cria os filhos conhecidos de antemão (evita alocação no caminho da requisição)"""
+        for values in label_sets:
+            self.labels(*values)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _ValueChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def get(self) -> float:
+        return self._value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = bounds
+        # Uma posição por faixa + a faixa +Inf; acumulado só na renderização
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def _render_child(self, key, child) -> List[str]:
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackGauge:
+    """Métrica calculada na coleta: callback() devolve [(valores dos rótulos, valor)]"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], callback: Callable, kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: List[object] = []
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(self._name(name), documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(self._name(name), documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(self._name(name), documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, labelnames: Sequence[str], callback: Callable, kind: str = "gauge") -> CallbackGauge:
+        return self.register(CallbackGauge(self._name(name), documentation, labelnames, callback, kind))
+
+    def render(self) -> bytes:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+class HTTPMetrics:
+    """Métricas HTTP por método e template de rota"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route")
+        )
+        self.requests = registry.counter(
+            "http_requests_total", "Requisições HTTP por rota e classe de status", ("method", "route", "status")
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "Requisições HTTP em andamento", ("method",)
+        )
+        # (método, rota) -> (filho do histograma, {classe de status: filho do contador})
+        self._route_children: Dict[Tuple[str, str], Tuple[_HistogramChild, Dict[str, _ValueChild]]] = {}
+
+    def preallocate_routes(self, routes) -> None:
+        """Cria os filhos de todas as rotas registradas (chamar depois do include_router)"""
+        for route in routes:
+            for method in sorted(getattr(route, "methods", None) or ()):
+                self._children_for(method, route.path)
+        self._children_for("GET", UNMATCHED_ROUTE)
+
+    def _children_for(self, method: str, route: str):
+        key = (method, route)
+        children = self._route_children.get(key)
+        if children is None:
+            children = (
+                self.latency.labels(method, route),
+                {status: self.requests.labels(method, route, status) for status in STATUS_CLASSES},
+            )
+            self._route_children[key] = children
+            self.in_flight.labels(method)
+        return children
+
+    def observe(self, method: str, route: str, status_code: int, duration: float) -> None:
+        latency, counters = self._children_for(method, route)
+        latency.observe(duration)
+        counters[status_class(status_code)].inc()
+
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI que registra latência, status e requisições em andamento.
+    O template da rota vem de scope["route"], preenchido pelo roteador do
+    FastAPI ao casar a rota; paths sem rota entram como <unmatched>.
+    """
+
+    def __init__(self, app, http_metrics: HTTPMetrics, excluded_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.http_metrics = http_metrics
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = self.http_metrics.in_flight.labels(method)
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.http_metrics.observe(method, route_path, status_holder["status"], duration)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Duração e falhas dos comandos do MongoDB por operação e coleção"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.duration = registry.histogram(
+            "mongo_command_duration_seconds", "Duração dos comandos do MongoDB",
+            ("command", "collection"), buckets=MONGO_BUCKETS
+        )
+        self.failures = registry.counter(
+            "mongo_command_failures_total", "Comandos do MongoDB que falharam", ("command", "collection")
+        )
+        # (connection_id, request_id) -> coleção; o evento de conclusão não traz o comando
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        value = event.command.get(event.command_name)
+        return value if isinstance(value, str) else ""
+
+    def started(self, event):
+        self._collections[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def _finish(self, event) -> Tuple[str, str]:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        self.duration.labels(event.command_name, collection).observe(event.duration_micros / 1_000_000)
+        return event.command_name, collection
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        command, collection = self._finish(event)
+        self.failures.labels(command, collection).inc()
+
+
+class AIMetrics:
+    """Latência e erros das chamadas ao Gemini"""
+
+    OUTCOMES = ("success", "empty", "error")
+    ERROR_REASONS = ("auth", "quota", "other")
+
+    def __init__(self, registry: MetricsRegistry):
+        self.latency = registry.histogram(
+            "ai_request_duration_seconds", "Latência das chamadas ao Gemini", ("outcome",), buckets=AI_BUCKETS
+        )
+        self.errors = registry.counter(
+            "ai_request_errors_total", "Erros nas chamadas ao Gemini por motivo", ("reason",)
+        )
+        self.latency.preallocate((outcome,) for outcome in self.OUTCOMES)
+        self.errors.preallocate((reason,) for reason in self.ERROR_REASONS)
+
+    def observe(self, outcome: str, duration: float, reason: Optional[str] = None) -> None:
+        self.latency.labels(outcome).observe(duration)
+        if reason is not None:
+            self.errors.labels(reason).inc()
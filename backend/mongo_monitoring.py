@@ -0,0 +1,403 @@
+# backend/mongo_monitoring.py
+"""
+Configuração do pool de conexões do Motor e métricas do pool
+
+- build_client_options(): monta os kwargs do AsyncIOMotorClient a partir das
+  variáveis MONGO_* (tamanho do pool, timeouts, compressão, read preference)
+- PoolMetricsListener: ConnectionPoolListener do pymongo que contabiliza
+  conexões abertas, checkouts em uso e o tempo de espera por uma conexão
+- SlowQueryLog: CommandListener que agrega a duração por comando e coleção,
+  registra no log os comandos acima de um limite com o formato do filtro
+  (valores substituídos por "?") e mantém o top-N dos formatos mais lentos
+
+Os eventos do pool são emitidos nas threads do executor do Motor; o início
+de cada checkout é guardado em um threading.local para medir a espera.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Compressores de protocolo em ordem de preferência e o módulo que cada um exige
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+# Variável de ambiente -> opção do pymongo (valores inteiros)
+_INT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_CONNECTING": "maxConnecting",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+}
+
+
+def available_compressors(requested: List[str]) -> List[str]:
+    """Mantém apenas os compressores cujas bibliotecas estão instaladas"""
+    available = []
+    for name in requested:
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            logger.warning(f"Compressor MongoDB desconhecido ignorado: {name}")
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            logger.warning(f"Compressor MongoDB '{name}' indisponível (instale '{module}')")
+            continue
+        available.append(name)
+    return available
+
+
+def build_client_options(environ=os.environ) -> Dict[str, Any]:
+    """
+    Lê a configuração do pool a partir do ambiente. Opções não definidas
+    ficam com os defaults do driver.
+    """
+    options: Dict[str, Any] = {}
+    for env_name, option in _INT_OPTIONS.items():
+        value = environ.get(env_name)
+        if value:
+            options[option] = int(value)
+
+    compressors = [c.strip() for c in environ.get("MONGO_COMPRESSORS", "").split(",") if c.strip()]
+    compressors = available_compressors(compressors)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+        if "zlib" in compressors and environ.get("MONGO_ZLIB_LEVEL"):
+            options["zlibCompressionLevel"] = int(environ["MONGO_ZLIB_LEVEL"])
+
+    read_preference = environ.get("MONGO_READ_PREFERENCE")
+    if read_preference:
+        options["readPreference"] = read_preference
+    return options
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Contadores do pool de conexões, seguros para uso entre threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+        self.wait_count = 0
+        self.wait_total_seconds = 0.0
+        self.wait_max_seconds = 0.0
+        # Esperas por faixa (segundos), no mesmo formato de um histograma cumulativo
+        self.wait_buckets = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+        self.wait_bucket_counts = [0] * len(self.wait_buckets)
+
+    def _record_wait(self, event) -> None:
+        # pymongo >= 4.7 já informa a duração; nas versões anteriores usamos o início guardado na thread
+        duration = getattr(event, "duration", None)
+        if duration is None:
+            started = getattr(self._local, "checkout_started", None)
+            if started is None:
+                return
+            duration = time.perf_counter() - started
+        self._local.checkout_started = None
+
+        self.wait_count += 1
+        self.wait_total_seconds += duration
+        self.wait_max_seconds = max(self.wait_max_seconds, duration)
+        for index, bound in enumerate(self.wait_buckets):
+            if duration <= bound:
+                self.wait_bucket_counts[index] += 1
+
+    # --- pool ---
+    def pool_created(self, event):
+        logger.info(f"Pool MongoDB criado para {event.address}")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+        logger.warning(f"Pool MongoDB limpo para {event.address}")
+
+    def pool_closed(self, event):
+        pass
+
+    # --- conexões ---
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    # --- checkouts ---
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            self._record_wait(event)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self._record_wait(event)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "checked_out": self.checked_out,
+                "checkouts_total": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pools_cleared": self.pools_cleared,
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "avg_ms": round(self.wait_total_seconds / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                    "max_ms": round(self.wait_max_seconds * 1000, 3),
+                    "buckets_ms": {
+                        f"le_{bound * 1000:g}": count
+                        for bound, count in zip(self.wait_buckets, self.wait_bucket_counts)
+                    },
+                },
+            }
+
+
+# Comandos internos do driver que não interessam ao log de consultas lentas
+_IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "saslStart",
+    "saslContinue", "endSessions", "killCursors", "getLastError",
+}
+
+# Estágios cujo conteúdo descreve a consulta (nomes de campos, direções) e nunca dados
+_STRUCTURAL_STAGES = {"$sort", "$unwind", "$count"}
+# Estágios de expressões: campos e operadores ficam, operandos literais não
+# ($cond/$eq comparam com valores, $literal é um valor)
+_EXPRESSION_STAGES = {"$project", "$group", "$addFields", "$set"}
+
+
+def redact_shape(value: Any) -> Any:
+    """
+    Formato de um filtro sem os valores: {"email": "a@b.com", "age": {"$gt": 30}}
+    vira {"email": "?", "age": {"$gt": "?"}}. Listas de subfiltros ($or, $and)
+    mantêm o formato de cada item; listas de valores ($in) viram ["?"].
+    """
+    if isinstance(value, dict):
+        return {key: redact_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact_shape(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def redact_expression(value: Any) -> Any:
+    """
+    Formato de uma expressão de agregação sem os valores: referências a
+    campos ("$status", "$$ROOT") e operadores ficam, literais viram "?".
+    {"$cond": [{"$eq": ["$status", "pago"]}, 1, 0]} vira
+    {"$cond": [{"$eq": ["$status", "?"]}, "?", "?"]}.
+    """
+    if isinstance(value, dict):
+        return {key: "?" if key == "$literal" else redact_expression(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_expression(item) for item in value]
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+
+def _pipeline_shape(pipeline: List[Dict[str, Any]]) -> List[Any]:
+    shape = []
+    for stage in pipeline:
+        operator = next(iter(stage), "")
+        if operator in _STRUCTURAL_STAGES:
+            shape.append(stage)
+        elif operator in _EXPRESSION_STAGES:
+            shape.append({operator: redact_expression(stage[operator])})
+        else:
+            shape.append({operator: redact_shape(stage[operator])})
+    return shape
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """Extrai do comando a parte que identifica a consulta, já sem valores"""
+    if command_name == "find":
+        shape = {"filter": redact_shape(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        return shape
+    if command_name == "aggregate":
+        return {"pipeline": _pipeline_shape(command.get("pipeline", []))}
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return {"filter": redact_shape(statements[0].get("q", {})), "statements": len(statements)}
+    if command_name == "findAndModify":
+        return {"filter": redact_shape(command.get("query", {}))}
+    if command_name in ("count", "distinct"):
+        shape = {"filter": redact_shape(command.get("query", {}))}
+        if command_name == "distinct":
+            shape["key"] = command.get("key")
+        return shape
+    if command_name == "insert":
+        return {"documents": len(command.get("documents", []))}
+    return {}
+
+
+def _command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return command.get("collection", "")
+    value = command.get(command_name)
+    return value if isinstance(value, str) else ""
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """
+    Duração por comando/coleção e registro das consultas lentas.
+
+    O formato do comando só é calculado quando ele passa do limite; para os
+    demais guardamos apenas uma referência ao documento do comando entre os
+    eventos de início e fim.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, top_n: int = 20, max_shapes: int = 500, window_seconds: float = 3600.0):
+        self.threshold_ms = threshold_ms
+        self.top_n = top_n
+        self.max_shapes = max_shapes
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Dict[str, Any]]] = {}
+        # (comando, coleção) -> [quantidade, total_ms, max_ms, lentas]
+        self._by_command: Dict[Tuple[str, str], List[float]] = {}
+        # chave do formato -> estatísticas da consulta lenta
+        self._slow: Dict[str, Dict[str, Any]] = {}
+
+    def started(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        self._pending[(event.connection_id, event.request_id)] = (event.command_name, event.command)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        command_name, command = pending
+        collection = _command_collection(command_name, command)
+        duration_ms = event.duration_micros / 1000
+        slow = duration_ms >= self.threshold_ms
+
+        with self._lock:
+            stats = self._by_command.setdefault((command_name, collection), [0, 0.0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += duration_ms
+            stats[2] = max(stats[2], duration_ms)
+            if slow:
+                stats[3] += 1
+        if slow:
+            self._record_slow(command_name, collection, command_shape(command_name, command), duration_ms, failed)
+
+    def _record_slow(self, command_name: str, collection: str, shape: Dict[str, Any], duration_ms: float, failed: bool) -> None:
+        shape_json = json.dumps(shape, default=str)
+        logger.warning(
+            f"Consulta lenta no MongoDB ({duration_ms:.1f}ms{', falhou' if failed else ''}): "
+            f"{command_name} {collection} {shape_json}"
+        )
+        key = f"{command_name}:{collection}:{shape_json}"
+        now = time.time()
+        with self._lock:
+            entry = self._slow.get(key)
+            if entry is None:
+                if len(self._slow) >= self.max_shapes:
+                    self._evict(now)
+                entry = self._slow[key] = {
+                    "command": command_name,
+                    "collection": collection,
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "failures": 0,
+                    "first_seen": now,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["failures"] += int(failed)
+            entry["last_seen"] = now
+
+    def _evict(self, now: float) -> None:
+        """Remove formatos fora da janela; se ainda estiver cheio, o menos custoso"""
+        cutoff = now - self.window_seconds
+        for key in [key for key, entry in self._slow.items() if entry["last_seen"] < cutoff]:
+            del self._slow[key]
+        if len(self._slow) >= self.max_shapes:
+            cheapest = min(self._slow, key=lambda key: self._slow[key]["total_ms"])
+            del self._slow[cheapest]
+
+    def top(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Formatos lentos da janela atual, ordenados pelo tempo total consumido"""
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            entries = [dict(entry) for entry in self._slow.values() if entry["last_seen"] >= cutoff]
+        entries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        for entry in entries:
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+            entry["first_seen"] = datetime.utcfromtimestamp(entry["first_seen"])
+            entry["last_seen"] = datetime.utcfromtimestamp(entry["last_seen"])
+        return entries[:limit or self.top_n]
+
+    def by_command(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._by_command.items())
+        return sorted(
+            (
+                {
+                    "command": command_name,
+                    "collection": collection,
+                    "count": int(count),
+                    "avg_ms": round(total / count, 3) if count else 0.0,
+                    "max_ms": round(maximum, 3),
+                    "slow": int(slow),
+                }
+                for (command_name, collection), (count, total, maximum, slow) in items
+            ),
+            key=lambda stats: stats["avg_ms"] * stats["count"],
+            reverse=True,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_command.clear()
+            self._slow.clear()
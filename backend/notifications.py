@@ -0,0 +1,129 @@
+# backend/notifications.py
+"""
+Envio de notificações por email
+
+Os senders são plugáveis:
+- SMTPSender: envia via SMTP (smtplib em thread, para não bloquear o loop)
+- ConsoleSender: apenas registra a mensagem no log (padrão sem SMTP configurado)
+
+Para depurar localmente sem enviar emails reais, aponte o SMTP para um
+servidor de depuração:
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_USE_TLS=false
+"""
+
+import asyncio
+import logging
+import os
+import smtplib
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+
+from jobs import PermanentJobError
+
+logger = logging.getLogger(__name__)
+
+
+class ConsoleSender:
+    """Sender de desenvolvimento: registra a mensagem no log"""
+
+    async def send(self, message: EmailMessage) -> None:
+        logger.info(f"[email] Para: {message['To']} | Assunto: {message['Subject']}\n{message.get_content()}")
+
+
+class SMTPSender:
+    """
+    Sender SMTP com STARTTLS e autenticação opcionais.
+
+    O envio roda em thread e não pode ser cancelado pela fila de jobs: o
+    `timeout` vale para cada operação de socket (conexão, STARTTLS, login,
+    envio), então o envio inteiro termina em poucos múltiplos dele, bem
+    antes do timeout do job (JOB_TIMEOUT_SECONDS).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def _send_sync(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+    async def send(self, message: EmailMessage) -> None:
+        await asyncio.to_thread(self._send_sync, message)
+
+
+def build_sender_from_env():
+    """Cria o sender a partir das variáveis SMTP_* (ConsoleSender se SMTP_SERVER não existir)"""
+    host = os.environ.get('SMTP_SERVER')
+    if not host:
+        logger.info("SMTP_SERVER não configurado - notificações serão apenas registradas no log")
+        return ConsoleSender()
+    return SMTPSender(
+        host=host,
+        port=int(os.environ.get('SMTP_PORT', '587')),
+        username=os.environ.get('SMTP_USERNAME'),
+        password=os.environ.get('SMTP_PASSWORD'),
+        use_tls=os.environ.get('SMTP_USE_TLS', 'true').lower() == 'true',
+        timeout=float(os.environ.get('SMTP_TIMEOUT_SECONDS', '10')),
+    )
+
+
+def _header_value(value: Any) -> str:
+    """Junta numa só linha um valor enviado pelo formulário (CR/LF no cabeçalho invalida o email)"""
+    return " ".join(str(value).split())
+
+
+def build_contact_notification(submission: Dict[str, Any], sender_address: str, recipients: List[str]) -> EmailMessage:
+    """Monta o email de aviso de um novo contato recebido pelo site"""
+    message = EmailMessage()
+    message["From"] = sender_address
+    message["To"] = ", ".join(recipients)
+    message["Reply-To"] = submission["email"]
+    message["Subject"] = f"Novo contato pelo site: {_header_value(submission['name'])}"
+
+    services = ", ".join(submission.get("service_interest") or []) or "Não informado"
+    message.set_content(
+        "Um novo formulário de contato foi enviado.\n\n"
+        f"Nome: {submission['name']}\n"
+        f"Email: {submission['email']}\n"
+        f"Empresa: {submission.get('company') or 'Não informada'}\n"
+        f"Telefone: {submission.get('phone') or 'Não informado'}\n"
+        f"Serviços de interesse: {services}\n"
+        f"Recebido em: {submission.get('created_at')}\n\n"
+        f"Mensagem:\n{submission['message']}\n"
+    )
+    return message
+
+
+def make_contact_notification_handler(sender, sender_address: str, recipients: List[str]):
+    """Cria o handler de job que envia a notificação de contato"""
+
+    async def handle(payload: Dict[str, Any]) -> None:
+        if not recipients:
+            logger.warning("NOTIFICATION_EMAIL não configurado - notificação de contato ignorada")
+            return
+        try:
+            message = build_contact_notification(payload, sender_address, recipients)
+        except (KeyError, ValueError) as e:
+            # O mesmo payload falharia em todas as tentativas
+            raise PermanentJobError(f"notificação de contato inválida: {e}") from e
+        await sender.send(message)
+
+    return handle
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Publicação do conteúdo público (portfólio e depoimentos) como JSON estático
+
+O conteúdo muda pouco, mas cada visitante chamava o backend para buscá-lo.
+A publicação grava as listas já serializadas (os mesmos bytes de
+GET /api/portfolio e GET /api/testimonials) em arquivos versionados pelo
+hash do conteúdo, com variantes gzip e brotli ao lado:
+
+    <saida>/portfolio.3f9a0c1b2d4e.json  (.json.gz, .json.br)
+    <saida>/testimonials.8b7e6a5d4c3f.json
+    <saida>/manifest.json                 {"files": {"portfolio": {"path": ...}}}
+
+Os arquivos versionados nunca mudam (cache imutável na CDN); só o manifest
+é revalidado. Publicar o mesmo conteúdo de novo não grava nada, então vários
+workers podem publicar ao mesmo tempo. As últimas keep_versions versões de
+cada arquivo são mantidas para quem ainda tem o manifest anterior.
+
+No servidor, a publicação roda após as escritas (com debounce) quando
+STATIC_CONTENT_DIR está definido. Pela linha de comando (pasta backend):
+
+    python publish.py --out ../frontend/public/content
+    python publish.py --out ./content --api https://vertextarget-backend.onrender.com
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from compression import choose_encoding, compress, server_encodings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_NAMES = ("portfolio", "testimonials")
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+VERSIONED_FILE = re.compile(rf"^(?P<name>[a-z_]+)\.(?P<hash>[0-9a-f]{{{HASH_LENGTH}}})\.json$")
+
+# Cache-Control dos arquivos publicados
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+@dataclass
+class PublishResult:
+    manifest: Dict
+    written: List[str] = field(default_factory=list)
+    pruned: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.written)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Grava em arquivo temporário e renomeia: leitores nunca veem um arquivo pela metade"""
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(data)
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+class StaticContentPublisher:
+    def __init__(
+        self,
+        output_dir: str,
+        keep_versions: int = 5,
+        debounce_seconds: float = 2.0,
+        render: Optional[Callable[[], Awaitable[Dict[str, bytes]]]] = None,
+    ):
+        self.output_dir = Path(output_dir)
+        self.keep_versions = max(1, keep_versions)
+        self.debounce_seconds = debounce_seconds
+        self.render = render
+        self.publishes = 0
+        self.last_result: Optional[PublishResult] = None
+        self._pending: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------ arquivos
+
+    def publish(self, documents: Dict[str, bytes]) -> PublishResult:
+        """Grava as versões novas e o manifest (bloqueante; use asyncio.to_thread no servidor)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        files = {}
+        written = []
+        for name, body in documents.items():
+            digest = hashlib.sha256(body).hexdigest()
+            filename = f"{name}.{digest[:HASH_LENGTH]}.json"
+            path = self.output_dir / filename
+            if not path.exists():
+                for encoding in server_encodings():
+                    _write_atomic(path.with_name(filename + ENCODING_SUFFIXES[encoding]),
+                                  compress(body, encoding, gzip_level=9, brotli_quality=11))
+                # O .json por último: a existência dele indica que as variantes estão completas
+                _write_atomic(path, body)
+                written.append(filename)
+            files[name] = {
+                "path": filename,
+                "sha256": digest,
+                "bytes": len(body),
+                "count": len(json.loads(body)) if body.startswith(b"[") else None,
+            }
+
+        manifest_path = self.output_dir / MANIFEST_NAME
+        previous = self.read_manifest()
+        if written or previous is None or previous.get("files") != files:
+            manifest = {
+                "version": hashlib.sha256("".join(f["sha256"] for f in files.values()).encode()).hexdigest()[:HASH_LENGTH],
+                "generated_at": datetime.utcnow().isoformat() + "Z",
+                "files": files,
+            }
+            _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode())
+            written.append(MANIFEST_NAME)
+        else:
+            manifest = previous
+
+        result = PublishResult(manifest=manifest, written=written, pruned=self._prune(files))
+        self.last_result = result
+        self.publishes += 1
+        return result
+
+    def read_manifest(self) -> Optional[Dict]:
+        try:
+            return json.loads((self.output_dir / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _prune(self, current: Dict[str, Dict]) -> List[str]:
+        """Remove versões antigas além de keep_versions (nunca a atual)"""
+        versions: Dict[str, List[Path]] = {}
+        for path in self.output_dir.glob("*.json"):
+            match = VERSIONED_FILE.match(path.name)
+            if match:
+                versions.setdefault(match["name"], []).append(path)
+        pruned = []
+        for name, paths in versions.items():
+            current_path = current.get(name, {}).get("path")
+            paths.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+            for path in [path for path in paths if path.name != current_path][self.keep_versions - 1:]:
+                for variant in [path] + [path.with_name(path.name + suffix) for suffix in ENCODING_SUFFIXES.values()]:
+                    variant.unlink(missing_ok=True)
+                pruned.append(path.name)
+        return pruned
+
+    def resolve(self, filename: str, accept_encoding: Optional[str] = None):
+        """
+        Caminho do arquivo publicado (e a codificação escolhida) para servir
+        em /content; None se o nome não é um arquivo publicado
+        """
+        if filename != MANIFEST_NAME and not VERSIONED_FILE.match(filename):
+            return None
+        path = self.output_dir / filename
+        if not path.is_file():
+            return None
+        if filename != MANIFEST_NAME:
+            encoding = choose_encoding(accept_encoding, server_encodings())
+            if encoding:
+                variant = path.with_name(filename + ENCODING_SUFFIXES[encoding])
+                if variant.is_file():
+                    return variant, encoding
+        return path, None
+
+    # ------------------------------------------------------------------ servidor
+
+    async def publish_now(self) -> PublishResult:
+        async with self._lock:
+            documents = await self.render()
+            result = await asyncio.to_thread(self.publish, documents)
+        if result.changed:
+            logger.info(f"Conteúdo estático publicado (versão {result.manifest['version']}): {', '.join(result.written)}")
+        return result
+
+    def request_publish(self) -> None:
+        """Agenda uma publicação; escritas em sequência resultam em uma única publicação"""
+        loop = asyncio.get_running_loop()
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = loop.call_later(self.debounce_seconds, self._start)
+
+    def _start(self) -> None:
+        self._pending = None
+        self._task = asyncio.create_task(self._publish_logging_errors(), name="static-content-publish")
+
+    async def _publish_logging_errors(self) -> None:
+        try:
+            await self.publish_now()
+        except Exception as e:
+            logger.error(f"Erro ao publicar o conteúdo estático: {e}")
+
+    async def stop(self) -> None:
+        """Executa a publicação pendente (se houver) antes de desligar"""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+            await self._publish_logging_errors()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# =============================================================================
+# LINHA DE COMANDO
+# =============================================================================
+
+async def _render_from_api(base_url: str) -> Dict[str, bytes]:
+    """Baixa as listas da API publicada (não precisa de acesso ao MongoDB)"""
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url.rstrip("/"), timeout=30) as http:
+        documents = {}
+        for name in CONTENT_NAMES:
+            response = await http.get(f"/api/{name}", headers={"Accept-Encoding": "identity"})
+            response.raise_for_status()
+            documents[name] = response.content
+        return documents
+
+
+async def _render_from_database() -> Dict[str, bytes]:
+    """Lê o MongoDB com a configuração e os modelos do server (mesmos bytes da API)"""
+    import server
+
+    try:
+        return await server.render_static_content()
+    finally:
+        server.client.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Publica portfólio e depoimentos como JSON estático versionado")
+    parser.add_argument("--out", default=os.environ.get("STATIC_CONTENT_DIR", "../frontend/public/content"),
+                        help="Pasta de saída (padrão: STATIC_CONTENT_DIR ou ../frontend/public/content)")
+    parser.add_argument("--api", help="Lê o conteúdo desta API em vez do MongoDB (ex.: https://backend.onrender.com)")
+    parser.add_argument("--keep", type=int, default=int(os.environ.get("STATIC_CONTENT_KEEP_VERSIONS", "5")),
+                        help="Versões mantidas de cada arquivo")
+    args = parser.parse_args()
+
+    documents = await (_render_from_api(args.api) if args.api else _render_from_database())
+    result = StaticContentPublisher(args.out, keep_versions=args.keep).publish(documents)
+
+    print(f"📦 Versão {result.manifest['version']} em {Path(args.out).resolve()}")
+    for name, info in result.manifest["files"].items():
+        print(f"   {name}: {info['path']} ({info['count']} itens, {info['bytes']} bytes)")
+    if result.changed:
+        print(f"✅ Gravados: {', '.join(result.written)}")
+    else:
+        print("✅ Nada mudou desde a última publicação")
+    if result.pruned:
+        print(f"🧹 Versões antigas removidas: {', '.join(result.pruned)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
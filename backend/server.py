@@ -3,27 +3,50 @@
 # =============================================================================
 # IMPORTS E CONFIGURAÇÕES INICIAIS
 # =============================================================================
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient # Mantemos o seu motor assíncrono
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import CollectionInvalid, ConnectionFailure, OperationFailure
 import os
 import logging # Importar logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, StringConstraints, TypeAdapter, field_validator
+from typing import Annotated, List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timedelta
 import jwt
-from passlib.context import CryptContext
 import re
-import google.generativeai as genai
+import html
+import unicodedata
 import hashlib
+import secrets
 import asyncio
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from collections import Counter
 import time
 
+from compression import CompressionMiddleware, PrecompressedResponseCache
+from crm_outbox import LEAD_FIELDS, CRMOutboxDispatcher, new_outbox_marker
+from jobs import JobQueue, new_job_marker
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, AIMetrics, HTTPMetrics, MetricsRegistry, MongoCommandMetrics, PrometheusMiddleware
+from mongo_monitoring import PoolMetricsListener, SlowQueryLog, build_client_options
+from notifications import build_sender_from_env, make_contact_notification_handler
+from status_rollups import StatusRollups
+from cache_invalidation import ChangeStreamInvalidator, UserCache
+from event_bus import EventBus
+from publish import IMMUTABLE_CACHE_CONTROL, MANIFEST_CACHE_CONTROL, MANIFEST_NAME, StaticContentPublisher
+from server_timing import ServerTimingListener, ServerTimingMiddleware, ServerTimingRoute, timed, timed_async
+from tracing import KIND_CLIENT, MongoTracingListener, TracingMiddleware, build_tracer_from_env
+from write_buffer import WriteBehindBuffer
+
 # Configuração do ambiente será controlada no bloco de conexão do banco de dados
 ROOT_DIR = Path(__file__).parent
 
@@ -62,21 +85,13 @@ possible_env_vars = [
     "MONGODB_CONNECTION_STRING"
 ]
 
-logger.info(">>> TENTANDO MÚLTIPLAS VARIÁVEIS DE AMBIENTE:") # Alterado para logger.info
 for var_name in possible_env_vars:
     value = os.getenv(var_name)
-    logger.info(f">>> {var_name}: {value}") # Alterado para logger.info
     if value and not MONGO_URI:
         MONGO_URI = value
         logger.info(f">>> USANDO VARIÁVEL: {var_name}") # Alterado para logger.info
 
-# Método 3: Verificar todas as variáveis de ambiente disponíveis
-logger.info(">>> LISTANDO TODAS AS VARIÁVEIS DE AMBIENTE QUE CONTÊM 'MONGO':") # Alterado para logger.info
-for key, value in os.environ.items():
-    if 'MONGO' in key.upper():
-        logger.info(f">>> ENV VAR ENCONTRADA: {key} = {value}") # Alterado para logger.info
-
-# Método 4: Validação da string de conexão
+# Método 3: Validação da string de conexão
 if MONGO_URI:
     if 'mongodb+srv' in MONGO_URI:
         logger.info(">>> ✅ CONEXÃO ATLAS DETECTADA (PRODUÇÃO)") # Alterado para logger.info
@@ -85,16 +100,55 @@ if MONGO_URI:
     else:
         logger.info(">>> ❓ TIPO DE CONEXÃO DESCONHECIDO") # Alterado para logger.info
 
-logger.info(f">>> CONEXÃO FINAL SELECIONADA: {MONGO_URI}") # Alterado para logger.info
+def redact_mongo_uri(uri: str) -> str:
+    """Remove usuário e senha da string de conexão antes de registrá-la no log"""
+    return re.sub(r'//[^/@]+@', '//***@', uri)
+
+if MONGO_URI:
+    logger.info(f">>> CONEXÃO FINAL SELECIONADA: {redact_mongo_uri(MONGO_URI)}") # Alterado para logger.info
 
 client = None
 db = None
 
+# Pool de conexões configurável (MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, timeouts,
+# MONGO_COMPRESSORS, MONGO_READ_PREFERENCE) e métricas de checkout do pool
+MONGO_CLIENT_OPTIONS = build_client_options()
+pool_metrics = PoolMetricsListener()
+
+# Log de consultas lentas: comandos acima de MONGO_SLOW_QUERY_MS vão para o log
+# (com o filtro sem valores) e para o top-N em GET /api/admin/db/slow-queries
+slow_query_log = SlowQueryLog(
+    threshold_ms=float(os.environ.get('MONGO_SLOW_QUERY_MS', '100')),
+    top_n=int(os.environ.get('MONGO_SLOW_QUERY_TOP', '20'))
+)
+
+# Métricas no formato Prometheus (GET /metrics), desligadas por padrão. O endpoint
+# expõe tráfego por rota, tempos do MongoDB e erros do Gemini: só é servido com
+# METRICS_TOKEN definido (sem token responde 404, como se não existisse)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+if METRICS_ENABLED and not METRICS_TOKEN:
+    logger.warning("METRICS_ENABLED sem METRICS_TOKEN - GET /metrics responderá 404 até o token ser definido")
+metrics_registry = MetricsRegistry(namespace="vertextarget")
+mongo_command_metrics = MongoCommandMetrics(metrics_registry)
+mongo_event_listeners = [pool_metrics, slow_query_log] + ([mongo_command_metrics] if METRICS_ENABLED else [])
+
+# Cabeçalho Server-Timing com auth, db, cache, ai e serialize (depuração em produção)
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+if SERVER_TIMING_ENABLED:
+    mongo_event_listeners.append(ServerTimingListener())
+
+# Tracing de requisições (TRACING_ENABLED, TRACING_SAMPLE_RATIO, TRACING_EXPORTER=json|otlp)
+tracer = build_tracer_from_env()
+if tracer.enabled:
+    mongo_event_listeners.append(MongoTracingListener(tracer))
+
 if not MONGO_URI:
     logger.error("--- ERRO CRÍTICO: NENHUMA VARIÁVEL DE AMBIENTE MONGO ENCONTRADA") # Alterado para logger.error
 else:
     try:
-        client = AsyncIOMotorClient(MONGO_URI)
+        client = AsyncIOMotorClient(MONGO_URI, event_listeners=mongo_event_listeners, **MONGO_CLIENT_OPTIONS)
+        logger.info(f">>> OPÇÕES DO POOL MONGODB: {MONGO_CLIENT_OPTIONS or 'defaults do driver'}")
         db_name = os.environ.get('DB_NAME', 'vertextarget_db')
         db = client[db_name]
         logger.debug(f">>> DEBUG: Usando banco de dados: {db_name}") # Alterado para logger.debug
@@ -108,20 +162,118 @@ else:
 # =============================================================================
 
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt são carregados no primeiro login ou cadastro, não na importação do módulo
+_pwd_context = None
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
 security = HTTPBearer()
 JWT_SECRET = os.environ.get('JWT_SECRET', 'sua-chave-jwt-super-secreta-mude-em-producao')
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
 JWT_EXPIRATION_MINUTES = int(os.environ.get('JWT_EXPIRATION_MINUTES', '1440'))
 
-logger.debug(f">>> DEBUG: JWT_SECRET = {JWT_SECRET}") # Alterado para logger.debug
 logger.debug(f">>> DEBUG: JWT_ALGORITHM = {JWT_ALGORITHM}") # Alterado para logger.debug
 logger.debug(f">>> DEBUG: JWT_EXPIRATION_MINUTES = {JWT_EXPIRATION_MINUTES}") # Alterado para logger.debug
 
+# Fast JSON (opcional): valida listas com TypeAdapter e serializa direto para bytes
+FAST_JSON_RESPONSES = os.environ.get('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+try:
+    import orjson  # noqa: F401 - usado pelo ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Compressão de respostas e cache pré-comprimido das listas públicas
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', '500'))
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '300'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+
+# Invalidação dos caches em memória entre workers (change streams do MongoDB)
+# Os TTLs acima valem com o change stream ativo; sem ele (mongod standalone ou
+# stream interrompido) os caches usam CACHE_FALLBACK_TTL_SECONDS
+CHANGE_STREAM_INVALIDATION_ENABLED = os.environ.get('CHANGE_STREAM_INVALIDATION_ENABLED', 'true').lower() == 'true'
+CACHE_FALLBACK_TTL_SECONDS = float(os.environ.get('CACHE_FALLBACK_TTL_SECONDS', '5'))
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '300'))
+
+# Eventos ao vivo do painel administrativo (SSE em GET /api/admin/events)
+ADMIN_EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('ADMIN_EVENTS_HEARTBEAT_SECONDS', '15'))
+ADMIN_EVENTS_MAX_STREAM_SECONDS = float(os.environ.get('ADMIN_EVENTS_MAX_STREAM_SECONDS', '300'))
+ADMIN_EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('ADMIN_EVENTS_MAX_SUBSCRIBERS', '100'))
+ADMIN_EVENTS_TICKET_SECONDS = int(os.environ.get('ADMIN_EVENTS_TICKET_SECONDS', '60'))
+
+# Publicação do portfólio e dos depoimentos como JSON estático versionado (ver publish.py)
+# Desligada se STATIC_CONTENT_DIR não estiver definido
+STATIC_CONTENT_DIR = os.environ.get('STATIC_CONTENT_DIR')
+STATIC_CONTENT_KEEP_VERSIONS = int(os.environ.get('STATIC_CONTENT_KEEP_VERSIONS', '5'))
+STATIC_PUBLISH_DEBOUNCE_SECONDS = float(os.environ.get('STATIC_PUBLISH_DEBOUNCE_SECONDS', '2'))
+
+# Notificações de contato (enviadas pela fila de jobs, fora do caminho da requisição)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_TIMEOUT_SECONDS = float(os.environ.get('JOB_TIMEOUT_SECONDS', '300'))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+NOTIFICATION_EMAIL = [email.strip() for email in os.environ.get('NOTIFICATION_EMAIL', '').split(',') if email.strip()]
+SMTP_FROM = os.environ.get('SMTP_FROM', os.environ.get('SMTP_USERNAME', 'no-reply@vertextarget.com'))
+
+# Integração com CRM (outbox de leads sincronizado em lotes em background)
+CRM_ENDPOINT = os.environ.get('CRM_ENDPOINT')
+CRM_API_KEY = os.environ.get('CRM_API_KEY')
+CRM_BATCH_SIZE = int(os.environ.get('CRM_BATCH_SIZE', '50'))
+CRM_SYNC_INTERVAL_SECONDS = float(os.environ.get('CRM_SYNC_INTERVAL_SECONDS', '5'))
+
+# Buffer de escrita (write-behind) para contatos e status checks
+WRITE_BUFFER_ENABLED = os.environ.get('WRITE_BUFFER_ENABLED', 'false').lower() == 'true'
+WRITE_BUFFER_MAX_BATCH = int(os.environ.get('WRITE_BUFFER_MAX_BATCH', '500'))
+WRITE_BUFFER_FLUSH_MS = int(os.environ.get('WRITE_BUFFER_FLUSH_MS', '50'))
+WRITE_BUFFER_DURABILITY = os.environ.get('WRITE_BUFFER_DURABILITY', 'flush')
+
+# Status checks (legado): coleção time-series com retenção e rollups por minuto/hora
+STATUS_CHECK_RETENTION_DAYS = int(os.environ.get('STATUS_CHECK_RETENTION_DAYS', '30'))
+STATUS_ROLLUP_FLUSH_SECONDS = float(os.environ.get('STATUS_ROLLUP_FLUSH_SECONDS', '5'))
+STATUS_ROLLUP_MINUTE_RETENTION_HOURS = int(os.environ.get('STATUS_ROLLUP_MINUTE_RETENTION_HOURS', '48'))
+STATUS_ROLLUP_HOUR_RETENTION_DAYS = int(os.environ.get('STATUS_ROLLUP_HOUR_RETENTION_DAYS', '90'))
+
 # Gemini AI Configuration
+# O SDK do Gemini é pesado (~1s de importação): é importado e configurado na primeira geração
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+GEMINI_MODEL = 'gemini-1.5-pro-latest'
+# GEMINI_BACKEND=fake usa o Gemini de teste em processo (gemini_stub.py), sem rede nem chave
+GEMINI_BACKEND = os.environ.get('GEMINI_BACKEND', 'google').lower()
+# Endpoint alternativo para o SDK (ex.: python gemini_stub.py --port 8788 -> http://localhost:8788)
+GEMINI_API_ENDPOINT = os.environ.get('GEMINI_API_ENDPOINT')
+_genai = None
+_fake_gemini = None
+
+def get_genai():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        if GEMINI_API_ENDPOINT:
+            genai.configure(api_key=GEMINI_API_KEY, transport="rest", client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+        else:
+            genai.configure(api_key=GEMINI_API_KEY)
+        _genai = genai
+    return _genai
+
+def gemini_available() -> bool:
+    return GEMINI_BACKEND == 'fake' or bool(GEMINI_API_KEY)
+
+def get_gemini_model():
+    """Modelo real ou o de teste; os dois expõem generate_content(prompt) bloqueante"""
+    global _fake_gemini
+    if GEMINI_BACKEND == 'fake':
+        if _fake_gemini is None:
+            from gemini_stub import FakeGenerativeModel
+            _fake_gemini = FakeGenerativeModel(GEMINI_MODEL)
+            logger.info(f"🤖 Usando o Gemini de teste (latência {_fake_gemini.injector.config.latency})")
+        return _fake_gemini
+    return get_genai().GenerativeModel(GEMINI_MODEL)
 
 # =============================================================================
 # AI STRATEGY CACHE SYSTEM
@@ -146,6 +298,9 @@ class AIStrategyCache:
     """
     Sistema de cache em memória para estratégias de IA
     Implementa TTL (Time To Live) e estatísticas de uso
+    
+    Com load() as entradas também são gravadas em uma coleção do MongoDB
+    (write-through), sobrevivendo a reinícios e ao sleep do Render.
     """
     
     def __init__(self, ttl_hours: int = 24):
@@ -153,6 +308,26 @@ class AIStrategyCache:
         self.ttl_hours = ttl_hours
         self.cache_hits = 0
         self.cache_misses = 0
+        self.evictions = 0
+        self.collection = None
+    
+    @timed_async("cache")
+    @tracer.traced("cache.load", cache="ai_strategy")
+    async def load(self, collection) -> int:
+        """Carrega as entradas persistidas ainda válidas e passa a persistir as novas"""
+        self.collection = collection
+        # O TTL index remove do banco as entradas expiradas
+        await collection.create_index("timestamp", expireAfterSeconds=self.ttl_hours * 3600)
+        cutoff = datetime.utcnow() - timedelta(hours=self.ttl_hours)
+        loaded = 0
+        async for document in collection.find({"timestamp": {"$gt": cutoff}}):
+            self.cache[document["_id"]] = CacheEntry(
+                strategy=document["strategy"],
+                timestamp=document["timestamp"],
+                hit_count=document.get("hit_count", 0)
+            )
+            loaded += 1
+        return loaded
         
     def _generate_cache_key(self, industry: str, objective: str) -> str:
         """Gera uma chave única para a combinação industry + objective"""
@@ -172,7 +347,10 @@ class AIStrategyCache:
         ]
         for key in expired_keys:
             del self.cache[key]
+        self.evictions += len(expired_keys)
             
+    @timed_async("cache")
+    @tracer.traced("cache.get", cache="ai_strategy")
     async def get(self, industry: str, objective: str) -> Optional[CacheEntry]:
         """
         Busca uma estratégia no cache
@@ -192,11 +370,14 @@ class AIStrategyCache:
             else:
                 # Remove entrada expirada
                 del self.cache[cache_key]
+                self.evictions += 1
         
         self.cache_misses += 1
         logger.info(f"Cache MISS para {industry}:{objective}")
         return None
     
+    @timed_async("cache")
+    @tracer.traced("cache.set", cache="ai_strategy")
     async def set(self, industry: str, objective: str, strategy: str) -> None:
         """Armazena uma estratégia no cache"""
         cache_key = self._generate_cache_key(industry, objective)
@@ -209,6 +390,17 @@ class AIStrategyCache:
         
         logger.info(f"Cache SET para {industry}:{objective}")
         
+        if self.collection is not None:
+            try:
+                await self.collection.update_one(
+                    {"_id": cache_key},
+                    {"$set": {"strategy": strategy, "timestamp": self.cache[cache_key].timestamp, "hit_count": 0}},
+                    upsert=True
+                )
+            except Exception as e:
+                # A persistência é best-effort: a entrada continua válida em memória
+                logger.warning(f"Falha ao persistir entrada do cache de IA: {e}")
+        
         # Limpeza automática de entradas expiradas a cada nova inserção
         self._cleanup_expired()
     
@@ -232,31 +424,364 @@ class AIStrategyCache:
             newest_entry=newest
         )
     
-    def clear(self) -> int:
+    @timed_async("cache")
+    @tracer.traced("cache.clear", cache="ai_strategy")
+    async def clear(self) -> int:
         """Limpa todo o cache e retorna o número de entradas removidas"""
         count = len(self.cache)
         self.cache.clear()
+        if self.collection is not None:
+            await self.collection.delete_many({})
         logger.info(f"Cache CLEARED - {count} entradas removidas")
         return count
 
 # Instanciar o sistema de cache (TTL de 24 horas)
 ai_cache = AIStrategyCache(ttl_hours=24)
 
+# Cache das respostas públicas (portfólio e depoimentos), guardadas já comprimidas
+response_cache = PrecompressedResponseCache(
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES
+)
+
+# Usuários lidos por get_current_user (uma consulta a menos por requisição autenticada)
+user_cache = UserCache(ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+# Change stream que invalida os caches acima quando outro processo escreve
+cache_invalidator = ChangeStreamInvalidator(["portfolio", "testimonials", "users", "contact_submissions"])
+
+# Pub/sub dos eventos do painel (um por worker; ver relay_remote_admin_events)
+admin_events = EventBus(max_subscribers=ADMIN_EVENTS_MAX_SUBSCRIBERS)
+ADMIN_EVENT_KINDS = {"contact_submissions": "contact", "portfolio": "portfolio", "testimonials": "testimonial"}
+
+def publish_admin_event(collection: str, action: str, data: Dict[str, Any], document_key: Any = None):
+    """Publica "<tipo>.<ação>" para os admins conectados a este worker"""
+    admin_events.publish(f"{ADMIN_EVENT_KINDS[collection]}.{action}", data, document_key=document_key)
+
+def relay_remote_admin_events(collection: str, operation: str, document_key: Dict[str, Any]):
+    """
+    Escritas de outros workers chegam pelo change stream só com o _id: viram
+    "<tipo>.changed" e o painel recarrega aquela lista. As deste worker já
+    foram publicadas com o documento completo e são ignoradas.
+    """
+    kind = ADMIN_EVENT_KINDS.get(collection)
+    if kind is None or operation not in ("insert", "update", "replace", "delete"):
+        return
+    if collection == "contact_submissions" and operation != "insert":
+        return  # atualizações do outbox do CRM não interessam ao painel
+    if admin_events.is_local(document_key.get("_id")):
+        return
+    admin_events.publish(f"{kind}.changed", {"operation": operation})
+
+def invalidate_local_caches(collection: str, operation: str, document_key: Dict[str, Any]):
+    if collection == "portfolio":
+        response_cache.invalidate("/api/portfolio")
+        request_static_publish()
+    elif collection == "testimonials":
+        response_cache.invalidate("/api/testimonials")
+        request_static_publish()
+    elif collection == "users" and operation != "insert":
+        if "_id" in document_key:
+            user_cache.invalidate(object_id=document_key["_id"])
+        else:
+            user_cache.invalidate()
+
+def apply_cache_ttls(change_stream_active: bool):
+    """TTL longo com o change stream ativo; curto enquanto outros workers podem não avisar"""
+    if change_stream_active or not CHANGE_STREAM_INVALIDATION_ENABLED:
+        response_cache.ttl_seconds = RESPONSE_CACHE_TTL_SECONDS
+        user_cache.ttl_seconds = USER_CACHE_TTL_SECONDS
+    else:
+        response_cache.ttl_seconds = min(RESPONSE_CACHE_TTL_SECONDS, CACHE_FALLBACK_TTL_SECONDS)
+        user_cache.ttl_seconds = min(USER_CACHE_TTL_SECONDS, CACHE_FALLBACK_TTL_SECONDS)
+
+cache_invalidator.add_handler(invalidate_local_caches)
+cache_invalidator.add_handler(relay_remote_admin_events)
+cache_invalidator.on_mode_change(apply_cache_ttls)
+
+# Conteúdo público publicado como arquivos estáticos (render_static_content fica junto das rotas)
+static_publisher = StaticContentPublisher(
+    STATIC_CONTENT_DIR,
+    keep_versions=STATIC_CONTENT_KEEP_VERSIONS,
+    debounce_seconds=STATIC_PUBLISH_DEBOUNCE_SECONDS,
+    render=lambda: render_static_content()
+) if STATIC_CONTENT_DIR else None
+
+def request_static_publish():
+    if static_publisher is not None:
+        static_publisher.request_publish()
+apply_cache_ttls(False)
+
+# Métricas de HTTP e do Gemini; caches e pool são lidos apenas na coleta
+http_metrics = HTTPMetrics(metrics_registry)
+ai_metrics = AIMetrics(metrics_registry)
+metrics_registry.callback(
+    "cache_entries", "Entradas atualmente em cada cache", ("cache",),
+    lambda: [(("ai_strategy",), len(ai_cache.cache)), (("response",), len(response_cache.entries)), (("user",), len(user_cache.entries))]
+)
+metrics_registry.callback(
+    "cache_hits_total", "Acertos de cache", ("cache",),
+    lambda: [(("ai_strategy",), ai_cache.cache_hits), (("response",), response_cache.hits), (("user",), user_cache.hits)], kind="counter"
+)
+metrics_registry.callback(
+    "cache_misses_total", "Faltas de cache", ("cache",),
+    lambda: [(("ai_strategy",), ai_cache.cache_misses), (("response",), response_cache.misses), (("user",), user_cache.misses)], kind="counter"
+)
+metrics_registry.callback(
+    "cache_evictions_total", "Entradas removidas do cache por expiração", ("cache",),
+    lambda: [(("ai_strategy",), ai_cache.evictions), (("response",), response_cache.evictions), (("user",), user_cache.evictions)], kind="counter"
+)
+metrics_registry.callback(
+    "mongo_pool_connections", "Conexões do pool do MongoDB", ("state",),
+    lambda: [(("open",), pool_metrics.snapshot()["connections_open"]), (("checked_out",), pool_metrics.checked_out)]
+)
+
+# Fila de jobs em background (persistida na coleção 'jobs')
+job_queue = JobQueue(
+    workers=JOB_WORKERS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    timeout_seconds=JOB_TIMEOUT_SECONDS,
+    retention_seconds=JOB_RETENTION_DAYS * 24 * 3600,
+)
+job_queue.register(
+    "contact_notification",
+    make_contact_notification_handler(build_sender_from_env(), SMTP_FROM, NOTIFICATION_EMAIL)
+)
+# O job de notificação nasce do marcador 'notification' gravado no próprio contato
+job_queue.relay("contact_submissions", "contact_notification", LEAD_FIELDS, marker_field="notification")
+
+# Dispatcher do outbox de leads para o CRM
+crm_outbox = CRMOutboxDispatcher(
+    endpoint=CRM_ENDPOINT,
+    api_key=CRM_API_KEY,
+    batch_size=CRM_BATCH_SIZE,
+    interval_seconds=CRM_SYNC_INTERVAL_SECONDS
+)
+
+# Buffer de escrita para inserções de alto volume
+write_buffer = WriteBehindBuffer(
+    enabled=WRITE_BUFFER_ENABLED,
+    max_batch_size=WRITE_BUFFER_MAX_BATCH,
+    flush_interval_seconds=WRITE_BUFFER_FLUSH_MS / 1000,
+    durability=WRITE_BUFFER_DURABILITY
+)
+
+# Rollups dos status checks (contagem e último horário por cliente)
+status_rollups = StatusRollups(
+    flush_interval_seconds=STATUS_ROLLUP_FLUSH_SECONDS,
+    minute_retention=timedelta(hours=STATUS_ROLLUP_MINUTE_RETENTION_HOURS),
+    hour_retention=timedelta(days=STATUS_ROLLUP_HOUR_RETENTION_DAYS)
+)
+
+# =============================================================================
+# CICLO DE VIDA DA APLICAÇÃO (LIFESPAN E READINESS)
+# =============================================================================
+
+# Rotas que respondem mesmo antes do aquecimento terminar (liveness e readiness)
+READINESS_EXEMPT_PATHS = {"/api/", "/api/health", "/api/ready", "/metrics"}
+
+# Workers repostos pelo launcher.py só aceitam conexões depois de aquecidos:
+# os demais workers seguem atendendo e a reciclagem não gera 503
+WARM_UP_BEFORE_SERVING = os.environ.get('WARM_UP_BEFORE_SERVING', 'false').lower() == 'true'
+WARM_UP_BEFORE_SERVING_TIMEOUT_SECONDS = float(os.environ.get('WARM_UP_BEFORE_SERVING_TIMEOUT_SECONDS', '30'))
+
+# Erros do servidor que passam sozinhos (eleição de primário, nó reiniciando, rede);
+# os demais (ex.: IndexOptionsConflict) se repetiriam em toda tentativa
+TRANSIENT_MONGO_ERROR_CODES = {
+    6,      # HostUnreachable
+    7,      # HostNotFound
+    89,     # NetworkTimeout
+    91,     # ShutdownInProgress
+    189,    # PrimarySteppedDown
+    262,    # ExceededTimeLimit
+    9001,   # SocketException
+    10107,  # NotWritablePrimary
+    11600,  # InterruptedAtShutdown
+    11602,  # InterruptedDueToReplStateChange
+    13435,  # NotPrimaryNoSecondaryOk
+    13436,  # NotPrimaryOrSecondary
+}
+
+def is_transient_mongo_error(error: Exception) -> bool:
+    """ConnectionFailure cobre AutoReconnect, NetworkTimeout e ServerSelectionTimeoutError"""
+    if isinstance(error, ConnectionFailure):
+        return True
+    if isinstance(error, OperationFailure):
+        return error.code in TRANSIENT_MONGO_ERROR_CODES or error.has_error_label("RetryableWriteError")
+    return False
+
+@dataclass
+class ReadinessState:
+    ready: bool = False
+    phase: str = "aguardando"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    ready_at: Optional[datetime] = None
+
+readiness = ReadinessState()
+
+async def prewarm_connection_pool() -> int:
+    """Abre as conexões do pool (até minPoolSize) antes de aceitar tráfego"""
+    connections = max(1, MONGO_CLIENT_OPTIONS.get("minPoolSize", 0))
+    # Comandos concorrentes forçam o driver a abrir conexões em paralelo
+    await asyncio.gather(*(db.command("ping") for _ in range(connections)))
+    return pool_metrics.snapshot()["connections_open"]
+
+async def warm_up() -> None:
+    """
+    Prepara a aplicação: pool de conexões, índices, caches persistidos e
+    workers em background. Repete com backoff enquanto o erro for transitório
+    (MongoDB fora do ar, eleição de primário); um erro determinístico encerra
+    o aquecimento na hora, com a fase e o erro em /api/ready.
+    """
+    if db is None:
+        readiness.phase = "sem_banco"
+        readiness.last_error = "Cliente MongoDB não configurado"
+        logger.error("--- ERRO CRÍTICO: aplicação sem banco de dados - permanecerá indisponível (503)")
+        return
+    
+    delay = 1.0
+    while True:
+        readiness.attempts += 1
+        try:
+            readiness.phase = "conectando"
+            connections = await prewarm_connection_pool()
+            logger.info(f"Conexão com MongoDB estabelecida com sucesso! ({connections} conexões abertas)")
+            
+            readiness.phase = "indices"
+            await ensure_search_indexes()
+            logger.info("Índices de busca textual verificados")
+            await ensure_portfolio_facets()
+            await ensure_status_checks_collection()
+            await status_rollups.ensure_indexes(db)
+            
+            readiness.phase = "rollups"
+            backfilled = await status_rollups.backfill(db.status_checks)
+            if backfilled:
+                logger.info(f"Rollups de status gerados a partir de {backfilled} status checks existentes")
+            
+            readiness.phase = "caches"
+            loaded = await ai_cache.load(db.ai_strategy_cache)
+            logger.info(f"Cache de estratégias de IA carregado ({loaded} entradas)")
+            break
+        except Exception as e:
+            if not is_transient_mongo_error(e):
+                readiness.last_error = f"fase {readiness.phase}: {type(e).__name__}: {e}"
+                readiness.phase = "falhou"
+                logger.error(f"--- ERRO CRÍTICO: aquecimento abortado por erro não transitório ({readiness.last_error}) - aplicação permanecerá indisponível (503)")
+                raise
+            readiness.last_error = str(e)
+            logger.error(f"Erro ao preparar a aplicação (tentativa {readiness.attempts}, fase {readiness.phase}): {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+    
+    readiness.phase = "workers"
+    await write_buffer.start(db)
+    await job_queue.start(db)
+    await crm_outbox.start(db)
+    await status_rollups.start(db)
+    if CHANGE_STREAM_INVALIDATION_ENABLED:
+        await cache_invalidator.start(db)
+    request_static_publish()
+    
+    readiness.phase = "pronto"
+    readiness.last_error = None
+    readiness.ready_at = datetime.utcnow()
+    readiness.ready = True
+    logger.info(f"Aplicação pronta para receber tráfego ({readiness.attempts} tentativa(s))")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    O aquecimento roda em background para que a porta abra imediatamente
+    (health check do Render); até terminar, o ReadinessMiddleware responde 503.
+    Com WARM_UP_BEFORE_SERVING o startup espera o aquecimento terminar.
+    """
+    await tracer.start()
+    logger.info("Iniciando conexão com MongoDB...")
+    warm_up_task = asyncio.create_task(warm_up(), name="warm-up")
+    if WARM_UP_BEFORE_SERVING:
+        try:
+            await asyncio.wait_for(asyncio.shield(warm_up_task), WARM_UP_BEFORE_SERVING_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Banco indisponível: passa a aceitar conexões e o ReadinessMiddleware responde 503
+            logger.warning(f"Aquecimento não terminou em {WARM_UP_BEFORE_SERVING_TIMEOUT_SECONDS:.0f}s - aceitando conexões mesmo assim")
+    try:
+        yield
+    finally:
+        # Drenagem em ordem: para de aceitar tráfego, grava o buffer de escrita,
+        # encerra os workers e só então fecha o cliente do MongoDB
+        readiness.ready = False
+        readiness.phase = "encerrando"
+        # Também recolhe a exceção de um aquecimento que falhou (já registrada no log)
+        warm_up_task.cancel()
+        await asyncio.gather(warm_up_task, return_exceptions=True)
+        await write_buffer.stop()
+        await status_rollups.stop()
+        await cache_invalidator.stop()
+        if static_publisher is not None:
+            await static_publisher.stop()
+        await crm_outbox.stop()
+        await job_queue.stop()
+        if client is not None:
+            logger.info("Fechando conexão com MongoDB...")
+            client.close()
+        await tracer.stop()
+
+class ReadinessMiddleware:
+    """Responde 503 (com Retry-After) enquanto a aplicação não está pronta"""
+    
+    def __init__(self, app, retry_after_seconds: int = 5):
+        self.app = app
+        self.retry_after_seconds = retry_after_seconds
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or readiness.ready or scope["path"] in READINESS_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Serviço iniciando, tente novamente em instantes", "phase": readiness.phase},
+            headers={"Retry-After": str(self.retry_after_seconds)}
+        )
+        await response(scope, receive, send)
+
 # Create the main app
 app = FastAPI(
     title="VERTEX TARGET API",
     description="API para o portfólio premium da VERTEX TARGET",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if (FAST_JSON_RESPONSES and ORJSON_AVAILABLE) else JSONResponse,
+    lifespan=lifespan
 )
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=ServerTimingRoute if SERVER_TIMING_ENABLED else APIRoute)
 
 
 # =============================================================================
 # MODELS - Modelos Pydantic para Validação Rigorosa
 # =============================================================================
 
+# Regras de senha compartilhadas entre criação e atualização de usuário
+PASSWORD_UPPERCASE_RE = re.compile(r'[A-Z]')
+PASSWORD_LOWERCASE_RE = re.compile(r'[a-z]')
+PASSWORD_DIGIT_RE = re.compile(r'\d')
+
+def validate_password_strength(v: Optional[str]) -> Optional[str]:
+    if v is None: # Senha é opcional na atualização
+        return v
+    if len(v) < 8:
+        raise ValueError('A senha deve ter pelo menos 8 caracteres')
+    if not PASSWORD_UPPERCASE_RE.search(v):
+        raise ValueError('A senha deve conter pelo menos uma letra maiúscula')
+    if not PASSWORD_LOWERCASE_RE.search(v):
+        raise ValueError('A senha deve conter pelo menos uma letra minúscula')
+    if not PASSWORD_DIGIT_RE.search(v):
+        raise ValueError('A senha deve conter pelo menos um número')
+    return v
+
 # Authentication Models
 class UserCreate(BaseModel):
     email: EmailStr
@@ -264,17 +789,7 @@ class UserCreate(BaseModel):
     full_name: str
     role: str = Field(default="user", pattern="^(admin|user)$")
     
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('A senha deve ter pelo menos 8 caracteres')
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('A senha deve conter pelo menos uma letra maiúscula')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('A senha deve conter pelo menos uma letra minúscula')
-        if not re.search(r'\d', v):
-            raise ValueError('A senha deve conter pelo menos um número')
-        return v
+    _validate_password = field_validator('password')(validate_password_strength)
 
 # Novo modelo para atualização de usuário (apenas campos editáveis pelo admin)
 class UserUpdate(BaseModel):
@@ -284,22 +799,12 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
     password: Optional[str] = None # Para redefinir senha
 
-    @validator('password')
-    def validate_password_update(cls, v):
-        if v is None: # Senha é opcional na atualização
-            return v
-        if len(v) < 8:
-            raise ValueError('A senha deve ter pelo menos 8 caracteres')
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('A senha deve conter pelo menos uma letra maiúscula')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('A senha deve conter pelo menos uma letra minúscula')
-        if not re.search(r'\d', v):
-            raise ValueError('A senha deve conter pelo menos um número')
-        return v
+    _validate_password = field_validator('password')(validate_password_strength)
 
 
 class UserLogin(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     email: EmailStr
     password: str
 
@@ -323,7 +828,7 @@ class PortfolioItemCreate(BaseModel):
     image: str = Field(..., description="URL da imagem ou base64")
     metric: str = Field(..., min_length=1, max_length=100)
     description: str = Field(..., min_length=1, max_length=500)
-    technologies: List[str] = Field(..., min_items=1)
+    technologies: List[str] = Field(..., min_length=1)
     results: Dict[str, str] = Field(..., description="Métricas de resultado")
     challenge: str = Field(..., min_length=1)
     solution: str = Field(..., min_length=1)
@@ -409,6 +914,8 @@ class ContactSubmissionResponse(BaseModel):
 
 # Legacy Status Check Models (mantendo compatibilidade)
 class StatusCheckCreate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     client_name: str = Field(..., min_length=1, max_length=100)
 
 class StatusCheck(BaseModel):
@@ -416,13 +923,29 @@ class StatusCheck(BaseModel):
     client_name: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class StatusClientSummary(BaseModel):
+    client_name: str
+    count: int
+    last_seen: datetime
+
+class StatusSummary(BaseModel):
+    window_minutes: int
+    granularity: str
+    since: datetime
+    total: int
+    clients: List[StatusClientSummary]
+
 
 # AI Strategy Models
 class AIStrategyRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     industry: str = Field(..., min_length=1, max_length=100, description="Setor da empresa")
     objective: str = Field(..., min_length=1, max_length=100, description="Objetivo principal")
 
 class AIStrategyResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     strategy: str = Field(..., description="Estratégia gerada pela IA")
     cached: bool = Field(default=False, description="Indica se a resposta veio do cache")
     cache_timestamp: Optional[datetime] = Field(default=None, description="Timestamp da resposta original")
@@ -436,16 +959,48 @@ class CacheStats(BaseModel):
     oldest_entry: Optional[datetime] = None
     newest_entry: Optional[datetime] = None
 
+# Adapters compilados para o caminho rápido de serialização das listas
+UserListAdapter = TypeAdapter(List[User])
+PortfolioItemListAdapter = TypeAdapter(List[PortfolioItem])
+TestimonialListAdapter = TypeAdapter(List[Testimonial])
+ContactSubmissionListAdapter = TypeAdapter(List[ContactSubmissionResponse])
+StatusCheckListAdapter = TypeAdapter(List[StatusCheck])
+
+# Portfolio Facet Models
+class FacetCount(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    value: str
+    count: int
+
+class PortfolioFacets(BaseModel):
+    categories: List[FacetCount]
+    technologies: List[FacetCount]
+
+# Search Models
+class SearchHit(BaseModel):
+    type: str = Field(..., description="Origem do resultado: portfolio ou testimonial")
+    id: str
+    title: str
+    score: float = Field(..., description="Relevância calculada pelo índice de texto")
+    highlights: Dict[str, str] = Field(default={}, description="Trechos com os termos marcados em <mark>")
+    item: Dict[str, Any]
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    results: List[SearchHit]
+
 
 # =============================================================================
 # AUTHENTICATION UTILITIES
 # =============================================================================
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -453,11 +1008,21 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+def create_scoped_token(user_id: str, scope: str, ttl_seconds: int) -> str:
+    """Token de uso restrito e curta duração (ex.: ticket do EventSource, que não envia headers)"""
+    expire = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+    return jwt.encode({"sub": user_id, "scope": scope, "exp": expire}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+async def authenticate_token(token: str, scope: Optional[str] = None) -> User:
+    """
+    Valida o JWT e carrega o usuário. Tokens de acesso não têm scope; tokens
+    com scope só valem onde esse scope é exigido (e vice-versa).
+    """
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        with tracer.span("auth.jwt_decode"):
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("scope") != scope:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido",
@@ -470,7 +1035,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_data = await db.users.find_one({"id": user_id})
+    user_data = user_cache.get(user_id)
+    if user_data is None:
+        # Geração lida antes da consulta: uma invalidação no meio (ex.: mudança
+        # de role) impede que o documento antigo seja guardado
+        cache_generation = user_cache.generation
+        user_data = await db.users.find_one({"id": user_id})
+        if user_data is not None:
+            user_cache.store(user_data, generation=cache_generation)
     if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -478,7 +1050,252 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return User(**user_data)
+    return User.model_validate(user_data)
+
+@timed_async("auth")
+@tracer.traced("auth.get_current_user")
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    return await authenticate_token(credentials.credentials)
+
+
+# =============================================================================
+# FAST JSON - Caminho rápido de serialização das listas
+# =============================================================================
+
+def fast_list_response(adapter: TypeAdapter, documents: List[Dict[str, Any]]) -> Response:
+    """
+    Valida os documentos do MongoDB uma única vez e gera o JSON direto em bytes.
+    Retornar um Response evita a segunda validação contra o response_model
+    e o jsonable_encoder do FastAPI.
+    """
+    with timed("serialize"):
+        items = adapter.validate_python(documents)
+        return Response(content=adapter.dump_json(items), media_type="application/json")
+
+
+# =============================================================================
+# FULL-TEXT SEARCH - Índices de texto e destaque de resultados
+# =============================================================================
+
+# Campos indexados por coleção e seus pesos na pontuação de relevância
+SEARCH_INDEXES = {
+    "portfolio": {
+        "name": "portfolio_text_search",
+        "weights": {
+            "title": 10,
+            "technologies": 6,
+            "description": 4,
+            "challenge": 2,
+            "solution": 2,
+            "outcome": 2,
+        },
+    },
+    "testimonials": {
+        "name": "testimonials_text_search",
+        "weights": {
+            "company": 8,
+            "quote": 4,
+        },
+    },
+}
+SEARCH_LANGUAGE = "portuguese"
+SEARCH_SNIPPET_LENGTH = 160
+
+async def ensure_search_indexes():
+    """Cria (se necessário) os índices de texto usados por /api/search"""
+    for collection_name, spec in SEARCH_INDEXES.items():
+        await db[collection_name].create_index(
+            [(field, "text") for field in spec["weights"]],
+            name=spec["name"],
+            weights=spec["weights"],
+            default_language=SEARCH_LANGUAGE,
+        )
+
+def _fold(text: str) -> str:
+    """
+    Normaliza o texto para comparação (minúsculas e sem acentos)
+    Mantém o mesmo comprimento do original para que os índices coincidam
+    """
+    return "".join(unicodedata.normalize("NFD", char)[0].lower()[:1] for char in text)
+
+def _search_terms(query: str) -> List[str]:
+    """Extrai os radicais dos termos da busca, aproximando o stemming do MongoDB"""
+    terms = []
+    for word in re.findall(r"\w+", _fold(query)):
+        if len(word) < 3:
+            continue
+        stem = word[:max(3, len(word) - 2)] if len(word) > 4 else word
+        if stem not in terms:
+            terms.append(stem)
+    return terms
+
+def highlight_text(text: str, terms: List[str], max_length: int = SEARCH_SNIPPET_LENGTH) -> Optional[str]:
+    """
+    Gera um trecho do texto em torno da primeira ocorrência dos termos,
+    marcando cada ocorrência com <mark>. Retorna None se nenhum termo aparece.
+    """
+    if not text or not terms:
+        return None
+
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*")
+    matches = list(pattern.finditer(_fold(text)))
+    if not matches:
+        return None
+
+    start = max(0, matches[0].start() - max_length // 4)
+    end = min(len(text), start + max_length)
+    if start > 0:
+        # Evita cortar a primeira palavra do trecho pela metade
+        space = text.find(" ", start)
+        if space != -1 and space < matches[0].start():
+            start = space + 1
+
+    parts = ["…" if start > 0 else ""]
+    cursor = start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:match.start()]))
+        parts.append(f"<mark>{html.escape(text[match.start():match.end()])}</mark>")
+        cursor = match.end()
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+def build_highlights(document: Dict[str, Any], fields: List[str], terms: List[str]) -> Dict[str, str]:
+    """Aplica highlight_text a cada campo indexado que contém algum dos termos"""
+    highlights = {}
+    for field in fields:
+        value = document.get(field)
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        snippet = highlight_text(value, terms) if isinstance(value, str) else None
+        if snippet:
+            highlights[field] = snippet
+    return highlights
+
+
+# =============================================================================
+# PORTFOLIO FACETS - Contagens pré-calculadas por categoria e tecnologia
+# =============================================================================
+
+# As contagens ficam em portfolio_facets ({_id: "<kind>:<value>", kind, value, count})
+# e são ajustadas com $inc pelos handlers de escrita do portfólio. O recálculo
+# completo só roda sob demanda (seed, content_agent, painel) ou no primeiro deploy.
+FACET_KINDS = ("category", "technology")
+
+def _facet_values(item: Optional[Dict[str, Any]]) -> Counter:
+    """Retorna as facetas (kind, value) de um item do portfólio"""
+    values = Counter()
+    if not item:
+        return values
+    if item.get("category"):
+        values[("category", item["category"])] += 1
+    for technology in set(item.get("technologies") or []):
+        values[("technology", technology)] += 1
+    return values
+
+async def adjust_portfolio_facets(old_item: Optional[Dict[str, Any]], new_item: Optional[Dict[str, Any]]):
+    """
+    Aplica incrementalmente a diferença de facetas entre a versão antiga e a nova
+    de um item (None representa criação ou remoção). O item já foi gravado: se
+    o $inc falhar, as contagens são reparadas com um recálculo completo em vez
+    de a requisição falhar.
+    """
+    delta = _facet_values(new_item)
+    delta.subtract(_facet_values(old_item))
+
+    operations = [
+        UpdateOne(
+            {"_id": f"{kind}:{value}"},
+            {"$inc": {"count": amount}, "$setOnInsert": {"kind": kind, "value": value}},
+            upsert=True
+        )
+        for (kind, value), amount in delta.items() if amount
+    ]
+    if not operations:
+        return
+
+    try:
+        await db.portfolio_facets.bulk_write(operations, ordered=False)
+        await db.portfolio_facets.delete_many({"count": {"$lte": 0}})
+    except Exception as e:
+        logger.error(f"Falha ao ajustar as facetas do portfólio ({e}) - recalculando todas as contagens")
+        try:
+            facets = await rebuild_portfolio_facets()
+            logger.info(f"Facetas do portfólio recalculadas após a falha ({facets} facetas)")
+        except Exception as rebuild_error:
+            logger.error(f"Falha ao recalcular as facetas do portfólio: {rebuild_error} - use /api/admin/portfolio/facets/rebuild")
+
+async def rebuild_portfolio_facets() -> int:
+    """
+    Recalcula todas as contagens a partir da coleção portfolio, para corrigir
+    escritas feitas fora da API (seed, content_agent). Retorna quantas facetas.
+
+    As contagens vão para uma coleção temporária, que substitui portfolio_facets
+    de uma vez (renameCollection com dropTarget): /api/portfolio/facets nunca
+    vê a coleção vazia e rebuilds simultâneos não colidem entre si.
+    """
+    counts = Counter()
+    async for item in db.portfolio.find({}, {"_id": 0, "category": 1, "technologies": 1}):
+        counts.update(_facet_values(item))
+
+    staging = db[f"portfolio_facets_rebuild_{uuid.uuid4().hex[:12]}"]
+    try:
+        await staging.create_index([("kind", 1), ("count", -1)])
+        if counts:
+            await staging.insert_many([
+                {"_id": f"{kind}:{value}", "kind": kind, "value": value, "count": count}
+                for (kind, value), count in counts.items()
+            ])
+        await staging.rename("portfolio_facets", dropTarget=True)
+    except Exception:
+        await staging.drop()
+        raise
+    return len(counts)
+
+async def ensure_portfolio_facets():
+    """
+    Cria os índices usados pelos filtros (technologies é multikey). As facetas
+    só são recalculadas se ainda não existem (primeiro deploy); nas demais
+    inicializações já estão em dia pelos $inc dos handlers.
+    """
+    await db.portfolio.create_index("category")
+    await db.portfolio.create_index("technologies")
+    await db.portfolio_facets.create_index([("kind", 1), ("count", -1)])
+    if await db.portfolio_facets.find_one({}, {"_id": 1}) is None and await db.portfolio.find_one({}, {"_id": 1}) is not None:
+        facets = await rebuild_portfolio_facets()
+        logger.info(f"Facetas do portfólio calculadas ({facets} facetas)")
+
+async def ensure_status_checks_collection():
+    """
+    Guarda os status checks numa coleção time-series (timestamp como tempo,
+    client_name como metadado) com retenção de STATUS_CHECK_RETENTION_DAYS.
+    Bancos antigos já têm uma coleção comum: nesse caso (ou se o servidor
+    não suporta time-series) a retenção vira um índice TTL em timestamp.
+    """
+    retention_seconds = STATUS_CHECK_RETENTION_DAYS * 24 * 3600
+    existing = await db.list_collections(filter={"name": "status_checks"}).to_list(1)
+    if not existing:
+        try:
+            await db.create_collection(
+                "status_checks",
+                timeseries={"timeField": "timestamp", "metaField": "client_name", "granularity": "minutes"},
+                expireAfterSeconds=retention_seconds,
+            )
+            logger.info(f"Coleção time-series status_checks criada (retenção de {STATUS_CHECK_RETENTION_DAYS} dias)")
+            return
+        except CollectionInvalid:
+            # Outro worker criou a coleção entre a consulta e a criação
+            existing = await db.list_collections(filter={"name": "status_checks"}).to_list(1)
+        except OperationFailure as e:
+            logger.warning(f"Time-series indisponível para status_checks, usando coleção comum com TTL: {e}")
+    if existing and existing[0].get("type") == "timeseries":
+        await db.command({"collMod": "status_checks", "expireAfterSeconds": retention_seconds})
+        return
+    await db.status_checks.create_index("timestamp", expireAfterSeconds=retention_seconds)
+    await db.status_checks.create_index([("client_name", 1), ("timestamp", -1)])
 
 
 # =============================================================================
@@ -502,6 +1319,21 @@ async def health_check():
             detail=f"Database connection failed: {str(e)}"
         )
 
+@api_router.get("/ready")
+async def readiness_check():
+    """Readiness: 200 somente depois do aquecimento (pool, índices, caches e workers)"""
+    body = {
+        "status": "ready" if readiness.ready else "starting",
+        "phase": readiness.phase,
+        "attempts": readiness.attempts,
+        "last_error": readiness.last_error,
+        "ready_at": readiness.ready_at,
+        "cache_invalidation": "change_stream" if cache_invalidator.active else "ttl",
+    }
+    if not readiness.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=jsonable_encoder(body))
+    return body
+
 # Authentication Routes
 @api_router.post("/auth/register", response_model=Token)
 async def register_user(user_data: UserCreate):
@@ -525,7 +1357,7 @@ async def register_user(user_data: UserCreate):
     )
     
     # Preparar dados para inserção no banco
-    user_dict = new_user.dict()
+    user_dict = new_user.model_dump()
     user_dict["hashed_password"] = hashed_password
     
     # Inserir no banco de dados
@@ -563,15 +1395,8 @@ async def login_user(user_credentials: UserLogin):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Criar objeto User com os dados do banco
-    user = User(
-        id=user_data["id"],
-        email=user_data["email"],
-        full_name=user_data["full_name"],
-        role=user_data.get("role", "user"),  # Default para 'user' se não existir
-        is_active=user_data.get("is_active", True),
-        created_at=user_data.get("created_at", datetime.utcnow())
-    )
+    # Criar objeto User com os dados do banco (role/is_active/created_at usam os defaults do modelo se não existirem)
+    user = User.model_validate(user_data)
     
     access_token = create_access_token(data={"sub": user_data["id"]})
     return {"access_token": access_token, "token_type": "bearer", "user": user}
@@ -588,15 +1413,74 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
     
     # Buscar todos os usuários (excluindo a senha)
     users_data = await db.users.find({}, {"hashed_password": 0}).to_list(1000)
+    if FAST_JSON_RESPONSES:
+        return fast_list_response(UserListAdapter, users_data)
+    
+    return UserListAdapter.validate_python(users_data)
+
+@api_router.get("/admin/db/pool")
+async def get_db_pool_stats(current_user: User = Depends(get_current_user)):
+    """
+    Métricas do pool de conexões do MongoDB (conexões abertas, em uso e espera por checkout).
+    Usado para dimensionar MONGO_MAX_POOL_SIZE de acordo com o número de workers.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem ver métricas do banco."
+        )
+    
+    return {
+        "options": MONGO_CLIENT_OPTIONS,
+        "pool": pool_metrics.snapshot(),
+        "timestamp": datetime.utcnow()
+    }
+
+@api_router.get("/admin/db/slow-queries")
+async def get_slow_queries(
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Formatos de consulta mais lentos da última hora (filtros sem valores),
+    ordenados pelo tempo total consumido, e a duração média por comando e coleção.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem ver métricas do banco."
+        )
+    
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "slow_queries": slow_query_log.top(limit),
+        "by_command": slow_query_log.by_command(),
+        "timestamp": datetime.utcnow()
+    }
+
+@api_router.delete("/admin/db/slow-queries")
+async def reset_slow_queries(current_user: User = Depends(get_current_user)):
+    """Zera as estatísticas (útil depois de criar um índice)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem ver métricas do banco."
+        )
     
-    return [User(
-        id=user["id"],
-        email=user["email"],
-        full_name=user["full_name"],
-        role=user.get("role", "user"),
-        is_active=user.get("is_active", True),
-        created_at=user.get("created_at", datetime.utcnow())
-    ) for user in users_data]
+    slow_query_log.reset()
+    return {"message": "Estatísticas de consultas lentas zeradas", "timestamp": datetime.utcnow()}
+
+@api_router.post("/admin/portfolio/facets/rebuild")
+async def rebuild_portfolio_facets_endpoint(current_user: User = Depends(get_current_user)):
+    """Recalcula as facetas do portfólio (após importações feitas direto no banco)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem recalcular as facetas."
+        )
+    
+    facets = await rebuild_portfolio_facets()
+    return {"message": "Facetas do portfólio recalculadas", "facets": facets, "timestamp": datetime.utcnow()}
 
 # Novo endpoint para atualizar um usuário (Admin)
 @api_router.put("/admin/users/{user_id}", response_model=User)
@@ -621,7 +1505,7 @@ async def update_user(
         )
     
     # 3. Preparar os dados para atualização
-    update_fields = {k: v for k, v in user_update_data.dict(exclude_unset=True).items() if v is not None}
+    update_fields = {k: v for k, v in user_update_data.model_dump(exclude_unset=True).items() if v is not None}
     
     # Se a senha for fornecida, hashá-la
     if "password" in update_fields:
@@ -642,25 +1526,176 @@ async def update_user(
         {"id": user_id},
         {"$set": update_fields}
     )
+    user_cache.invalidate(user_id)
     
     # 5. Retornar o usuário atualizado
     updated_user_data = await db.users.find_one({"id": user_id})
-    return User(**updated_user_data)
+    return User.model_validate(updated_user_data)
 
+# Eventos ao vivo do painel (Server-Sent Events)
+ADMIN_EVENTS_SCOPE = "admin_events"
+optional_security = HTTPBearer(auto_error=False)
+
+@api_router.post("/admin/events/ticket")
+async def create_admin_events_ticket(current_user: User = Depends(get_current_user)):
+    """
+    Ticket de curta duração para abrir o EventSource (que não envia o header
+    Authorization). Vale só para GET /api/admin/events e apenas na conexão.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem acompanhar os eventos."
+        )
+    return {
+        "ticket": create_scoped_token(current_user.id, ADMIN_EVENTS_SCOPE, ADMIN_EVENTS_TICKET_SECONDS),
+        "expires_in": ADMIN_EVENTS_TICKET_SECONDS
+    }
+
+@api_router.get("/admin/events")
+async def stream_admin_events(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Ticket de POST /api/admin/events/ticket"),
+    last_event_id: Optional[str] = Query(None, description="Alternativa ao header Last-Event-ID"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Stream text/event-stream com contact.created, portfolio.* e testimonial.*
+    (created/updated/deleted com o documento; changed quando a escrita veio de
+    outro worker) e resync quando o painel deve recarregar tudo. A conexão é
+    encerrada após ADMIN_EVENTS_MAX_STREAM_SECONDS; o EventSource reconecta
+    sozinho enviando o Last-Event-ID.
+    """
+    if ticket:
+        current_user = await authenticate_token(ticket, scope=ADMIN_EVENTS_SCOPE)
+    elif credentials:
+        current_user = await authenticate_token(credentials.credentials)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Informe o ticket ou o header Authorization",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem acompanhar os eventos."
+        )
+
+    subscription = admin_events.subscribe(request.headers.get("last-event-id") or last_event_id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Limite de conexões de eventos atingido neste servidor"
+        )
+
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ADMIN_EVENTS_MAX_STREAM_SECONDS
+        try:
+            yield "retry: 3000\n\n"
+            while (remaining := deadline - loop.time()) > 0:
+                event = await subscription.next(timeout=min(ADMIN_EVENTS_HEARTBEAT_SECONDS, remaining))
+                # Comentário a cada heartbeat mantém a conexão viva em proxies
+                yield event.encode() if event is not None else ": ping\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Conteúdo estático (publicação)
+async def render_static_content() -> Dict[str, bytes]:
+    """Listas públicas serializadas exatamente como GET /api/portfolio e GET /api/testimonials"""
+    portfolio = await db.portfolio.find().to_list(1000)
+    testimonials = await db.testimonials.find().to_list(1000)
+    return {
+        "portfolio": PortfolioItemListAdapter.dump_json(PortfolioItemListAdapter.validate_python(portfolio)),
+        "testimonials": TestimonialListAdapter.dump_json(TestimonialListAdapter.validate_python(testimonials)),
+    }
+
+@app.get("/content/{filename}", include_in_schema=False)
+async def published_content(filename: str, request: Request):
+    """
+    Arquivos de STATIC_CONTENT_DIR: versionados com cache imutável (e variante
+    gzip/brotli já pronta) e o manifest com cache curto
+    """
+    resolved = static_publisher.resolve(filename, request.headers.get("accept-encoding")) if static_publisher else None
+    if resolved is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conteúdo não publicado")
+    path, encoding = resolved
+    headers = {
+        "Cache-Control": MANIFEST_CACHE_CONTROL if filename == MANIFEST_NAME else IMMUTABLE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "Access-Control-Allow-Origin": "*",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    body = await asyncio.to_thread(path.read_bytes)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Portfolio Routes
 @api_router.get("/portfolio", response_model=List[PortfolioItem])
-async def get_portfolio_items():
-    items = await db.portfolio.find().to_list(1000)
-    return [PortfolioItem(**item) for item in items]
+async def get_portfolio_items(
+    request: Request,
+    category: Optional[str] = Query(None, max_length=100, description="Filtra por categoria"),
+    technology: Optional[List[Annotated[str, StringConstraints(max_length=100)]]] = Query(
+        None, max_length=10, description="Filtra por tecnologia (repetível, exige todas)"
+    )
+):
+    if RESPONSE_CACHE_ENABLED:
+        # Só os filtros declarados entram na chave: outros parâmetros não criam entradas
+        cache_key = response_cache.key_for("/api/portfolio", category=category, technology=technology)
+        cache_generation = response_cache.generation
+        with timed("cache"):
+            cached = response_cache.get(cache_key)
+        if cached:
+            return response_cache.respond(request, cached)
+
+    query: Dict[str, Any] = {}
+    if category:
+        query["category"] = category
+    if technology:
+        query["technologies"] = {"$all": technology}
+
+    items = await db.portfolio.find(query).to_list(1000)
+    if RESPONSE_CACHE_ENABLED:
+        with timed("serialize"):
+            body = PortfolioItemListAdapter.dump_json(PortfolioItemListAdapter.validate_python(items))
+        with timed("cache"):
+            entry = response_cache.store(cache_key, body, generation=cache_generation)
+        return response_cache.respond(request, entry)
+    if FAST_JSON_RESPONSES:
+        return fast_list_response(PortfolioItemListAdapter, items)
+    return PortfolioItemListAdapter.validate_python(items)
+
+@api_router.get("/portfolio/facets", response_model=PortfolioFacets)
+async def get_portfolio_facets():
+    """Contagens de projetos por categoria e por tecnologia para os filtros do portfólio"""
+    facets = {kind: [] for kind in FACET_KINDS}
+    cursor = db.portfolio_facets.find({"count": {"$gt": 0}}).sort([("kind", 1), ("count", -1)])
+    async for facet in cursor:
+        if facet.get("kind") in facets:
+            facets[facet["kind"]].append(FacetCount(value=facet["value"], count=facet["count"]))
+
+    return PortfolioFacets(categories=facets["category"], technologies=facets["technology"])
 
 @api_router.post("/portfolio", response_model=PortfolioItem)
 async def create_portfolio_item(
     item_data: PortfolioItemCreate,
     current_user: User = Depends(get_current_user)
 ):
-    item = PortfolioItem(**item_data.dict())
-    await db.portfolio.insert_one(item.dict())
+    item = PortfolioItem.model_validate(item_data.model_dump())
+    item_doc = item.model_dump()
+    await db.portfolio.insert_one(item_doc)
+    await adjust_portfolio_facets(None, item_doc)
+    response_cache.invalidate("/api/portfolio")
+    request_static_publish()
+    publish_admin_event("portfolio", "created", item.model_dump(mode="json"), item_doc["_id"])
     return item
 
 @api_router.put("/portfolio/{item_id}", response_model=PortfolioItem)
@@ -669,47 +1704,78 @@ async def update_portfolio_item(
     item_data: PortfolioItemUpdate,
     current_user: User = Depends(get_current_user)
 ):
-    existing_item = await db.portfolio.find_one({"id": item_id})
-    if not existing_item:
+    update_data = {k: v for k, v in item_data.model_dump().items() if v is not None}
+    update_data["updated_at"] = datetime.utcnow()
+    
+    # Uma única operação atômica: a diferença de facetas é calculada sobre a
+    # versão que esta atualização substituiu, mesmo com edições simultâneas
+    existing_item = await db.portfolio.find_one_and_update(
+        {"id": item_id}, {"$set": update_data}, return_document=ReturnDocument.BEFORE
+    )
+    if existing_item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item do portfólio não encontrado"
         )
     
-    update_data = {k: v for k, v in item_data.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    await db.portfolio.update_one({"id": item_id}, {"$set": update_data})
-    
-    updated_item = await db.portfolio.find_one({"id": item_id})
-    return PortfolioItem(**updated_item)
+    updated_item = {**existing_item, **update_data}
+    await adjust_portfolio_facets(existing_item, updated_item)
+    response_cache.invalidate("/api/portfolio")
+    request_static_publish()
+    item = PortfolioItem.model_validate(updated_item)
+    publish_admin_event("portfolio", "updated", item.model_dump(mode="json"), updated_item["_id"])
+    return item
 
 @api_router.delete("/portfolio/{item_id}")
 async def delete_portfolio_item(
     item_id: str,
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.portfolio.delete_one({"id": item_id})
-    if result.deleted_count == 0:
+    deleted_item = await db.portfolio.find_one_and_delete({"id": item_id})
+    if deleted_item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item do portfólio não encontrado"
         )
+    await adjust_portfolio_facets(deleted_item, None)
+    response_cache.invalidate("/api/portfolio")
+    request_static_publish()
+    publish_admin_event("portfolio", "deleted", {"id": item_id}, deleted_item["_id"])
     return {"message": "Item deletado com sucesso"}
 
 # Testimonials Routes
 @api_router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials():
+async def get_testimonials(request: Request):
+    if RESPONSE_CACHE_ENABLED:
+        cache_key = response_cache.key_for("/api/testimonials")
+        cache_generation = response_cache.generation
+        with timed("cache"):
+            cached = response_cache.get(cache_key)
+        if cached:
+            return response_cache.respond(request, cached)
+
     testimonials = await db.testimonials.find().to_list(1000)
-    return [Testimonial(**testimonial) for testimonial in testimonials]
+    if RESPONSE_CACHE_ENABLED:
+        with timed("serialize"):
+            body = TestimonialListAdapter.dump_json(TestimonialListAdapter.validate_python(testimonials))
+        with timed("cache"):
+            entry = response_cache.store(cache_key, body, generation=cache_generation)
+        return response_cache.respond(request, entry)
+    if FAST_JSON_RESPONSES:
+        return fast_list_response(TestimonialListAdapter, testimonials)
+    return TestimonialListAdapter.validate_python(testimonials)
 
 @api_router.post("/testimonials", response_model=Testimonial)
 async def create_testimonial(
     testimonial_data: TestimonialCreate,
     current_user: User = Depends(get_current_user)
 ):
-    testimonial = Testimonial(**testimonial_data.dict())
-    await db.testimonials.insert_one(testimonial.dict())
+    testimonial = Testimonial.model_validate(testimonial_data.model_dump())
+    testimonial_doc = testimonial.model_dump()
+    await db.testimonials.insert_one(testimonial_doc)
+    response_cache.invalidate("/api/testimonials")
+    request_static_publish()
+    publish_admin_event("testimonials", "created", testimonial.model_dump(mode="json"), testimonial_doc["_id"])
     return testimonial
 
 @api_router.put("/testimonials/{testimonial_id}", response_model=Testimonial)
@@ -725,54 +1791,126 @@ async def update_testimonial(
             detail="Depoimento não encontrado"
         )
     
-    update_data = {k: v for k, v in testimonial_data.dict().items() if v is not None}
+    update_data = {k: v for k, v in testimonial_data.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
     
     await db.testimonials.update_one({"id": testimonial_id}, {"$set": update_data})
     
     updated_testimonial = await db.testimonials.find_one({"id": testimonial_id})
-    return Testimonial(**updated_testimonial)
+    response_cache.invalidate("/api/testimonials")
+    request_static_publish()
+    testimonial = Testimonial.model_validate(updated_testimonial)
+    publish_admin_event("testimonials", "updated", testimonial.model_dump(mode="json"), updated_testimonial["_id"])
+    return testimonial
 
 @api_router.delete("/testimonials/{testimonial_id}")
 async def delete_testimonial(
     testimonial_id: str,
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.testimonials.delete_one({"id": testimonial_id})
-    if result.deleted_count == 0:
+    deleted_testimonial = await db.testimonials.find_one_and_delete({"id": testimonial_id})
+    if deleted_testimonial is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Depoimento não encontrado"
         )
+    response_cache.invalidate("/api/testimonials")
+    request_static_publish()
+    publish_admin_event("testimonials", "deleted", {"id": testimonial_id}, deleted_testimonial["_id"])
     return {"message": "Depoimento deletado com sucesso"}
 
+# Search Routes
+@api_router.get("/search", response_model=SearchResponse)
+async def search_content(
+    q: str = Query(..., min_length=2, max_length=100, description="Termos da busca"),
+    scope: Optional[str] = Query(None, pattern="^(portfolio|testimonials)$", description="Restringe a busca a uma coleção"),
+    limit: int = Query(20, ge=1, le=50)
+):
+    """
+    Busca textual no portfólio e nos depoimentos usando os índices de texto do MongoDB.
+    Os resultados vêm ordenados por relevância e com os termos destacados.
+    """
+    terms = _search_terms(q)
+    collections = [scope] if scope else list(SEARCH_INDEXES.keys())
+
+    hits = []
+    for collection_name in collections:
+        cursor = db[collection_name].find(
+            {"$text": {"$search": q}},
+            {"_id": 0, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+
+        async for document in cursor:
+            score = document.pop("score", 0.0)
+            if collection_name == "portfolio":
+                hit_type, title = "portfolio", document.get("title", "")
+            else:
+                hit_type, title = "testimonial", f"{document.get('name', '')} - {document.get('company', '')}"
+            hits.append(SearchHit(
+                type=hit_type,
+                id=document.get("id", ""),
+                title=title,
+                score=round(score, 4),
+                highlights=build_highlights(document, list(SEARCH_INDEXES[collection_name]["weights"]), terms),
+                item=document
+            ))
+
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    hits = hits[:limit]
+    return SearchResponse(query=q, total=len(hits), results=hits)
+
 # Contact Routes
 @api_router.post("/contact", response_model=ContactSubmissionResponse)
 async def submit_contact_form(contact_data: ContactSubmission):
-    submission = ContactSubmissionResponse(**contact_data.dict())
-    await db.contact_submissions.insert_one(submission.dict())
+    submission = ContactSubmissionResponse.model_validate(contact_data.model_dump())
     
-    # TODO: Implementar envio de email de notificação
-    # TODO: Implementar integração com CRM
+    # O marcador do outbox do CRM é gravado no mesmo documento (atômico com a captura do lead)
+    submission_doc = submission.model_dump()
+    submission_doc["_id"] = ObjectId()  # conhecido antes do flush do buffer (ver publish_admin_event)
+    submission_doc["crm_sync"] = new_outbox_marker(idempotency_key=submission.id)
+    # Notificação por email vira job (com retentativas) só depois que o contato
+    # estiver gravado: o marcador vai no mesmo documento, sem insert extra
+    submission_doc["notification"] = new_job_marker()
+    await write_buffer.insert("contact_submissions", submission_doc)
+    crm_outbox.notify()
+    job_queue.notify()
+    publish_admin_event("contact_submissions", "created", submission.model_dump(mode="json"), submission_doc["_id"])
     
     return submission
 
 @api_router.get("/contact", response_model=List[ContactSubmissionResponse])
 async def get_contact_submissions(current_user: User = Depends(get_current_user)):
     submissions = await db.contact_submissions.find().to_list(1000)
-    return [ContactSubmissionResponse(**submission) for submission in submissions]
+    if FAST_JSON_RESPONSES:
+        return fast_list_response(ContactSubmissionListAdapter, submissions)
+    return ContactSubmissionListAdapter.validate_python(submissions)
 
 # Legacy Status Check Models (mantendo compatibilidade)
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_obj = StatusCheck(**input.dict())
-    await db.status_checks.insert_one(status_obj.dict())
+    status_obj = StatusCheck.model_validate(input.model_dump())
+    await write_buffer.insert("status_checks", status_obj.model_dump())
+    status_rollups.record(status_obj.client_name, status_obj.timestamp)
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(limit: int = Query(1000, ge=1, le=1000)):
+    """Status checks mais recentes primeiro (os anteriores à retenção já expiraram)"""
+    status_checks = await db.status_checks.find().sort("timestamp", -1).to_list(limit)
+    if FAST_JSON_RESPONSES:
+        return fast_list_response(StatusCheckListAdapter, status_checks)
+    return StatusCheckListAdapter.validate_python(status_checks)
+
+@api_router.get("/status/summary", response_model=StatusSummary)
+async def get_status_summary(window_minutes: int = Query(60, ge=1, le=STATUS_ROLLUP_HOUR_RETENTION_DAYS * 24 * 60)):
+    """
+    Contagem de status checks e último horário por cliente na janela, lida
+    dos rollups (por minuto até 3h, por hora acima disso). Com vários workers,
+    os contadores dos outros processos aparecem após o próximo flush
+    (STATUS_ROLLUP_FLUSH_SECONDS).
+    """
+    summary = await status_rollups.summary(timedelta(minutes=window_minutes))
+    return StatusSummary(window_minutes=window_minutes, **summary)
 
 
 # =============================================================================
@@ -800,15 +1938,16 @@ async def generate_ai_strategy(
         )
     
     # Verificar se a chave da API Gemini está configurada
-    if not GEMINI_API_KEY:
+    if not gemini_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Serviço de IA temporariamente indisponível - chave da API não configurada"
         )
     
+    ai_started = None
     try:
         # Configurar o modelo Gemini
-        model = genai.GenerativeModel('gemini-1.5-pro-latest')
+        model = get_gemini_model()
         
         # Criar prompt detalhado para geração de estratégia
         prompt = f"""
@@ -837,15 +1976,21 @@ async def generate_ai_strategy(
         """
         
         # Fazer a chamada para a API Gemini
-        response = model.generate_content(prompt)
+        ai_started = time.perf_counter()
+        # O SDK é síncrono: a chamada vai para uma thread para não travar o event loop
+        with timed("ai"), tracer.span("gemini.generate_content", kind=KIND_CLIENT, model=GEMINI_MODEL):
+            response = await asyncio.to_thread(model.generate_content, prompt)
         
         # Verificar se a resposta foi gerada com sucesso
         if not response.text:
+            ai_metrics.observe("empty", time.perf_counter() - ai_started)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Erro na geração de estratégia - resposta vazia da IA"
             )
         
+        ai_metrics.observe("success", time.perf_counter() - ai_started)
+        
         # Armazenar no cache para futuras consultas
         await ai_cache.set(request.industry, request.objective, response.text)
         
@@ -861,6 +2006,11 @@ async def generate_ai_strategy(
     except Exception as e:
         logger.error(f"Erro ao gerar estratégia com IA: {str(e)}")
         
+        if ai_started is not None and not isinstance(e, HTTPException):
+            error_text = str(e).upper()
+            reason = "auth" if "API_KEY" in error_text else "quota" if ("QUOTA" in error_text or "LIMIT" in error_text) else "other"
+            ai_metrics.observe("error", time.perf_counter() - ai_started, reason=reason)
+        
         # Tratar diferentes tipos de erros
         if "API_KEY" in str(e).upper():
             raise HTTPException(
@@ -898,7 +2048,7 @@ async def clear_cache(current_user: User = Depends(get_current_user)):
     Limpa todo o cache de estratégias de IA.
     Endpoint protegido que exige autenticação JWT.
     """
-    cleared_count = ai_cache.clear()
+    cleared_count = await ai_cache.clear()
     logger.info(f"Cache limpo por {current_user.email} - {cleared_count} entradas removidas")
     return {
         "message": "Cache limpo com sucesso",
@@ -938,6 +2088,19 @@ async def get_cache_health():
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Métricas no formato de texto do Prometheus"""
+    if not METRICS_ENABLED or not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    authorization = request.headers.get("authorization", "")
+    if not secrets.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Rótulos de todas as rotas criados de antemão (nada é alocado no caminho da requisição)
+http_metrics.preallocate_routes(app.routes)
+
 # Lista de origens permitidas
 
 origins = [
@@ -948,6 +2111,13 @@ origins = [
     "http://localhost:5173",
 ]
 
+app.add_middleware(ReadinessMiddleware)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -956,16 +2126,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_db_client():
-    logger.info("Iniciando conexão com MongoDB...")
-    try:
-        await db.command("ping")
-        logger.info("Conexão com MongoDB estabelecida com sucesso!")
-    except Exception as e:
-        logger.error(f"Erro ao conectar com MongoDB: {e}")
+if METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware, http_metrics=http_metrics)
+
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    logger.info("Fechando conexão com MongoDB...")
-    client.close()
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
@@ -0,0 +1,171 @@
+# backend/server_timing.py
+"""
+Cabeçalho Server-Timing com o tempo gasto em cada fase da requisição
+
+O middleware cria um acumulador por requisição (ContextVar) e, ao enviar a
+resposta, escreve algo como:
+
+    Server-Timing: auth;dur=2.1, db;dur=8.4;desc="3 comandos", cache;dur=0.2,
+                   serialize;dur=1.7, total;dur=14.9
+
+Fases:
+    auth      -> get_current_user (JWT + busca do usuário)
+    db        -> soma dos comandos do MongoDB (CommandListener); inclui os
+                 comandos feitos dentro de outras fases, como auth
+    cache     -> consultas e gravações nos caches (AI e respostas)
+    ai        -> chamadas ao Gemini
+    serialize -> validação/serialização da resposta, medida pela
+                 ServerTimingRoute entre o fim do endpoint e a resposta
+                 pronta, somada aos trechos marcados com timed("serialize")
+    total     -> do início da requisição até o envio dos cabeçalhos
+
+Fora de uma requisição com Server-Timing ativo, timed() não faz nada.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+PHASE_ORDER = ("auth", "db", "cache", "ai", "serialize")
+
+
+class _RequestTimings:
+    __slots__ = ("durations", "counts", "endpoint_finished")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.endpoint_finished: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def header_value(self, total_seconds: float) -> str:
+        entries: List[str] = []
+        phases = list(PHASE_ORDER) + sorted(set(self.durations) - set(PHASE_ORDER))
+        for phase in phases:
+            if phase not in self.durations:
+                continue
+            entry = f"{phase};dur={self.durations[phase] * 1000:.1f}"
+            if phase == "db":
+                entry += f';desc="{self.counts[phase]} comandos"'
+            entries.append(entry)
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_timings: ContextVar[Optional[_RequestTimings]] = ContextVar("server_timings", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    """Soma a duração do bloco à fase informada"""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def timed_async(phase: str):
+    """Decorador para funções async (preserva a assinatura, inclusive para Depends)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with timed(phase):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ServerTimingRoute(APIRoute):
+    """
+    APIRoute que marca o fim do endpoint; o que o FastAPI faz depois disso
+    (validar contra o response_model, jsonable_encoder, JSONResponse) entra
+    na fase serialize.
+    """
+
+    def get_route_handler(self):
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def timed_endpoint(*args, **kwargs):
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    timings = _timings.get()
+                    if timings is not None:
+                        timings.endpoint_finished = time.perf_counter()
+            self.dependant.call = timed_endpoint
+
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _timings.get()
+            if timings is not None and timings.endpoint_finished is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_finished)
+                timings.endpoint_finished = None
+            return response
+
+        return timed_handler
+
+
+class ServerTimingListener(monitoring.CommandListener):
+    """
+    Soma a duração dos comandos do MongoDB na fase db. O Motor executa os
+    comandos em threads com uma cópia do contexto, que aponta para o mesmo
+    acumulador da requisição.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        timings = _timings.get()
+        if timings is not None:
+            timings.add("db", event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app, allow_origin: str = "*"):
+        self.app = app
+        self.allow_origin = allow_origin.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = _RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                value = timings.header_value(time.perf_counter() - started)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", value.encode()))
+                # Sem Timing-Allow-Origin o navegador esconde os tempos de requisições cross-origin
+                headers.append((b"timing-allow-origin", self.allow_origin))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
@@ -0,0 +1,255 @@
+# backend/status_rollups.py
+"""
+Rollups por minuto e por hora dos status checks
+
+Cada POST /api/status incrementa contadores em memória por (granularidade,
+cliente, início do intervalo); um flush periódico grava tudo com um único
+bulk_write de upserts ($inc na contagem, $max no último horário visto) na
+coleção status_check_rollups. Como $inc e $max são comutativos, vários
+workers podem gravar os mesmos intervalos sem coordenação.
+
+Os painéis de monitoramento consultam os rollups (poucas linhas por
+cliente) em vez dos status checks brutos. Cada rollup tem expires_at e um
+índice TTL o remove depois da retenção da sua granularidade.
+
+O backfill (rollups dos status checks que já existiam) é idempotente: cada
+rollup recebe a contagem histórica uma única vez (campo backfilled), então
+pode ser repetido se o processo morrer no meio. O marcador só é gravado
+no final, quando não há mais nada a fazer.
+
+Backfill e contagem ao vivo dividem os status checks por um corte fixo
+(documento backfill_cutoff, criado uma única vez pelo primeiro worker a
+aquecer, antes de qualquer worker atender): o backfill só lê timestamp <
+cutoff e record() só conta timestamp >= cutoff. Assim o backfill de um
+worker ainda aquecendo nunca soma de novo os checks que outro worker já
+contou ao vivo.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY = 11000
+
+logger = logging.getLogger(__name__)
+
+GRANULARITY_SECONDS = {"minute": 60, "hour": 3600}
+BACKFILL_MARKER_ID = "backfill"
+BACKFILL_CUTOFF_ID = "backfill_cutoff"
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class StatusRollups:
+    def __init__(
+        self,
+        flush_interval_seconds: float = 5.0,
+        minute_retention: timedelta = timedelta(hours=48),
+        hour_retention: timedelta = timedelta(days=90),
+    ):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.retention = {"minute": minute_retention, "hour": hour_retention}
+        self.collection = None
+        # (granularidade, cliente, início do intervalo) -> [contagem, último horário]
+        self.pending: Dict[Tuple[str, str, datetime], List[Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.flushed_batches = 0
+        # Checks anteriores ao corte são do backfill (None: sem backfill, conta tudo)
+        self.cutoff: Optional[datetime] = None
+
+    async def ensure_indexes(self, db, collection_name: str = "status_check_rollups") -> None:
+        """Índices da coleção de rollups (roda no aquecimento, com as novas tentativas dele)"""
+        self.collection = db[collection_name]
+        await self.collection.create_index([("granularity", 1), ("bucket", 1)])
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def start(self, db, collection_name: str = "status_check_rollups") -> None:
+        if self.collection is None:
+            self.collection = db[collection_name]
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="status-rollups-flusher")
+
+    async def stop(self) -> None:
+        """Para o flush periódico (sem cancelar um flush em andamento) e grava os contadores pendentes"""
+        self._stopping = True
+        self._wake.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.collection is not None:
+            await self.flush()
+
+    def record(self, client_name: str, timestamp: datetime, count: int = 1) -> None:
+        if self.cutoff is not None and timestamp < self.cutoff:
+            return  # contado pelo backfill
+        for granularity in GRANULARITY_SECONDS:
+            key = (granularity, client_name, bucket_start(timestamp, granularity))
+            entry = self.pending.get(key)
+            if entry is None:
+                self.pending[key] = [count, timestamp]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], timestamp)
+
+    async def flush(self) -> int:
+        """Grava os contadores pendentes. Retorna quantos rollups foram atualizados."""
+        if not self.pending or self.collection is None:
+            return 0
+        pending, self.pending = self.pending, {}
+        operations = [
+            UpdateOne(
+                {"_id": f"{granularity}:{bucket:%Y%m%dT%H%M}:{client_name}"},
+                {
+                    "$inc": {"count": count},
+                    "$max": {"last_seen": last_seen},
+                    "$setOnInsert": {
+                        "granularity": granularity,
+                        "client_name": client_name,
+                        "bucket": bucket,
+                        "expires_at": bucket + self.retention[granularity],
+                    },
+                },
+                upsert=True,
+            )
+            for (granularity, client_name, bucket), (count, last_seen) in pending.items()
+        ]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except asyncio.CancelledError:
+            self._requeue(pending)
+            raise
+        except Exception as e:
+            self._requeue(pending)
+            logger.error(f"Falha ao gravar rollups de status ({len(operations)} intervalos, reenfileirados): {e}")
+            return 0
+        self.flushed_batches += 1
+        return len(operations)
+
+    def _requeue(self, pending: Dict[Tuple[str, str, datetime], List[Any]]) -> None:
+        """Devolve os contadores para o próximo flush, somando ao que chegou nesse meio tempo"""
+        for key, (count, last_seen) in pending.items():
+            entry = self.pending.setdefault(key, [0, last_seen])
+            entry[0] += count
+            entry[1] = max(entry[1], last_seen)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                break  # o stop() faz o flush final
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Erro no flush periódico dos rollups de status: {e}")
+
+    async def _pin_cutoff(self) -> datetime:
+        """Lê o corte do backfill, criando-o se este for o primeiro worker a aquecer"""
+        try:
+            marker = await self.collection.find_one_and_update(
+                {"_id": BACKFILL_CUTOFF_ID},
+                {"$setOnInsert": {"granularity": "meta", "cutoff": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Outro worker criou o corte ao mesmo tempo
+            marker = await self.collection.find_one({"_id": BACKFILL_CUTOFF_ID})
+        return marker["cutoff"]
+
+    async def backfill(self, source) -> int:
+        """
+        Gera os rollups a partir dos status checks brutos ainda dentro da
+        retenção e anteriores ao corte (ver _pin_cutoff). Cada rollup só recebe a contagem histórica uma vez
+        (backfilled), então uma execução interrompida pode ser repetida e
+        workers simultâneos não duplicam contagens. O marcador é gravado ao
+        final e faz as próximas inicializações pularem o backfill.
+        """
+        self.cutoff = await self._pin_cutoff()
+        if await self.collection.find_one({"_id": BACKFILL_MARKER_ID}) is not None:
+            return 0
+        since = datetime.utcnow() - max(self.retention.values())
+        counts: Dict[Tuple[str, str, datetime], List[Any]] = {}
+        processed = 0
+        cursor = source.find(
+            {"timestamp": {"$gte": since, "$lt": self.cutoff}}, {"_id": 0, "client_name": 1, "timestamp": 1}
+        )
+        async for document in cursor:
+            for granularity in GRANULARITY_SECONDS:
+                key = (granularity, document["client_name"], bucket_start(document["timestamp"], granularity))
+                entry = counts.setdefault(key, [0, document["timestamp"]])
+                entry[0] += 1
+                entry[1] = max(entry[1], document["timestamp"])
+            processed += 1
+
+        operations = [
+            UpdateOne(
+                # Sem match (já aplicado) o upsert colide no _id e a operação é ignorada
+                {"_id": f"{granularity}:{bucket:%Y%m%dT%H%M}:{client_name}", "backfilled": {"$ne": True}},
+                {
+                    "$inc": {"count": count},
+                    "$max": {"last_seen": last_seen},
+                    "$set": {"backfilled": True},
+                    "$setOnInsert": {
+                        "granularity": granularity,
+                        "client_name": client_name,
+                        "bucket": bucket,
+                        "expires_at": bucket + self.retention[granularity],
+                    },
+                },
+                upsert=True,
+            )
+            for (granularity, client_name, bucket), (count, last_seen) in counts.items()
+        ]
+        if operations:
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                    raise
+        await self.collection.update_one(
+            {"_id": BACKFILL_MARKER_ID},
+            {"$set": {"granularity": "meta", "at": datetime.utcnow(), "processed": processed}},
+            upsert=True,
+        )
+        return processed
+
+    def granularity_for(self, window: timedelta) -> str:
+        """Minuto para janelas curtas (até 3h e dentro da retenção), hora para as demais"""
+        if window <= min(timedelta(hours=3), self.retention["minute"]):
+            return "minute"
+        return "hour"
+
+    async def summary(self, window: timedelta) -> Dict[str, Any]:
+        """Contagem e último horário por cliente na janela, a partir dos rollups"""
+        await self.flush()
+        granularity = self.granularity_for(window)
+        since = bucket_start(datetime.utcnow() - window, granularity)
+        pipeline = [
+            {"$match": {"granularity": granularity, "bucket": {"$gte": since}}},
+            {"$group": {"_id": "$client_name", "count": {"$sum": "$count"}, "last_seen": {"$max": "$last_seen"}}},
+            {"$sort": {"count": -1}},
+        ]
+        clients = [
+            {"client_name": row["_id"], "count": row["count"], "last_seen": row["last_seen"]}
+            async for row in self.collection.aggregate(pipeline)
+        ]
+        return {
+            "granularity": granularity,
+            "since": since,
+            "total": sum(client["count"] for client in clients),
+            "clients": clients,
+        }
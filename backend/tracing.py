@@ -0,0 +1,480 @@
+# backend/tracing.py
+"""
+Tracing leve de requisições (compatível com OTLP, sem o SDK do OpenTelemetry)
+
+- TracingMiddleware abre um span raiz por requisição (respeitando o
+  cabeçalho W3C traceparent) e decide a amostragem uma única vez
+- tracer.span("nome") cria spans filhos a partir do span atual, guardado
+  em uma ContextVar; fora de um trace amostrado devolve um span nulo
+- MongoTracingListener transforma cada comando do MongoDB em um span filho
+  (o Motor copia o contexto para as threads do executor)
+- Os spans terminados vão para uma fila e são exportados em lotes por uma
+  task em background: JSONFileExporter (JSON lines) ou OTLPHTTPExporter
+  (OTLP/HTTP com corpo JSON, aceito pelo OpenTelemetry Collector, Jaeger,
+  Tempo e afins)
+
+Configuração (build_tracer_from_env):
+    TRACING_ENABLED=true
+    TRACING_SAMPLE_RATIO=0.1
+    TRACING_EXPORTER=json|otlp
+    TRACING_FILE=traces.jsonl
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318
+    OTEL_EXPORTER_OTLP_HEADERS=authorization=Bearer xyz
+    OTEL_SERVICE_NAME=vertextarget-api
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Tipos de span (mesma numeração do OTLP)
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class _Trace:
+    """Spans de um mesmo trace, entregues ao processador quando a raiz termina"""
+
+    __slots__ = ("trace_id", "spans", "finished", "processor")
+
+    def __init__(self, trace_id: str, processor: "BatchSpanProcessor"):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.finished = False
+        self.processor = processor
+
+    def add(self, span: "Span") -> None:
+        if self.finished:
+            # Span de uma task que sobreviveu à requisição: exporta sozinho
+            self.processor.enqueue([span])
+        else:
+            self.spans.append(span)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str] = None, kind: int = KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            self.trace.add(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1_000_000, 3),
+            "attributes": self.attributes,
+            "status": {STATUS_UNSET: "unset", STATUS_OK: "ok", STATUS_ERROR: "error"}[self.status],
+            "status_message": self.status_message or None,
+        }
+
+
+class _NoopSpan:
+    """Devolvido fora de traces amostrados; aceita as mesmas chamadas sem custo"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# =============================================================================
+# EXPORTADORES
+# =============================================================================
+
+class JSONFileExporter:
+    """Um span por linha (JSON lines), útil em desenvolvimento"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as output:
+            output.write("\n".join(lines) + "\n")
+
+    async def export(self, spans: List[Span]) -> None:
+        lines = [json.dumps(span.to_dict(), default=str, ensure_ascii=False) for span in spans]
+        await asyncio.to_thread(self._write, lines)
+
+    async def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class OTLPHTTPExporter:
+    """Envia os spans para {endpoint}/v1/traces no formato OTLP/HTTP JSON"""
+
+    def __init__(self, endpoint: str, service_name: str, headers: Optional[Dict[str, str]] = None, timeout_seconds: float = 5.0):
+        endpoint = endpoint.rstrip("/")
+        self.endpoint = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self.service_name = service_name
+        self.client = httpx.AsyncClient(headers=headers or {}, timeout=timeout_seconds)
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "vertextarget.tracing"},
+                    "spans": [
+                        {
+                            "traceId": span.trace_id,
+                            "spanId": span.span_id,
+                            **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                            "name": span.name,
+                            "kind": span.kind,
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": _otlp_attributes(span.attributes),
+                            "status": {"code": span.status, **({"message": span.status_message} if span.status_message else {})},
+                        }
+                        for span in spans
+                    ],
+                }],
+            }]
+        }
+
+    async def export(self, spans: List[Span]) -> None:
+        response = await self.client.post(self.endpoint, json=self._payload(spans))
+        response.raise_for_status()
+
+    async def shutdown(self) -> None:
+        await self.client.aclose()
+
+
+class BatchSpanProcessor:
+    """
+    Fila de spans terminados exportada em lotes por uma task em background.
+    deque é segura para append a partir das threads dos listeners do pymongo.
+    """
+
+    def __init__(self, exporter, max_queue_size: int = 10000, max_batch_size: int = 512, interval_seconds: float = 5.0):
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.interval_seconds = interval_seconds
+        self.queue: deque = deque()
+        self.dropped = 0
+        self.exported = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, spans: List[Span]) -> None:
+        if len(self.queue) + len(spans) > self.max_queue_size:
+            self.dropped += len(spans)
+            return
+        self.queue.extend(spans)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="trace-exporter")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        await self.exporter.shutdown()
+
+    async def flush(self) -> None:
+        while self.queue:
+            batch = [self.queue.popleft() for _ in range(min(self.max_batch_size, len(self.queue)))]
+            try:
+                await self.exporter.export(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                # Tracing nunca pode derrubar a aplicação: o lote é descartado
+                self.dropped += len(batch)
+                logger.warning(f"Falha ao exportar {len(batch)} spans: {e}")
+                return
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.flush()
+
+
+# =============================================================================
+# TRACER
+# =============================================================================
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Lê o cabeçalho W3C traceparent: (trace_id, parent_span_id, amostrado)"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 0x01)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class Tracer:
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None, sample_ratio: float = 0.1):
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def _should_sample(self, trace_id: str) -> bool:
+        # Decisão determinística pelo trace_id: o mesmo trace é amostrado em todos os serviços
+        return int(trace_id[:16], 16) / 2 ** 64 < self.sample_ratio
+
+    def start_root(self, name: str, traceparent: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """Abre o span raiz de uma requisição; None se o trace não for amostrado"""
+        if not self.enabled:
+            return None
+        parent = parse_traceparent(traceparent)
+        if parent:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = self._should_sample(trace_id)
+        if not sampled:
+            return None
+        return Span(_Trace(trace_id, self.processor), name, parent_id=parent_id, kind=KIND_SERVER, attributes=attributes)
+
+    def finish_root(self, span: Span) -> None:
+        span.end()
+        span.trace.finished = True
+        self.processor.enqueue(span.trace.spans)
+        span.trace.spans = []
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @staticmethod
+    def activate(span: Optional[Span]):
+        return _current_span.set(span)
+
+    @staticmethod
+    def deactivate(token) -> None:
+        _current_span.reset(token)
+
+    def child_of_current(self, name: str, kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None,
+                         start_ns: Optional[int] = None) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(parent.trace, name, parent_id=parent.span_id, kind=kind, attributes=attributes, start_ns=start_ns)
+
+    @contextmanager
+    def span(self, name: str, kind: int = KIND_INTERNAL, **attributes):
+        """Span filho do span atual (no-op fora de um trace amostrado)"""
+        span = self.child_of_current(name, kind, attributes)
+        if span is None:
+            yield NOOP_SPAN
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def traced(self, name: str, **attributes):
+        """Decorador para funções async: executa a função dentro de um span"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.span(name, **attributes):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    async def start(self) -> None:
+        if self.processor:
+            await self.processor.start()
+
+    async def stop(self) -> None:
+        if self.processor:
+            await self.processor.stop()
+
+
+class TracingMiddleware:
+    """
+    Span raiz por requisição HTTP. O nome usa o template da rota
+    (scope["route"], preenchido pelo roteador do FastAPI) para agrupar
+    requisições da mesma rota.
+    """
+
+    def __init__(self, app, tracer: Tracer, excluded_paths=("/metrics",)):
+        self.app = app
+        self.tracer = tracer
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span = self.tracer.start_root(
+            scope["method"], traceparent,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = STATUS_ERROR
+            await send(message)
+
+        token = self.tracer.activate(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            self.tracer.deactivate(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute("http.route", route)
+            self.tracer.finish_root(span)
+
+
+class MongoTracingListener(monitoring.CommandListener):
+    """Um span CLIENT por comando do MongoDB, filho do span ativo na requisição"""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._spans: Dict[Tuple[Any, int], Span] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        span = self.tracer.child_of_current(
+            f"mongo.{event.command_name}", kind=KIND_CLIENT,
+            attributes={
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": collection if isinstance(collection, str) else None,
+            },
+        )
+        if span is not None:
+            self._spans[(event.connection_id, event.request_id)] = span
+
+    def _finish(self, event, error: Optional[str] = None) -> None:
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is None:
+            return
+        if error:
+            span.status = STATUS_ERROR
+            span.status_message = error
+        span.end(span.start_ns + event.duration_micros * 1000)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, error=str(event.failure.get("errmsg", "falha no comando")))
+
+
+def build_tracer_from_env(environ=os.environ) -> Tracer:
+    """Tracer configurado pelas variáveis TRACING_* / OTEL_* (desativado por padrão)"""
+    if environ.get("TRACING_ENABLED", "false").lower() != "true":
+        return Tracer()
+
+    exporter_name = environ.get("TRACING_EXPORTER", "json").lower()
+    if exporter_name == "otlp":
+        headers = dict(
+            pair.split("=", 1) for pair in environ.get("OTEL_EXPORTER_OTLP_HEADERS", "").split(",") if "=" in pair
+        )
+        exporter = OTLPHTTPExporter(
+            endpoint=environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"),
+            service_name=environ.get("OTEL_SERVICE_NAME", "vertextarget-api"),
+            headers={key.strip(): value.strip() for key, value in headers.items()},
+        )
+        target = exporter.endpoint
+    else:
+        exporter = JSONFileExporter(environ.get("TRACING_FILE", "traces.jsonl"))
+        target = exporter.path
+
+    sample_ratio = float(environ.get("TRACING_SAMPLE_RATIO", "0.1"))
+    logger.info(f"Tracing ativo ({exporter_name} -> {target}, amostragem {sample_ratio:.0%})")
+    return Tracer(BatchSpanProcessor(exporter), sample_ratio=sample_ratio)
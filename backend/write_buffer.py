@@ -0,0 +1,202 @@
+# backend/write_buffer.py
+"""
+Buffer de escrita (write-behind) para inserções de alto volume
+
+Agrupa documentos por coleção e os grava com insert_many quando o lote
+atinge max_batch_size ou quando flush_interval_seconds se passa, trocando
+milhares de insert_one por poucos round-trips ao MongoDB.
+
+Modos de durabilidade:
+    flush   -> insert() só retorna depois que o lote com o documento foi
+               gravado (erros chegam ao chamador); latência extra de até
+               flush_interval_seconds
+    enqueue -> insert() retorna assim que o documento entra no buffer; falhas
+               transitórias são reenfileiradas até max_retries vezes e
+               documentos ainda no buffer se perdem se o processo morrer
+               sem passar pelo stop()
+
+O stop() nunca cancela um flush em andamento: sinaliza o loop, espera o
+lote atual terminar e grava o que restou no buffer.
+
+Com enabled=False o buffer apenas repassa para insert_one.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_FLUSH = "flush"
+DURABILITY_ENQUEUE = "enqueue"
+
+
+@dataclass
+class _PendingWrite:
+    document: Dict[str, Any]
+    future: Optional[asyncio.Future] = None
+    retries: int = 0
+
+
+@dataclass
+class _CollectionBuffer:
+    pending: List[_PendingWrite] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_batch_size: int = 500,
+        flush_interval_seconds: float = 0.05,
+        durability: str = DURABILITY_FLUSH,
+        max_retries: int = 3,
+    ):
+        if durability not in (DURABILITY_FLUSH, DURABILITY_ENQUEUE):
+            raise ValueError(f"Modo de durabilidade inválido: {durability}")
+        self.enabled = enabled
+        self.max_batch_size = max_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.durability = durability
+        self.max_retries = max_retries
+
+        self.db = None
+        self.buffers: Dict[str, _CollectionBuffer] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.flushed_batches = 0
+        self.flushed_documents = 0
+
+    async def start(self, db) -> None:
+        self.db = db
+        if not self.enabled:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="write-behind-flusher")
+        logger.info(
+            f"Buffer de escrita ativo (lotes de {self.max_batch_size}, "
+            f"{self.flush_interval_seconds * 1000:.0f}ms, modo '{self.durability}')"
+        )
+
+    async def stop(self) -> None:
+        """Para o flush periódico e grava tudo o que ainda estiver no buffer"""
+        self._stopping = True
+        self._wake.set()
+        if self._task:
+            # Sem cancel(): o lote em gravação já saiu de pending e se perderia
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        if self.enabled and self.db is not None:
+            await self.flush()
+            pending = [write for buffer in self.buffers.values() for write in buffer.pending]
+            for buffer in self.buffers.values():
+                buffer.pending.clear()
+            for write in pending:
+                if write.future is not None and not write.future.done():
+                    write.future.set_exception(RuntimeError("Buffer de escrita encerrado sem gravar o documento"))
+            if pending:
+                logger.error(f"Buffer de escrita encerrado com {len(pending)} documentos não gravados")
+
+    async def insert(self, collection_name: str, document: Dict[str, Any]) -> None:
+        """Insere o documento através do buffer (ou diretamente, se desativado)"""
+        if not self.enabled or self._stopping:
+            await self.db[collection_name].insert_one(document)
+            return
+
+        write = _PendingWrite(document=document)
+        if self.durability == DURABILITY_FLUSH:
+            write.future = asyncio.get_running_loop().create_future()
+
+        buffer = self.buffers.setdefault(collection_name, _CollectionBuffer())
+        buffer.pending.append(write)
+        if len(buffer.pending) >= self.max_batch_size:
+            # Referência guardada: o stop() espera estes flushes antes do final
+            task = asyncio.create_task(self.flush(collection_name))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+        if write.future is not None:
+            await write.future
+
+    async def flush(self, collection_name: Optional[str] = None) -> int:
+        """Grava os documentos pendentes (de uma coleção ou de todas). Retorna quantos foram gravados."""
+        names = [collection_name] if collection_name else list(self.buffers)
+        written = 0
+        for name in names:
+            buffer = self.buffers.get(name)
+            if buffer is None:
+                continue
+            async with buffer.lock:
+                while buffer.pending:
+                    batch = buffer.pending[:self.max_batch_size]
+                    del buffer.pending[:len(batch)]
+                    batch_written, requeued = await self._write_batch(name, batch)
+                    written += batch_written
+                    if requeued:
+                        break  # falha transitória: tenta de novo no próximo ciclo
+        return written
+
+    async def _write_batch(self, collection_name: str, batch: List[_PendingWrite]):
+        """Grava um lote. Retorna (documentos gravados, quantos foram reenfileirados)."""
+        documents = [write.document for write in batch]
+        failed: Dict[int, Exception] = {}
+        retry: List[_PendingWrite] = []
+        try:
+            await self.db[collection_name].insert_many(documents, ordered=False)
+        except asyncio.CancelledError:
+            # Flush interrompido: devolve o lote inteiro ao buffer (com os futures
+            # pendentes) para o próximo flush ou o stop() gravar ou falhar cada um
+            self.buffers[collection_name].pending[:0] = batch
+            raise
+        except BulkWriteError as e:
+            # Erros por documento (ex.: chave duplicada) não são transitórios: não reenfileira
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = e
+        except Exception as e:
+            retry = [w for w in batch if w.future is None and w.retries < self.max_retries]
+            for write in retry:
+                write.retries += 1
+            self.buffers[collection_name].pending[:0] = retry
+            retried = {id(write) for write in retry}
+            for index, write in enumerate(batch):
+                if id(write) not in retried:
+                    failed[index] = e
+            logger.error(f"Falha ao gravar lote em {collection_name} ({len(batch)} docs, {len(retry)} reenfileirados): {e}")
+
+        for index, write in enumerate(batch):
+            error = failed.get(index)
+            if write.future is not None and not write.future.done():
+                if error is None:
+                    write.future.set_result(None)
+                else:
+                    write.future.set_exception(error)
+            elif error is not None and write.future is None:
+                logger.error(f"Documento descartado do buffer de {collection_name}: {error}")
+
+        written = len(batch) - len(failed) - len(retry)
+        if written:
+            self.flushed_batches += 1
+            self.flushed_documents += written
+        return written, len(retry)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                break  # o stop() faz o flush final
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Erro no flush periódico do buffer de escrita: {e}")
@@ -1,115 +1,368 @@
 # content_agent.py
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
+"""
+Agente de Conteúdo: gera o portfólio e os depoimentos do site com o Gemini
+
+Cada item é gerado numa chamada própria, em paralelo (os depoimentos depois
+dos projetos, porque citam um deles), e validado com os mesmos modelos da
+API (PortfolioItemCreate e TestimonialCreate). Só os itens rejeitados são
+pedidos de novo, com o erro no prompt, até --attempts vezes.
+
+Cada item ocupa uma vaga (slot): o SHA-256 do seu prompt, que não muda entre
+execuções. Uma vaga já gravada é reaproveitada sem chamar o Gemini, então
+repetir a execução é rápido e não regrava nada (a geração usa temperatura
+alta e o mesmo prompt daria outro texto). --regenerate pede tudo de novo e
+atualiza as vagas existentes. A gravação é um bulk_write com upsert por vaga;
+os itens de vagas que deixaram de existir (ex.: prompt alterado) só são
+removidos depois que todos os novos estão gravados; itens criados pelo
+painel nunca são tocados.
+
+A versão anterior do agente gravava a resposta do Gemini sem id nem
+generated_by. Esses itens são marcados como do agente na primeira gravação
+(migração única: o painel, a API e os seeds sempre gravam id) e saem do
+site assim que uma execução completa grava o conteúdo novo.
+
+    python content_agent.py
+    python content_agent.py --regenerate       # gera de novo as vagas já gravadas
+    python content_agent.py --dry-run          # gera e valida, sem gravar
+    GEMINI_BACKEND=fake python content_agent.py
+"""
+import argparse
+import asyncio
+import hashlib
 import json
-from pymongo import MongoClient
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Type
 
-# --- 1. CONFIGURAÇÃO E CONEXÃO ---
+from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
 
-print(">>> A iniciar o Agente de Conteúdo...")
+# --- 1. CONFIGURAÇÃO ---
 
 # Carrega as variáveis de ambiente do ficheiro .env
-# Garante que os ficheiros .env no root e no backend são carregados
+# Garante que os ficheiros .env no root e no backend são carregados antes do server
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
 load_dotenv()
-load_dotenv(os.path.join(os.path.dirname(__file__), 'backend', '.env'))
-
-# Configuração da API do Gemini
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("❌ ERRO: A chave da API do Gemini (GEMINI_API_KEY) não foi encontrada no ficheiro .env")
-    exit()
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-1.5-pro-latest')
-
-# Configuração da Conexão com o MongoDB
-MONGO_URI = os.getenv("MONGO_URL")
-if not MONGO_URI:
-    print("❌ ERRO: A chave de conexão do MongoDB (MONGO_URL) não foi encontrada.")
-    exit()
-
-try:
-    print(">>> A conectar-se ao MongoDB Atlas...")
-    client = MongoClient(MONGO_URI)
-    db = client.vertex_target_db # Use o mesmo nome de base de dados do seu server.py
-    # Testa a conexão
-    client.admin.command('ping')
-    print("✅ Conexão com o MongoDB estabelecida com sucesso!")
-except Exception as e:
-    print(f"❌ ERRO: Falha ao conectar com o MongoDB. Detalhe: {e}")
-    exit()
-
-# --- 2. PROMPT PARA GERAÇÃO DE CONTEÚDO ---
-
-prompt_para_ia = """
+load_dotenv(os.path.join(BACKEND_DIR, '.env'))
+sys.path.insert(0, BACKEND_DIR)
+
+# Mesma configuração do backend: MONGO_URL/DB_NAME, Gemini (GEMINI_BACKEND=fake
+# usa o Gemini de teste) e os modelos de validação da API. O banco é o do
+# backend (DB_NAME); a versão anterior do agente usava sempre vertex_target_db
+import server  # noqa: E402
+
+GENERATED_BY = "content_agent"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 1.0
+
+# A resposta é pedida já em JSON: dispensa limpar cercas de markdown
+GENERATION_CONFIG = {"response_mime_type": "application/json", "temperature": 0.9}
+
+# --- 2. PROMPTS ---
+
+AGENCY_CONTEXT = """
 Você é um Diretor de Marketing e Conteúdo da agência de tecnologia "Vertex Target".
 A Vertex Target é especializada em 3 áreas:
 1.  Marketing Digital de Performance
 2.  Desenvolvimento Web/Mobile (FinTech, HealthTech, etc.)
 3.  Automação com Inteligência Artificial
 
-Sua tarefa é gerar conteúdo para o novo site da agência. O conteúdo deve ser profissional, realista e demonstrar expertise.
+O conteúdo é para o site da agência e deve ser profissional, realista e demonstrar expertise.
+"""
 
-Gere uma resposta em formato JSON contendo duas listas: "portfolio_items" e "testimonials".
+PORTFOLIO_AREAS = [
+    "Marketing Digital de Performance",
+    "Desenvolvimento Web/Mobile",
+    "Automação com Inteligência Artificial",
+]
+TESTIMONIAL_COUNT = 2
 
-**1. portfolio_items:**
-   - Crie 3 projetos de portfólio fictícios, um para cada área de especialização.
-   - Para o campo "image", use URLs de placeholder do site `https://placehold.co/`. Formato: `https://placehold.co/600x400/5d3a9b/ffffff?text=Nome+Do+Projeto`.
-   - Preencha todos os campos do modelo Pydantic `PortfolioItemCreate` do nosso backend. Os campos são: title, category, image, metric, description, technologies, results, challenge, solution, outcome.
+PORTFOLIO_PROMPT = """TAREFA: projeto de portfólio
+{context}
+Crie 1 projeto de portfólio fictício.
+ÁREA: {area}
 
-**2. testimonials:**
-   - Crie 2 depoimentos fictícios de clientes.
-   - Os clientes e os projetos mencionados devem ser consistentes com os projetos criados acima.
-   - Para o campo "avatar", use URLs de placeholder do site `https://i.pravatar.cc/150?u=email@cliente.com`.
-   - Preencha todos os campos do modelo Pydantic `TestimonialCreate`. Os campos são: name, position, company, avatar, quote, rating, project.
+Responda apenas com um objeto JSON com os campos do modelo PortfolioItemCreate:
+- title (até 200 caracteres), category (use exatamente a área acima), metric (até 100 caracteres)
+- image: `https://placehold.co/600x400/5d3a9b/ffffff?text=Nome+Do+Projeto`
+- description (até 500 caracteres), challenge, solution, outcome
+- technologies: lista de textos (pelo menos 1)
+- results: objeto de texto para texto (ex.: {{"roi": "+120%"}})
+"""
+
+TESTIMONIAL_PROMPT = """TAREFA: depoimento de cliente
+{context}
+Crie 1 depoimento fictício do cliente deste projeto:
+PROJETO: {title}
+CATEGORIA: {category}
+RESULTADO: {outcome}
+
+Responda apenas com um objeto JSON com os campos do modelo TestimonialCreate:
+- name, position, company (até 100 caracteres cada)
+- avatar: `https://i.pravatar.cc/150?u=email@cliente.com`
+- quote (10 a 1000 caracteres), rating (inteiro de 1 a 5)
+- project: exatamente o nome do projeto acima
+"""
 
-O JSON final deve ser válido e pronto para ser usado. Não adicione nenhum texto ou explicação fora do bloco JSON.
+RETRY_SUFFIX = """
+A resposta anterior foi rejeitada: {error}
+Corrija e responda apenas com o objeto JSON.
 """
 
-# --- 3. EXECUÇÃO E INSERÇÃO NA BASE DE DADOS ---
+# --- 3. GERAÇÃO E VALIDAÇÃO ---
+
+@dataclass
+class GeneratedItem:
+    key: str
+    slot: str = ""
+    item: Optional[BaseModel] = None
+    reused: bool = False
+    attempts: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class AgentReport:
+    portfolio: List[GeneratedItem] = field(default_factory=list)
+    testimonials: List[GeneratedItem] = field(default_factory=list)
+    written: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    legacy_adopted: int = 0
+
+    @property
+    def failed(self) -> List[GeneratedItem]:
+        return [entry for entry in self.portfolio + self.testimonials if entry.item is None]
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed and len(self.testimonials) == TESTIMONIAL_COUNT
+
+
+def parse_json_object(text: str) -> dict:
+    """Lê o primeiro objeto JSON da resposta (tolera texto ou cercas em volta)"""
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("a resposta não contém um objeto JSON")
+    data, _ = json.JSONDecoder().raw_decode(text, start)
+    return data
+
+
+def prompt_slot(prompt: str) -> str:
+    """Chave do upsert: o mesmo prompt sempre ocupa a mesma vaga"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'objeto'}: {e['msg']}" for e in error.errors())
+    return str(error) or type(error).__name__
 
-def popular_base_de_dados():
+
+async def generate_item(
+    model,
+    semaphore: asyncio.Semaphore,
+    key: str,
+    prompt: str,
+    schema: Type[BaseModel],
+    max_attempts: int,
+    overrides: Optional[dict] = None,
+    stored: Optional[Dict[str, dict]] = None,
+) -> GeneratedItem:
+    """
+    Gera e valida um item; só este item é pedido de novo se falhar. Se a vaga
+    já está gravada (stored), reaproveita o item sem chamar o Gemini.
+    """
+    entry = GeneratedItem(key=key, slot=prompt_slot(prompt))
+    if stored and entry.slot in stored:
+        entry.item = schema.model_validate({**stored[entry.slot], **(overrides or {})})
+        entry.reused = True
+        return entry
+    feedback = ""
+    while entry.attempts < max_attempts:
+        entry.attempts += 1
+        request = prompt + feedback
+        try:
+            async with semaphore:
+                response = await asyncio.to_thread(model.generate_content, request, generation_config=GENERATION_CONFIG)
+            data = parse_json_object(response.text)
+            if not isinstance(data, dict):
+                raise ValueError("a resposta não é um objeto JSON")
+            entry.item = schema.model_validate({**data, **(overrides or {})})
+            return entry
+        except ValueError as e:
+            # JSON inválido ou reprovado na validação (ValidationError é um ValueError)
+            entry.errors.append(_describe(e))
+            feedback = RETRY_SUFFIX.format(error=entry.errors[-1])
+        except Exception as e:
+            # Quota ou erro da API: espera e repete o mesmo prompt
+            entry.errors.append(_describe(e))
+            if entry.attempts < max_attempts:
+                await asyncio.sleep(RETRY_DELAY_SECONDS * 2 ** (entry.attempts - 1))
+        print(f"    ⚠️  {key}: tentativa {entry.attempts} rejeitada ({entry.errors[-1]})")
+    return entry
+
+
+async def generate_content(
+    model,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_attempts: int = DEFAULT_ATTEMPTS,
+    stored: Optional[Dict[str, dict]] = None,
+) -> AgentReport:
     """
-    Função principal que gera o conteúdo e o insere na base de dados.
+    Gera os projetos em paralelo e, em seguida, os depoimentos sobre os
+    projetos gerados; as vagas presentes em stored não são geradas de novo
     """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    report = AgentReport()
+
+    report.portfolio = list(await asyncio.gather(*[
+        generate_item(model, semaphore, f"portfolio:{area}",
+                      PORTFOLIO_PROMPT.format(context=AGENCY_CONTEXT, area=area),
+                      server.PortfolioItemCreate, max_attempts, stored=stored)
+        for area in PORTFOLIO_AREAS
+    ]))
+
+    projects = [entry.item for entry in report.portfolio if entry.item is not None][:TESTIMONIAL_COUNT]
+    report.testimonials = list(await asyncio.gather(*[
+        generate_item(model, semaphore, f"testimonial:{project.title}",
+                      TESTIMONIAL_PROMPT.format(context=AGENCY_CONTEXT, title=project.title,
+                                                category=project.category, outcome=project.outcome),
+                      server.TestimonialCreate, max_attempts,
+                      overrides={"project": project.title[:100]}, stored=stored)
+        for project in projects
+    ]))
+    return report
+
+# --- 4. GRAVAÇÃO NA BASE DE DADOS ---
+
+async def ensure_slot_indexes(db) -> None:
+    """Índice único só para os itens do agente (os criados pelo painel não têm slot)"""
+    for collection in (db.portfolio, db.testimonials):
+        await collection.create_index("slot", unique=True, partialFilterExpression={"slot": {"$exists": True}})
+
+
+# Itens gravados pela versão anterior do agente (todos os outros caminhos gravam id)
+LEGACY_FILTER = {"generated_by": {"$exists": False}, "id": {"$exists": False}}
+
+
+async def adopt_legacy_content(db) -> int:
+    """Marca como do agente os itens da versão anterior, para a limpeza removê-los"""
+    adopted = 0
+    for collection in (db.portfolio, db.testimonials):
+        result = await collection.update_many(LEGACY_FILTER, {"$set": {"generated_by": GENERATED_BY}})
+        adopted += result.modified_count
+    return adopted
+
+
+async def load_stored_items(db) -> Dict[str, dict]:
+    """Itens já gravados pelo agente, por vaga"""
+    stored = {}
+    for collection in (db.portfolio, db.testimonials):
+        async for document in collection.find({"generated_by": GENERATED_BY, "slot": {"$exists": True}}, {"_id": 0}):
+            stored[document["slot"]] = document
+    return stored
+
+
+async def upsert_generated(collection, entries: List[GeneratedItem], document_model: Type[BaseModel], replace_previous: bool) -> Dict[str, int]:
+    """
+    Grava os itens gerados com upsert pela vaga (os reaproveitados não são
+    regravados) e, se replace_previous, remove depois os itens do agente de
+    vagas que não fazem parte desta execução
+    """
+    entries = [entry for entry in entries if entry.item is not None]
+    operations = []
+    for entry in entries:
+        if entry.reused:
+            continue
+        document = document_model.model_validate(entry.item.model_dump()).model_dump()
+        created = {"id": document.pop("id"), "created_at": document.pop("created_at")}
+        operations.append(UpdateOne(
+            {"slot": entry.slot},
+            {"$set": {**document, "generated_by": GENERATED_BY}, "$setOnInsert": created},
+            upsert=True,
+        ))
+    counts = {"inserted": 0, "updated": 0, "unchanged": len(entries) - len(operations), "removed": 0}
+    if operations:
+        result = await collection.bulk_write(operations, ordered=False)
+        counts["inserted"] = result.upserted_count
+        counts["updated"] = result.matched_count
+    if replace_previous:
+        slots = [entry.slot for entry in entries]
+        removed = await collection.delete_many({"generated_by": GENERATED_BY, "slot": {"$nin": slots}})
+        counts["removed"] = removed.deleted_count
+    return counts
+
+
+async def save_content(db, report: AgentReport) -> None:
+    """Só substitui o conteúdo anterior do agente se todos os itens foram gerados"""
+    await ensure_slot_indexes(db)
+    report.legacy_adopted = await adopt_legacy_content(db)
+    report.written["portfolio"] = await upsert_generated(db.portfolio, report.portfolio, server.PortfolioItem, report.complete)
+    report.written["testimonials"] = await upsert_generated(db.testimonials, report.testimonials, server.Testimonial, report.complete)
+    # Escrita fora da API: recalcula as facetas (o backend recebe o resto pelo change stream)
+    await server.rebuild_portfolio_facets()
+
+# --- 5. EXECUÇÃO ---
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Gera o portfólio e os depoimentos do site com o Gemini")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Chamadas simultâneas ao Gemini")
+    parser.add_argument("--attempts", type=int, default=DEFAULT_ATTEMPTS, help="Tentativas por item")
+    parser.add_argument("--regenerate", action="store_true", help="Gera de novo as vagas já gravadas")
+    parser.add_argument("--dry-run", action="store_true", help="Gera e valida sem gravar na base de dados")
+    args = parser.parse_args()
+
+    print(">>> A iniciar o Agente de Conteúdo...")
+    if not server.gemini_available():
+        print("❌ ERRO: A chave da API do Gemini (GEMINI_API_KEY) não foi encontrada no ficheiro .env")
+        return 1
+    if server.db is None and not args.dry_run:
+        print("❌ ERRO: A chave de conexão do MongoDB (MONGO_URL) não foi encontrada.")
+        return 1
+
     try:
-        print("\n>>> A gerar conteúdo com a API do Gemini... Isto pode demorar um momento.")
-        resposta = model.generate_content(prompt_para_ia)
-        
-        # Limpa a resposta para garantir que é um JSON válido
-        json_text = resposta.text.strip().replace("```json", "").replace("```", "")
-        dados = json.loads(json_text)
-        
-        portfolio_items = dados.get("portfolio_items", [])
-        testimonials = dados.get("testimonials", [])
-        
-        if not portfolio_items or not testimonials:
-            print("❌ ERRO: A IA não retornou o conteúdo esperado. A tentar novamente.")
-            return
-
-        print(f"✅ Conteúdo gerado com sucesso: {len(portfolio_items)} projetos e {len(testimonials)} depoimentos.")
-        
-        # Inserir na base de dados
-        print(">>> A inserir conteúdo na base de dados...")
-        
-        # Limpa as coleções existentes para evitar duplicados
-        db.portfolio.delete_many({})
-        db.testimonials.delete_many({})
-        print("    - Coleções antigas limpas.")
-        
-        # Insere os novos dados
-        if portfolio_items:
-            db.portfolio.insert_many(portfolio_items)
-            print(f"    - {len(portfolio_items)} projetos inseridos na coleção 'portfolio'.")
-        if testimonials:
-            db.testimonials.insert_many(testimonials)
-            print(f"    - {len(testimonials)} depoimentos inseridos na coleção 'testimonials'.")
-            
-        print("\n🎉 MISSÃO CUMPRIDA! A base de dados foi populada com sucesso.")
-        print("Verifique o seu site. O novo conteúdo e as imagens devem estar a aparecer.")
+        if not args.dry_run:
+            print(">>> A conectar-se ao MongoDB...")
+            await server.client.admin.command('ping')
+            print(f"✅ Conexão com o MongoDB estabelecida com sucesso! (banco: {server.db.name})")
+
+        print(f"\n>>> A gerar conteúdo com a API do Gemini ({args.concurrency} em paralelo)...")
+        stored = None if args.dry_run or args.regenerate else await load_stored_items(server.db)
+        report = await generate_content(server.get_gemini_model(), args.concurrency, args.attempts, stored)
+        for entry in report.portfolio + report.testimonials:
+            status = "✅" if entry.item is not None else "❌"
+            detail = "já gravado" if entry.reused else f"{entry.attempts} tentativa(s)"
+            print(f"    {status} {entry.key} ({detail})")
+        if not report.portfolio or all(entry.item is None for entry in report.portfolio):
+            print("❌ ERRO: A IA não retornou nenhum projeto válido. Nada foi gravado.")
+            return 1
+
+        if args.dry_run:
+            print("\n✅ Conteúdo validado (--dry-run: nada foi gravado).")
+            return 0 if report.complete else 1
 
+        print(">>> A gravar conteúdo na base de dados...")
+        await save_content(server.db, report)
+        if report.legacy_adopted:
+            print(f"    - {report.legacy_adopted} itens da versão anterior do agente serão substituídos")
+        for name, counts in report.written.items():
+            print(f"    - {name}: {counts['inserted']} novos, {counts['updated']} atualizados, "
+                  f"{counts['unchanged']} já existentes, {counts['removed']} antigos removidos")
+
+        if not report.complete:
+            print("\n⚠️  Alguns itens falharam: o conteúdo anterior foi mantido. Execute de novo para completar.")
+            return 1
+        print("\n🎉 MISSÃO CUMPRIDA! A base de dados foi populada com sucesso.")
+        return 0
     except Exception as e:
         print(f"\n❌ Ocorreu um erro durante a execução: {e}")
+        return 1
+    finally:
+        if server.client is not None:
+            server.client.close()
+
 
 if __name__ == "__main__":
-    popular_base_de_dados()
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
@@ -137,6 +137,7 @@ def popular_base_de_dados():
         print(f"\n📊 Estatísticas finais:")
         print(f"    - Projetos no portfolio: {portfolio_count}")
         print(f"    - Depoimentos: {testimonials_count}")
+        print("\n💡 Para atualizar os filtros do portfólio: POST /api/admin/portfolio/facets/rebuild")
 
     except Exception as e:
         print(f"\n❌ Ocorreu um erro durante a execução: {e}")
@@ -15,6 +15,7 @@ import { Badge } from '../ui/badge';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '../ui/table';
 import { useAuth } from '../../contexts/AuthContext';
 import { getPortfolioProjects, createPortfolioProject, updatePortfolioProject, deletePortfolioProject } from '../../services/portfolioService';
+import { subscribeToAdminEvents } from '../../services/adminEventsService';
 import { useToast } from '../../hooks/use-toast';
 import { Loader2 } from 'lucide-react'; // Adicionado Loader2 para o botão de exclusão
 
@@ -55,6 +56,32 @@ const PortfolioManager = () => {
     };
   }, []); // Dependências vazias para rodar apenas uma vez na montagem
 
+  // Mudanças feitas por outros administradores chegam ao vivo (sem recarregar a lista inteira)
+  useEffect(() => {
+    if (!token) return undefined;
+
+    return subscribeToAdminEvents(token, (type, data) => {
+      if (!isMounted.current) return;
+      switch (type) {
+        case 'portfolio.created':
+          setProjects((current) => (current.some((project) => project.id === data.id) ? current : [...current, data]));
+          break;
+        case 'portfolio.updated':
+          setProjects((current) => current.map((project) => (project.id === data.id ? data : project)));
+          break;
+        case 'portfolio.deleted':
+          setProjects((current) => current.filter((project) => project.id !== data.id));
+          break;
+        case 'portfolio.changed':
+        case 'resync':
+          loadProjects();
+          break;
+        default:
+          break;
+      }
+    });
+  }, [token]); // eslint-disable-line react-hooks/exhaustive-deps
+
   const loadProjects = async () => {
     try {
       if (isMounted.current) setLoading(true);
@@ -11,18 +11,20 @@ import { Button } from '../components/ui/button';
 // import { Tabs, TabsContent, TabsList, TabsTrigger } from '../components/ui/tabs'; 
 import { useAuth } from '../contexts/AuthContext';
 import { usePortfolioStore, useTestimonialsStore } from '../stores';
+import { subscribeToAdminEvents } from '../services/adminEventsService';
 // Os componentes de gerenciamento serão renderizados via rotas aninhadas, não mais por TabsContent aqui
 // import PortfolioManager from '../components/admin/PortfolioManager'; 
 // import TestimonialsManager from '../components/admin/TestimonialsManager'; 
 // import UsersManager from '../components/admin/UsersManager'; 
 
 const AdminDashboard = () => {
-  const { user, logout } = useAuth();
+  const { user, logout, token } = useAuth();
   const navigate = useNavigate();
   // Removido o estado activeTab, pois não haverá abas no dashboard principal
   // const [activeTab, setActiveTab] = useState('dashboard'); 
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [newLeads, setNewLeads] = useState([]); // Leads recebidos ao vivo desde que o painel abriu
   const isMounted = useRef(true); // Flag para verificar se o componente está montado
 
   // Stores para estatísticas
@@ -30,8 +32,8 @@ const AdminDashboard = () => {
   const testimonialsStore = useTestimonialsStore();
 
   // Desestruturar estados e ações dos stores
-  const { projects, isLoading: portfolioLoading, error: portfolioError, fetchProjects } = portfolioStore;
-  const { testimonials, isLoading: testimonialsLoading, error: testimonialsError, fetchTestimonials } = testimonialsStore;
+  const { projects, isLoading: portfolioLoading, error: portfolioError, fetchProjects, addProject, updateProject, removeProject } = portfolioStore;
+  const { testimonials, isLoading: testimonialsLoading, error: testimonialsError, fetchTestimonials, addTestimonial, updateTestimonial, removeTestimonial } = testimonialsStore;
 
   // Combinar estados de loading e erro para o dashboard
   const isLoadingCombined = portfolioLoading || testimonialsLoading; // Renomeado para evitar conflito com o estado local
@@ -59,6 +61,30 @@ const AdminDashboard = () => {
     };
   }, [fetchProjects, fetchTestimonials]); // Dependências: as funções de fetch dos stores
 
+  // Eventos ao vivo: aplica as mudanças nos stores em vez de recarregar as listas
+  useEffect(() => {
+    if (!token) return undefined;
+
+    const handleEvent = (type, data) => {
+      switch (type) {
+        case 'contact.created': setNewLeads((leads) => [data, ...leads].slice(0, 50)); break;
+        case 'portfolio.created': addProject(data); break;
+        case 'portfolio.updated': updateProject(data.id, data); break;
+        case 'portfolio.deleted': removeProject(data.id); break;
+        case 'testimonial.created': addTestimonial(data); break;
+        case 'testimonial.updated': updateTestimonial(data.id, data); break;
+        case 'testimonial.deleted': removeTestimonial(data.id); break;
+        // Mudança feita em outro servidor (só sabemos que a lista mudou) ou eventos perdidos
+        case 'portfolio.changed': fetchProjects(true); break;
+        case 'testimonial.changed': fetchTestimonials(true); break;
+        case 'resync': fetchProjects(true); fetchTestimonials(true); break;
+        default: break;
+      }
+    };
+
+    return subscribeToAdminEvents(token, handleEvent);
+  }, [token, addProject, updateProject, removeProject, addTestimonial, updateTestimonial, removeTestimonial, fetchProjects, fetchTestimonials]);
+
   const handleLogout = async () => {
     await logout();
     navigate('/');
@@ -83,6 +109,13 @@ const AdminDashboard = () => {
       icon: '💬',
       color: 'indigo'
     },
+    {
+      title: 'Novos Leads',
+      value: newLeads.length,
+      description: newLeads.length > 0 ? `Último: ${newLeads[0].name}` : 'Ao vivo desde que o painel abriu',
+      icon: '📨',
+      color: newLeads.length > 0 ? 'green' : 'purple'
+    },
     {
       title: 'Cache Portfolio',
       value: portfolioStore.isCacheValid() ? 'Ativo' : 'Expirado',
@@ -183,7 +216,7 @@ const AdminDashboard = () => {
             </div>
 
             {/* Stats Grid */}
-            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-5 gap-6">
               {statsCards.map((stat) => (
                 <Card key={stat.title} className="bg-gray-900/50 border-gray-700 hover:border-purple-500/50 transition-all">
                   <CardHeader className="pb-2">
@@ -0,0 +1,99 @@
+/**
+ * Admin Events Service - Eventos ao vivo do painel (Server-Sent Events)
+ * Substitui o recarregamento periódico das listas: o backend avisa quando
+ * chega um lead ou quando o portfólio/depoimentos mudam
+ */
+
+const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
+
+const normalizeUrl = (baseUrl, path) => {
+  const trimmedBase = baseUrl.endsWith('/') ? baseUrl.slice(0, -1) : baseUrl;
+  const trimmedPath = path.startsWith('/') ? path.slice(1) : path;
+  return `${trimmedBase}/${trimmedPath}`;
+};
+
+export const ADMIN_EVENT_TYPES = [
+  'contact.created',
+  'portfolio.created', 'portfolio.updated', 'portfolio.deleted', 'portfolio.changed',
+  'testimonial.created', 'testimonial.updated', 'testimonial.deleted', 'testimonial.changed',
+  'resync',
+];
+
+const RECONNECT_MAX_DELAY_MS = 30000;
+
+/**
+ * Pede um ticket de curta duração: o EventSource não envia o header Authorization
+ * @param {string} token - Token JWT do administrador
+ * @returns {Promise<string>} Ticket para /api/admin/events
+ */
+const getEventsTicket = async (token) => {
+  const response = await fetch(normalizeUrl(API_BASE_URL, '/api/admin/events/ticket'), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token}` }
+  });
+  if (!response.ok) {
+    throw new Error(`Erro ao abrir eventos ao vivo: ${response.status}`);
+  }
+  const data = await response.json();
+  return data.ticket;
+};
+
+/**
+ * Assina os eventos do painel
+ * @param {string} token - Token JWT do administrador
+ * @param {Function} onEvent - Chamado com (tipo, dados) a cada evento
+ * @returns {Function} Função que encerra a assinatura
+ */
+export const subscribeToAdminEvents = (token, onEvent) => {
+  let source = null;
+  let closed = false;
+  let lastEventId = null;
+  let retryDelay = 1000;
+  let retryTimer = null;
+
+  const connect = async () => {
+    try {
+      const ticket = await getEventsTicket(token);
+      if (closed) return;
+      const params = new URLSearchParams({ ticket });
+      // Nova conexão (ticket novo): o Last-Event-ID vai pela query
+      if (lastEventId) params.append('last_event_id', lastEventId);
+      source = new EventSource(normalizeUrl(API_BASE_URL, `/api/admin/events?${params.toString()}`));
+
+      source.onopen = () => {
+        retryDelay = 1000;
+      };
+
+      ADMIN_EVENT_TYPES.forEach((type) => {
+        source.addEventListener(type, (message) => {
+          lastEventId = message.lastEventId || lastEventId;
+          onEvent(type, JSON.parse(message.data));
+        });
+      });
+
+      // O servidor encerra a conexão periodicamente; o ticket só vale por
+      // alguns segundos, então cada reconexão pede um ticket novo
+      source.onerror = () => {
+        source.close();
+        scheduleReconnect();
+      };
+    } catch (error) {
+      console.error('Erro no adminEventsService.subscribeToAdminEvents:', error);
+      scheduleReconnect();
+    }
+  };
+
+  const scheduleReconnect = () => {
+    if (closed) return;
+    retryTimer = setTimeout(connect, retryDelay);
+    retryDelay = Math.min(retryDelay * 2, RECONNECT_MAX_DELAY_MS);
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) source.close();
+  };
+};
@@ -0,0 +1,81 @@
+/**
+ * Content Service - Conteúdo público publicado como JSON estático
+ * Carrega portfólio e depoimentos dos arquivos versionados gerados por
+ * backend/publish.py (servidos pela CDN), sem chamar a API
+ *
+ * Ativado por REACT_APP_CONTENT_URL (ex.: "/content" quando os arquivos vão
+ * no build do frontend, ou "https://<backend>/content"). Sem ela, ou se a
+ * publicação falhar, os serviços usam a API normalmente.
+ */
+
+const CONTENT_URL = process.env.REACT_APP_CONTENT_URL;
+
+let manifestPromise = null;
+
+const contentUrl = (path) => `${CONTENT_URL.replace(/\/$/, '')}/${path}`;
+
+/**
+ * Busca o manifest (cache curto); os arquivos apontados por ele são imutáveis
+ * @returns {Promise<Object>} Manifest com os caminhos versionados
+ */
+const getManifest = () => {
+  if (!manifestPromise) {
+    manifestPromise = fetch(contentUrl('manifest.json'), { cache: 'no-cache' })
+      .then((response) => {
+        if (!response.ok) throw new Error(`Manifest indisponível: ${response.status}`);
+        return response.json();
+      })
+      .catch((error) => {
+        manifestPromise = null; // Tenta de novo na próxima chamada
+        throw error;
+      });
+  }
+  return manifestPromise;
+};
+
+/**
+ * Indica se o carregamento pelo conteúdo publicado está configurado
+ * @returns {boolean}
+ */
+export const isPublishedContentEnabled = () => Boolean(CONTENT_URL);
+
+/**
+ * Carrega uma lista publicada ("portfolio" ou "testimonials")
+ * @param {string} name - Nome da lista no manifest
+ * @returns {Promise<Array>} Mesmo formato de GET /api/<name>
+ */
+export const getPublishedContent = async (name) => {
+  if (!CONTENT_URL) {
+    throw new Error('REACT_APP_CONTENT_URL não configurada');
+  }
+  const manifest = await getManifest();
+  const entry = manifest.files?.[name];
+  if (!entry) {
+    throw new Error(`"${name}" não está no manifest publicado`);
+  }
+  const response = await fetch(contentUrl(entry.path));
+  if (!response.ok) {
+    throw new Error(`Erro ao carregar ${entry.path}: ${response.status}`);
+  }
+  const data = await response.json();
+  console.log(`📦 ${name}: ${data.length} itens do conteúdo publicado (versão ${manifest.version})`);
+  return data;
+};
+
+/**
+ * Conteúdo publicado com fallback para a API
+ * @param {string} name - Nome da lista no manifest
+ * @param {Function} fromApi - Função que busca a mesma lista na API
+ * @returns {Promise<Array>}
+ */
+export const getPublishedOrFetch = async (name, fromApi) => {
+  if (!isPublishedContentEnabled()) {
+    return fromApi();
+  }
+  try {
+    return await getPublishedContent(name);
+  } catch (error) {
+    console.warn(`Conteúdo publicado indisponível para ${name}, usando a API:`, error.message);
+    return fromApi();
+  }
+};
@@ -7,13 +7,21 @@ const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
 
 /**
  * Busca todos os projetos do portfólio
+ * @param {Object} filters - Filtros opcionais aplicados no backend
+ * @param {string} [filters.category] - Categoria do projeto
+ * @param {Array<string>} [filters.technologies] - Tecnologias que o projeto deve usar (todas)
  * @returns {Promise<Array>} Lista de projetos do portfólio
  */
-export const getPortfolioProjects = async () => {
+export const getPortfolioProjects = async ({ category, technologies = [] } = {}) => {
   try {
     console.log('Buscando projetos do portfólio...');
-    
-    const response = await fetch(`${API_BASE_URL}/api/portfolio`, {
+
+    const params = new URLSearchParams();
+    if (category) params.append('category', category);
+    technologies.forEach((technology) => params.append('technology', technology));
+    const queryString = params.toString() ? `?${params.toString()}` : '';
+
+    const response = await fetch(`${API_BASE_URL}/api/portfolio${queryString}`, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
@@ -52,6 +60,32 @@ export const getPortfolioProjects = async () => {
   }
 };
 
+/**
+ * Busca as contagens de projetos por categoria e tecnologia (para os filtros)
+ * @returns {Promise<Object>} { categories: [{ value, count }], technologies: [{ value, count }] }
+ */
+export const getPortfolioFacets = async () => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/portfolio/facets`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      }
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => null);
+      throw new Error(errorData?.detail || `Erro ao buscar filtros do portfólio: ${response.status}`);
+    }
+
+    return await response.json();
+
+  } catch (error) {
+    console.error('Erro no portfolioService.getPortfolioFacets:', error);
+    throw error;
+  }
+};
+
 /**
  * Busca um projeto específico por ID
  * @param {string} projectId - ID do projeto
@@ -252,6 +286,7 @@ export const deletePortfolioProject = async (projectId, token) => {
 
 export default {
   getPortfolioProjects,
+  getPortfolioFacets,
   getPortfolioProject,
   createPortfolioProject,
   updatePortfolioProject,
@@ -0,0 +1,54 @@
+/**
+ * Search Service - Busca textual no portfólio e nos depoimentos
+ * A filtragem acontece no backend, sem precisar baixar as coleções inteiras
+ */
+
+const API_BASE_URL = process.env.REACT_APP_BACKEND_URL;
+
+/**
+ * Busca projetos e depoimentos por relevância
+ * @param {string} query - Termos da busca (mínimo de 2 caracteres)
+ * @param {Object} options - Opções da busca
+ * @param {string} [options.scope] - 'portfolio' ou 'testimonials' para restringir a busca
+ * @param {number} [options.limit] - Número máximo de resultados (padrão: 20)
+ * @returns {Promise<Object>} { query, total, results: [{ type, id, title, score, highlights, item }] }
+ */
+export const searchContent = async (query, { scope, limit } = {}) => {
+  try {
+    const params = new URLSearchParams({ q: query });
+    if (scope) params.append('scope', scope);
+    if (limit) params.append('limit', String(limit));
+
+    const response = await fetch(`${API_BASE_URL}/api/search?${params.toString()}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      }
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => null);
+
+      switch (response.status) {
+        case 422:
+          throw new Error('Digite pelo menos 2 caracteres para buscar.');
+        case 500:
+          throw new Error('Erro interno do servidor. Tente novamente mais tarde.');
+        default:
+          throw new Error(errorData?.detail || `Erro ao buscar conteúdo: ${response.status}`);
+      }
+    }
+
+    return await response.json();
+
+  } catch (error) {
+    console.error('Erro no searchService.searchContent:', error);
+
+    // Se for um erro de rede
+    if (error.name === 'TypeError' && error.message.includes('fetch')) {
+      throw new Error('Problema de conexão detectado. Verifique sua internet e tente novamente.');
+    }
+
+    throw error;
+  }
+};
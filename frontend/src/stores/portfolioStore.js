@@ -6,6 +6,7 @@
 import { create } from 'zustand';
 import { devtools } from 'zustand/middleware';
 import { getPortfolioProjects } from '../services/portfolioService';
+import { getPublishedOrFetch } from '../services/contentService';
 
 const usePortfolioStore = create(
   devtools(
@@ -58,7 +59,10 @@ const usePortfolioStore = create(
           setError(null);
           console.log('🔄 Portfolio: Carregando projetos da API...');
           
-          const data = await getPortfolioProjects();
+          // Visitantes leem o JSON publicado (CDN); forceRefresh vai direto à API
+          const data = forceRefresh
+            ? await getPortfolioProjects()
+            : await getPublishedOrFetch('portfolio', getPortfolioProjects);
           setProjects(data);
           
           console.log(`✅ Portfolio: ${data.length} projetos carregados e cacheados`);
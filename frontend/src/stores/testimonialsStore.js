@@ -6,6 +6,7 @@
 import { create } from 'zustand';
 import { devtools } from 'zustand/middleware';
 import { getTestimonials } from '../services/testimonialsService';
+import { getPublishedOrFetch } from '../services/contentService';
 
 const useTestimonialsStore = create(
   devtools(
@@ -61,7 +62,10 @@ const useTestimonialsStore = create(
           setError(null);
           console.log('🔄 Testimonials: Carregando depoimentos da API...');
           
-          const data = await getTestimonials();
+          // Visitantes leem o JSON publicado (CDN); forceRefresh vai direto à API
+          const data = forceRefresh
+            ? await getTestimonials()
+            : await getPublishedOrFetch('testimonials', getTestimonials);
           setTestimonials(data);
           
           console.log(`✅ Testimonials: ${data.length} depoimentos carregados e cacheados`);
@@ -0,0 +1,12 @@
+"""
+Testes de carga da API VERTEX TARGET
+
+Os cenários são misturas ponderadas de requisições (ver loadtest/scenarios.py),
+executadas por um número fixo de workers concorrentes com geradores aleatórios
+com semente: duas execuções com os mesmos argumentos fazem a mesma mistura de
+requisições.
+
+    python -m loadtest list
+    python -m loadtest run public_landing --base-url http://localhost:8001 --duration 30 --concurrency 20
+    python -m loadtest compare loadtest/results/before.json loadtest/results/after.json
+"""
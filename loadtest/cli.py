@@ -0,0 +1,94 @@
+"""
+Linha de comando: python -m loadtest {list,run,compare}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from loadtest.report import build_result, compare_results, print_result, save_result
+from loadtest.runner import RunConfig, run_scenario
+from loadtest.scenarios import SCENARIOS
+
+
+def _list(_args) -> None:
+    print("📋 Cenários disponíveis")
+    for scenario in SCENARIOS.values():
+        defaults = f" (padrões: {scenario.defaults})" if scenario.defaults else ""
+        print(f"  {scenario.name:<16} {scenario.description}{defaults}")
+
+
+def _run(args) -> None:
+    scenario = SCENARIOS[args.scenario]
+    options = dict(scenario.defaults)
+    for key in ("admin_email", "admin_password", "users", "cache_hit_ratio"):
+        value = getattr(args, key)
+        if value is not None:
+            options[key] = value
+
+    config = RunConfig(
+        base_url=args.base_url.rstrip("/"),
+        concurrency=args.concurrency,
+        duration_seconds=args.duration,
+        warmup_seconds=args.warmup,
+        max_requests=args.requests,
+        rate=args.rate,
+        seed=args.seed,
+        timeout_seconds=args.timeout,
+        options=options,
+    )
+    print(f"🚀 Executando {scenario.name} contra {config.base_url} "
+          f"({config.concurrency} workers, {config.warmup_seconds:g}s de aquecimento + {config.duration_seconds:g}s)")
+    try:
+        recorder = asyncio.run(run_scenario(scenario, config))
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    result = build_result(scenario, config, recorder)
+    print_result(result)
+    path = save_result(result, args.output)
+    print(f"\n💾 Resultados salvos em {path}")
+
+    if args.max_error_rate is not None and result["overall"]["error_rate"] > args.max_error_rate:
+        print(f"❌ Taxa de erro {result['overall']['error_rate']:.1%} acima de {args.max_error_rate:.1%}")
+        sys.exit(1)
+
+
+def _compare(args) -> None:
+    with open(args.before, encoding="utf-8") as before, open(args.after, encoding="utf-8") as after:
+        compare_results(json.load(before), json.load(after))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Testes de carga da API VERTEX TARGET")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser("list", help="Lista os cenários disponíveis").set_defaults(func=_list)
+
+    run = subcommands.add_parser("run", help="Executa um cenário e salva os resultados em JSON")
+    run.add_argument("scenario", choices=sorted(SCENARIOS))
+    run.add_argument("--base-url", default=os.environ.get("LOADTEST_BASE_URL", "http://localhost:8001"))
+    run.add_argument("--concurrency", type=int, default=10, help="Workers concorrentes (ciclo fechado)")
+    run.add_argument("--duration", type=float, default=30.0, help="Segundos medidos")
+    run.add_argument("--warmup", type=float, default=5.0, help="Segundos de tráfego antes de começar a medir")
+    run.add_argument("--requests", type=int, help="Para depois deste número de requisições medidas")
+    run.add_argument("--rate", type=float, help="Limita a taxa total de requisições (por segundo)")
+    run.add_argument("--seed", type=int, default=42, help="Semente da mistura de requisições e dos dados gerados")
+    run.add_argument("--timeout", type=float, default=30.0, help="Timeout de cada requisição em segundos")
+    run.add_argument("--output", help="Arquivo JSON dos resultados (padrão: loadtest/results/<cenário>-<timestamp>.json)")
+    run.add_argument("--max-error-rate", type=float, help="Sai com status 1 acima desta taxa de erro (0-1)")
+    run.add_argument("--admin-email", default=os.environ.get("LOADTEST_ADMIN_EMAIL"))
+    run.add_argument("--admin-password", default=os.environ.get("LOADTEST_ADMIN_PASSWORD"))
+    run.add_argument("--users", type=int, help="login_storm: número de usuários registrados antes do teste")
+    run.add_argument("--cache-hit-ratio", type=float, help="ai_demo: fração das requisições que repetem um prompt já em cache")
+    run.set_defaults(func=_run)
+
+    compare = subcommands.add_parser("compare", help="Compara dois arquivos de resultados salvos")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.set_defaults(func=_compare)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,147 @@
+"""
+Resumo dos resultados, gravação em JSON e comparação entre execuções
+"""
+
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loadtest.runner import EndpointSamples, Recorder, RunConfig
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank de uma lista já ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_samples(samples: EndpointSamples, elapsed_seconds: float) -> Dict[str, Any]:
+    latencies = sorted(samples.latencies_ms)
+    count = len(latencies)
+    errors = sum(samples.errors.values())
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "rps": round(count / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+        "mean_ms": round(sum(latencies) / count, 2) if count else 0.0,
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "statuses": {str(status): total for status, total in sorted(samples.statuses.items())},
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(latencies, pct), 2)
+    if samples.errors:
+        summary["error_kinds"] = dict(samples.errors.most_common())
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_result(scenario, config: RunConfig, recorder: Recorder) -> Dict[str, Any]:
+    elapsed = recorder.elapsed_seconds
+    overall = EndpointSamples()
+    for samples in recorder.endpoints.values():
+        overall.latencies_ms.extend(samples.latencies_ms)
+        overall.statuses.update(samples.statuses)
+        overall.errors.update(samples.errors)
+
+    counters = dict(recorder.counters)
+    hits, misses = counters.get("ai_cache_hits", 0), counters.get("ai_cache_misses", 0)
+    if hits + misses:
+        counters["ai_cache_hit_ratio"] = round(hits / (hits + misses), 3)
+
+    return {
+        "meta": {
+            "scenario": scenario.name,
+            "description": scenario.description,
+            "base_url": config.base_url,
+            "concurrency": config.concurrency,
+            "duration_seconds": config.duration_seconds,
+            "warmup_seconds": config.warmup_seconds,
+            "max_requests": config.max_requests,
+            "rate": config.rate,
+            "seed": config.seed,
+            "options": config.options,
+            "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "measured_seconds": round(elapsed, 3),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+        },
+        "overall": summarize_samples(overall, elapsed),
+        "endpoints": {
+            label: summarize_samples(samples, elapsed)
+            for label, samples in sorted(recorder.endpoints.items())
+        },
+        "counters": counters,
+    }
+
+
+def save_result(result: Dict[str, Any], output: Optional[str]) -> Path:
+    if output:
+        path = Path(output)
+    else:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        path = Path(__file__).parent / "results" / f"{result['meta']['scenario']}-{stamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def _row(label: str, summary: Dict[str, Any]) -> str:
+    return (
+        f"{label:<44} {summary['requests']:>8} {summary['rps']:>9.1f} {summary['p50_ms']:>9.1f} "
+        f"{summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} {summary['max_ms']:>9.1f} {summary['error_rate']:>7.1%}"
+    )
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    meta = result["meta"]
+    print(f"\n📊 {meta['scenario']} - {meta['concurrency']} workers, {meta['measured_seconds']:.1f}s medidos (semente {meta['seed']})")
+    print("=" * 110)
+    print(f"{'endpoint':<44} {'reqs':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9} {'erros':>7}")
+    for label, summary in result["endpoints"].items():
+        print(_row(label, summary))
+    print("-" * 110)
+    print(_row("TOTAL", result["overall"]))
+    for name, value in result["counters"].items():
+        print(f"   {name}: {value}")
+    kinds = result["overall"].get("error_kinds")
+    if kinds:
+        print(f"❌ Erros: {kinds}")
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "    n/a"
+    return f"{(after - before) / before:+7.1%}"
+
+
+def compare_results(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    """Mostra RPS e percentis de latência lado a lado, com a variação relativa"""
+    print(f"\n🔍 {before['meta']['scenario']}: {before['meta'].get('git_commit')} -> {after['meta'].get('git_commit')}")
+    if before["meta"]["scenario"] != after["meta"]["scenario"]:
+        print("⚠️  Cenários diferentes - a comparação é só indicativa")
+    print("=" * 110)
+    labels = ["TOTAL"] + sorted(set(before["endpoints"]) | set(after["endpoints"]))
+    for label in labels:
+        old = before["overall"] if label == "TOTAL" else before["endpoints"].get(label)
+        new = after["overall"] if label == "TOTAL" else after["endpoints"].get(label)
+        if not old or not new:
+            print(f"{label:<44} só em {'depois' if new else 'antes'}")
+            continue
+        print(f"{label:<44} rps {old['rps']:>8.1f} -> {new['rps']:>8.1f} {_delta(old['rps'], new['rps'])}")
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            print(f"{'':<44} {key[:3]} {old[key]:>8.1f} -> {new[key]:>8.1f} {_delta(old[key], new[key])}")
@@ -0,0 +1,171 @@
+"""
+Gerador de carga em ciclo fechado
+
+Cada worker sorteia um passo ponderado do cenário, executa e repete até o fim
+da execução. Toda chamada HTTP passa por ScenarioContext.request(), que
+registra latência e status sob um rótulo estável (o template da rota, não a
+URL bruta). As amostras do período de aquecimento são descartadas.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class EndpointSamples:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+
+
+class Recorder:
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointSamples] = defaultdict(EndpointSamples)
+        self.counters: Counter = Counter()
+        self.recording = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start_recording(self) -> None:
+        self.recording = True
+        self.started_at = time.perf_counter()
+
+    def stop_recording(self) -> None:
+        self.recording = False
+        self.finished_at = time.perf_counter()
+
+    def record(self, label: str, latency_ms: float, status: Optional[int], error: Optional[str] = None) -> None:
+        if not self.recording:
+            return
+        samples = self.endpoints[label]
+        samples.latencies_ms.append(latency_ms)
+        if status is not None:
+            samples.statuses[status] += 1
+        if error is not None:
+            samples.errors[error] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Contadores específicos do cenário (ex.: acertos do cache da IA), só durante a medição"""
+        if self.recording:
+            self.counters[name] += amount
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at or time.perf_counter()
+        return end - self.started_at if self.started_at else 0.0
+
+
+class Pacer:
+    """Limite global opcional de requisições por segundo, compartilhado pelos workers (ritmo de ciclo aberto)"""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = time.perf_counter()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        self.next_slot = max(self.next_slot + self.interval, now)
+        delay = self.next_slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ScenarioContext:
+    """O que um passo do cenário enxerga: o cliente HTTP, o próprio RNG e o estado compartilhado"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random,
+                 shared: Dict[str, Any], options: Dict[str, Any], worker_id: int, pacer: Pacer):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.shared = shared
+        self.options = options
+        self.worker_id = worker_id
+        self.pacer = pacer
+        self.sequence = 0
+
+    def next_id(self) -> str:
+        """Identificador único e reproduzível para os dados criados por este worker"""
+        self.sequence += 1
+        return f"{self.options['seed']}-{self.worker_id}-{self.sequence}"
+
+    def auth_headers(self, token_key: str = "admin_token") -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.shared[token_key]}"}
+
+    async def request(self, label: str, method: str, url: str, expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        await self.pacer.wait()
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(label, (time.perf_counter() - started) * 1000, None, type(e).__name__)
+            return None
+        latency_ms = (time.perf_counter() - started) * 1000
+        error = None if response.status_code in expected else f"HTTP {response.status_code}"
+        self.recorder.record(label, latency_ms, response.status_code, error)
+        return response
+
+
+@dataclass
+class RunConfig:
+    base_url: str
+    concurrency: int = 10
+    duration_seconds: float = 30.0
+    warmup_seconds: float = 5.0
+    max_requests: Optional[int] = None
+    rate: Optional[float] = None
+    seed: int = 42
+    timeout_seconds: float = 30.0
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+async def _worker(scenario, context: ScenarioContext, deadline: float, config: RunConfig) -> None:
+    steps = scenario.steps
+    weights = [step.weight for step in steps]
+    while time.perf_counter() < deadline:
+        if config.max_requests and sum(len(s.latencies_ms) for s in context.recorder.endpoints.values()) >= config.max_requests:
+            return
+        step = context.rng.choices(steps, weights=weights)[0]
+        await step.action(context)
+
+
+async def run_scenario(scenario, config: RunConfig) -> Recorder:
+    recorder = Recorder()
+    options = {"seed": config.seed, **config.options}
+    shared: Dict[str, Any] = {}
+    pacer = Pacer(config.rate)
+    limits = httpx.Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+
+    async with httpx.AsyncClient(base_url=config.base_url, timeout=config.timeout_seconds, limits=limits) as client:
+        if scenario.setup:
+            setup_context = ScenarioContext(client, recorder, random.Random(config.seed), shared, options, -1, Pacer(None))
+            try:
+                await scenario.setup(setup_context)
+            except (httpx.HTTPError, KeyError) as e:
+                raise RuntimeError(f"preparação do cenário '{scenario.name}' falhou: {type(e).__name__}: {e}") from e
+
+        contexts = [
+            ScenarioContext(client, recorder, random.Random(f"{config.seed}-{worker_id}"), shared, options, worker_id, pacer)
+            for worker_id in range(config.concurrency)
+        ]
+        started = time.perf_counter()
+        deadline = started + config.warmup_seconds + config.duration_seconds
+        workers = [asyncio.create_task(_worker(scenario, context, deadline, config)) for context in contexts]
+
+        if config.warmup_seconds:
+            await asyncio.sleep(config.warmup_seconds)
+        recorder.start_recording()
+        await asyncio.gather(*workers)
+        recorder.stop_recording()
+
+        if scenario.teardown:
+            await scenario.teardown(ScenarioContext(client, recorder, random.Random(config.seed), shared, options, -1, Pacer(None)))
+    return recorder
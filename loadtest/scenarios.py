@@ -0,0 +1,280 @@
+"""
+Definição dos cenários
+
+Um cenário é uma lista ponderada de passos, com preparação e limpeza
+opcionais. Os passos recebem um ScenarioContext e fazem as requisições por
+context.request() com um rótulo estável, para que os resultados sejam
+agrupados por endpoint e não por URL.
+
+    public_landing  visitantes anônimos navegando pela landing page
+    admin_crud      um admin gerenciando itens do portfólio e depoimentos
+    login_storm     muitos usuários fazendo login ao mesmo tempo (limitado pelo bcrypt)
+    ai_demo         demo de estratégia com IA com uma taxa-alvo de acertos no cache
+"""
+
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from loadtest.runner import ScenarioContext
+
+Action = Callable[[ScenarioContext], Awaitable[None]]
+
+CATEGORIES = ["E-commerce", "FinTech", "HealthTech", "EduTech"]
+TECHNOLOGIES = ["React", "Next.js", "Vue.js", "React Native", "Analytics", "Stripe"]
+SEARCH_TERMS = ["react", "ecommerce", "fintech", "analytics", "plataforma", "saude", "educacao"]
+INDUSTRIES = ["Varejo", "Saúde", "Educação", "Finanças", "Logística", "Turismo", "Agronegócio", "Imobiliário"]
+OBJECTIVES = ["Aumentar vendas online", "Gerar mais leads", "Fidelizar clientes", "Reduzir custo de aquisição"]
+
+LOADTEST_PASSWORD = "LoadTest@2025"
+
+
+@dataclass
+class Step:
+    name: str
+    weight: int
+    action: Action
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    steps: List[Step]
+    setup: Optional[Action] = None
+    teardown: Optional[Action] = None
+    defaults: Dict[str, object] = field(default_factory=dict)
+
+
+# =============================================================================
+# Auxiliares compartilhados
+# =============================================================================
+
+async def ensure_admin_token(context: ScenarioContext) -> None:
+    """Login com --admin-email/--admin-password ou registro de um admin descartável (só em servidores locais)"""
+    email = context.options.get("admin_email")
+    password = context.options.get("admin_password")
+    if not email:
+        email = f"loadtest-admin-{context.options['seed']}@example.com"
+        password = LOADTEST_PASSWORD
+        await context.client.post("/api/auth/register", json={
+            "email": email, "password": password, "full_name": "Admin do Teste de Carga", "role": "admin",
+        })
+    response = await context.client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    context.shared["admin_token"] = response.json()["access_token"]
+
+
+def portfolio_payload(context: ScenarioContext) -> dict:
+    suffix = context.next_id()
+    return {
+        "title": f"Projeto de carga {suffix}",
+        "category": context.rng.choice(CATEGORIES),
+        "image": "https://placehold.co/600x400?text=loadtest",
+        "metric": "+42% conversão",
+        "description": "Projeto criado pelo teste de carga para medir o CRUD do painel administrativo.",
+        "technologies": context.rng.sample(TECHNOLOGIES, 2),
+        "results": {"conversao": "+42%"},
+        "challenge": "Desafio gerado pelo teste de carga",
+        "solution": "Solução gerada pelo teste de carga",
+        "outcome": "Resultado gerado pelo teste de carga",
+    }
+
+
+def testimonial_payload(context: ScenarioContext) -> dict:
+    return {
+        "name": f"Cliente {context.next_id()}",
+        "position": "CEO",
+        "company": "Load Test Ltda",
+        "avatar": "https://placehold.co/100x100?text=LT",
+        "quote": "Depoimento criado pelo teste de carga do painel administrativo.",
+        "rating": context.rng.randint(4, 5),
+        "project": "Teste de carga",
+    }
+
+
+# =============================================================================
+# public_landing
+# =============================================================================
+
+async def list_portfolio(context: ScenarioContext) -> None:
+    await context.request("GET /api/portfolio", "GET", "/api/portfolio")
+
+
+async def filter_portfolio(context: ScenarioContext) -> None:
+    await context.request("GET /api/portfolio?category", "GET", "/api/portfolio",
+                          params={"category": context.rng.choice(CATEGORIES)})
+
+
+async def portfolio_facets(context: ScenarioContext) -> None:
+    await context.request("GET /api/portfolio/facets", "GET", "/api/portfolio/facets")
+
+
+async def list_testimonials(context: ScenarioContext) -> None:
+    await context.request("GET /api/testimonials", "GET", "/api/testimonials")
+
+
+async def search(context: ScenarioContext) -> None:
+    await context.request("GET /api/search", "GET", "/api/search", params={"q": context.rng.choice(SEARCH_TERMS)})
+
+
+async def submit_contact(context: ScenarioContext) -> None:
+    await context.request("POST /api/contact", "POST", "/api/contact", json={
+        "name": "Visitante de carga",
+        "email": f"visitante-{context.next_id()}@example.com",
+        "company": "Load Test Ltda",
+        "message": "Mensagem enviada pelo teste de carga da landing page.",
+        "service_interest": ["Marketing Digital"],
+    })
+
+
+PUBLIC_LANDING = Scenario(
+    name="public_landing",
+    description="Tráfego anônimo da landing page: portfólio, depoimentos, facetas, busca e alguns formulários de contato",
+    steps=[
+        Step("portfolio", 40, list_portfolio),
+        Step("testimonials", 25, list_testimonials),
+        Step("portfolio_filtered", 12, filter_portfolio),
+        Step("facets", 10, portfolio_facets),
+        Step("search", 10, search),
+        Step("contact", 3, submit_contact),
+    ],
+)
+
+
+# =============================================================================
+# admin_crud
+# =============================================================================
+
+async def portfolio_crud_cycle(context: ScenarioContext) -> None:
+    headers = context.auth_headers()
+    response = await context.request("POST /api/portfolio", "POST", "/api/portfolio",
+                                     json=portfolio_payload(context), headers=headers)
+    if response is None or response.status_code != 200:
+        return
+    item_id = response.json()["id"]
+    await context.request("PUT /api/portfolio/{id}", "PUT", f"/api/portfolio/{item_id}",
+                          json={"metric": f"+{context.rng.randint(10, 90)}% conversão"}, headers=headers)
+    await context.request("GET /api/portfolio", "GET", "/api/portfolio")
+    await context.request("DELETE /api/portfolio/{id}", "DELETE", f"/api/portfolio/{item_id}", headers=headers)
+
+
+async def testimonial_crud_cycle(context: ScenarioContext) -> None:
+    headers = context.auth_headers()
+    response = await context.request("POST /api/testimonials", "POST", "/api/testimonials",
+                                     json=testimonial_payload(context), headers=headers)
+    if response is None or response.status_code != 200:
+        return
+    testimonial_id = response.json()["id"]
+    await context.request("PUT /api/testimonials/{id}", "PUT", f"/api/testimonials/{testimonial_id}",
+                          json={"rating": 5}, headers=headers)
+    await context.request("DELETE /api/testimonials/{id}", "DELETE", f"/api/testimonials/{testimonial_id}", headers=headers)
+
+
+async def admin_lists(context: ScenarioContext) -> None:
+    headers = context.auth_headers()
+    await context.request("GET /api/admin/users", "GET", "/api/admin/users", headers=headers)
+    await context.request("GET /api/contact", "GET", "/api/contact", headers=headers)
+
+
+ADMIN_CRUD = Scenario(
+    name="admin_crud",
+    description="Painel administrativo autenticado: ciclos de criar/editar/excluir portfólio e depoimentos, mais as listagens do admin",
+    steps=[
+        Step("portfolio_cycle", 45, portfolio_crud_cycle),
+        Step("testimonial_cycle", 35, testimonial_crud_cycle),
+        Step("admin_lists", 20, admin_lists),
+    ],
+    setup=ensure_admin_token,
+)
+
+
+# =============================================================================
+# login_storm
+# =============================================================================
+
+async def register_storm_users(context: ScenarioContext) -> None:
+    """Registra as contas de --users antes, para que a rajada meça só os logins"""
+    emails = []
+    for index in range(int(context.options.get("users", 20))):
+        email = f"loadtest-user-{context.options['seed']}-{index}@example.com"
+        await context.client.post("/api/auth/register", json={
+            "email": email, "password": LOADTEST_PASSWORD, "full_name": f"Usuário do Teste de Carga {index}",
+        })
+        emails.append(email)
+    context.shared["emails"] = emails
+
+
+async def valid_login(context: ScenarioContext) -> None:
+    email = context.rng.choice(context.shared["emails"])
+    await context.request("POST /api/auth/login", "POST", "/api/auth/login",
+                          json={"email": email, "password": LOADTEST_PASSWORD})
+
+
+async def invalid_login(context: ScenarioContext) -> None:
+    email = context.rng.choice(context.shared["emails"])
+    await context.request("POST /api/auth/login (senha errada)", "POST", "/api/auth/login",
+                          json={"email": email, "password": "Errada@123"}, expected=(401,))
+
+
+LOGIN_STORM = Scenario(
+    name="login_storm",
+    description="Rajada de logins dos usuários registrados antes, 10% com senha errada",
+    steps=[
+        Step("valid_login", 90, valid_login),
+        Step("invalid_login", 10, invalid_login),
+    ],
+    setup=register_storm_users,
+    defaults={"users": 20},
+)
+
+
+# =============================================================================
+# ai_demo
+# =============================================================================
+
+async def prepare_ai_demo(context: ScenarioContext) -> None:
+    """
+    Faz login e aquece o cache de estratégias com os prompts "quentes". As
+    requisições seguintes usam um prompt quente com probabilidade
+    --cache-hit-ratio e, nas demais, um prompt novo, nunca visto.
+    """
+    await ensure_admin_token(context)
+    hot = [(industry, objective) for industry in INDUSTRIES[:4] for objective in OBJECTIVES[:2]]
+    for industry, objective in hot:
+        await context.client.post("/api/v1/ai/generate-strategy", headers=context.auth_headers(),
+                                  json={"industry": industry, "objective": objective})
+    context.shared["hot_prompts"] = hot
+
+
+async def ai_strategy(context: ScenarioContext) -> None:
+    target_ratio = float(context.options.get("cache_hit_ratio", 0.8))
+    if context.rng.random() < target_ratio:
+        industry, objective = context.rng.choice(context.shared["hot_prompts"])
+    else:
+        industry, objective = context.rng.choice(INDUSTRIES), f"Objetivo de carga {context.next_id()}"
+    response = await context.request("POST /api/v1/ai/generate-strategy", "POST", "/api/v1/ai/generate-strategy",
+                                     json={"industry": industry, "objective": objective},
+                                     headers=context.auth_headers())
+    if response is not None and response.status_code == 200:
+        context.recorder.count("ai_cache_hits" if response.json().get("cached") else "ai_cache_misses")
+
+
+async def ai_cache_health(context: ScenarioContext) -> None:
+    await context.request("GET /api/v1/ai/cache/health", "GET", "/api/v1/ai/cache/health")
+
+
+AI_DEMO = Scenario(
+    name="ai_demo",
+    description="Demo de estratégia com IA; --cache-hit-ratio define a fração de prompts repetidos (as faltas chamam o Gemini)",
+    steps=[
+        Step("generate_strategy", 90, ai_strategy),
+        Step("cache_health", 10, ai_cache_health),
+    ],
+    setup=prepare_ai_demo,
+    defaults={"cache_hit_ratio": 0.8},
+)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario for scenario in (PUBLIC_LANDING, ADMIN_CRUD, LOGIN_STORM, AI_DEMO)
+}
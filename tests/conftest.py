@@ -0,0 +1,128 @@
+"""
+Harness de testes em processo
+
+A aplicação FastAPI roda dentro do pytest via httpx.ASGITransport (sem
+uvicorn nem backend publicado), com o lifespan real (aquecimento, índices,
+workers). Cada teste recebe um banco isolado:
+
+  - padrão: MongoDB em memória compatível com o Motor (tests/memory_mongo.py)
+  - TEST_MONGO_URL=mongodb://localhost:27017: um mongod local descartável;
+    cada teste usa um banco próprio (vertextarget_test_<worker>_<id>),
+    apagado no final
+
+Como nada é compartilhado entre testes, a suíte roda em paralelo:
+
+    python -m pytest -n auto
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Precisa valer antes de importar o server: sem Gemini real, sem latência
+os.environ.setdefault("GEMINI_BACKEND", "fake")
+os.environ.setdefault("GEMINI_FAKE_LATENCY", "fixed:0")
+os.environ.setdefault("JWT_SECRET", "chave-de-teste-com-pelo-menos-32-bytes")
+
+import server  # noqa: E402
+
+from tests.memory_mongo import MemoryClient  # noqa: E402
+
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL")
+READY_TIMEOUT_SECONDS = 10
+
+ADMIN = {"email": "admin@vertextarget.com", "password": "Admin@123", "full_name": "Admin de Teste", "role": "admin"}
+USER = {"email": "usuario@vertextarget.com", "password": "Usuario@123", "full_name": "Usuário de Teste", "role": "user"}
+
+
+@pytest.fixture
+def anyio_backend():
+    # Os testes são async (pytestmark = pytest.mark.anyio) e rodam no asyncio, como o uvicorn
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    # bcrypt de verdade, mas com o custo mínimo: o padrão (12 rounds) leva ~250 ms por hash
+    from passlib.context import CryptContext
+    server._pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+
+
+@pytest.fixture
+async def database():
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    name = f"vertextarget_test_{worker}_{uuid.uuid4().hex[:8]}"
+    if not TEST_MONGO_URL:
+        client = MemoryClient()
+        yield client, client[name]
+        return
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(TEST_MONGO_URL, serverSelectionTimeoutMS=5000)
+    try:
+        yield client, client[name]
+    finally:
+        await client.drop_database(name)
+        client.close()
+
+
+@pytest.fixture
+def server_state(database, monkeypatch):
+    """server ligado ao banco do teste, com o estado em memória zerado (lifespan ainda não iniciado)"""
+    client, db = database
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "readiness", server.ReadinessState())
+    monkeypatch.setattr(server, "ai_cache", server.AIStrategyCache(ttl_hours=24))
+    monkeypatch.setattr(server, "status_rollups", server.StatusRollups())
+    server.user_cache.invalidate()
+    monkeypatch.setattr(server, "admin_events", server.EventBus())
+    server.response_cache.invalidate()
+    return db
+
+
+@pytest.fixture
+async def app(server_state):
+    """server.app com o lifespan iniciado e já pronto (readiness)"""
+    async with server.lifespan(server.app):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + READY_TIMEOUT_SECONDS
+        while not server.readiness.ready:
+            if loop.time() > deadline:
+                pytest.fail(f"aplicação não ficou pronta: fase {server.readiness.phase}, erro {server.readiness.last_error}")
+            await asyncio.sleep(0.01)
+        yield server.app
+
+
+@pytest.fixture
+async def api(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _create_user(db, data: dict) -> dict:
+    """Cria o usuário direto no banco (mais rápido que /auth/register) e devolve o header de autenticação"""
+    user = server.User(email=data["email"], full_name=data["full_name"], role=data["role"], is_active=True)
+    document = user.model_dump()
+    document["hashed_password"] = server.hash_password(data["password"])
+    await db.users.insert_one(document)
+    return {"Authorization": f"Bearer {server.create_access_token({'sub': user.id})}"}
+
+
+@pytest.fixture
+async def admin_headers(app):
+    return await _create_user(server.db, ADMIN)
+
+
+@pytest.fixture
+async def user_headers(app):
+    return await _create_user(server.db, USER)
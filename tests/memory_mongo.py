@@ -0,0 +1,775 @@
+"""
+Backend MongoDB em memória compatível com a API do Motor usada pelo server.py
+
+Implementa o subconjunto de operações e operadores que a aplicação usa
+(CRUD, find_one_and_*, bulk_write, índices de texto simplificados), com
+métodos assíncronos como no Motor. Não é um substituto completo do MongoDB:
+serve para rodar a API em processo nos testes, sem servidor externo.
+"""
+
+import asyncio
+import copy
+import itertools
+import re
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+
+_MISSING = object()
+
+
+def _fold(text: str) -> str:
+    return "".join(unicodedata.normalize("NFD", c)[0].lower() for c in text)
+
+
+def _get_path(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit():
+            index = int(part)
+            value = value[index] if index < len(value) else _MISSING
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    target = document
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+    target[parts[-1]] = value
+
+
+def _unset_path(document: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    target = document
+    for part in parts[:-1]:
+        target = target.get(part)
+        if not isinstance(target, dict):
+            return
+    target.pop(parts[-1], None)
+
+
+def _comparable(a: Any, b: Any) -> bool:
+    numbers = (int, float)
+    if isinstance(a, numbers) and isinstance(b, numbers):
+        return not isinstance(a, bool) and not isinstance(b, bool)
+    return type(a) is type(b)
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    candidates = value if isinstance(value, list) else [value]
+    for candidate in candidates:
+        if candidate is _MISSING or candidate is None or not _comparable(candidate, operand):
+            continue
+        if operator == "$gt" and candidate > operand:
+            return True
+        if operator == "$gte" and candidate >= operand:
+            return True
+        if operator == "$lt" and candidate < operand:
+            return True
+        if operator == "$lte" and candidate <= operand:
+            return True
+    return False
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if value is _MISSING:
+        return expected is None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _match_operators(value: Any, condition: Dict[str, Any]) -> bool:
+    for operator, operand in condition.items():
+        if operator == "$eq":
+            if not _equals(value, operand):
+                return False
+        elif operator == "$ne":
+            if _equals(value, operand):
+                return False
+        elif operator in ("$gt", "$gte", "$lt", "$lte"):
+            if not _compare(value, operator, operand):
+                return False
+        elif operator == "$in":
+            if not any(_equals(value, item) for item in operand):
+                return False
+        elif operator == "$nin":
+            if any(_equals(value, item) for item in operand):
+                return False
+        elif operator == "$exists":
+            if (value is not _MISSING) != bool(operand):
+                return False
+        elif operator == "$all":
+            values = value if isinstance(value, list) else [value]
+            if not all(item in values for item in operand):
+                return False
+        elif operator == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            values = value if isinstance(value, list) else [value]
+            if not any(isinstance(v, str) and re.search(operand, v, flags) for v in values):
+                return False
+        elif operator == "$options":
+            continue
+        elif operator == "$size":
+            if not isinstance(value, list) or len(value) != operand:
+                return False
+        else:
+            raise OperationFailure(f"Operador não suportado no backend em memória: {operator}")
+    return True
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.documents: List[Dict[str, Any]] = []
+        self.indexes: Dict[str, Dict[str, Any]] = {"_id_": {"key": [("_id", 1)], "unique": True}}
+        self.options: Optional[Dict[str, Any]] = None
+
+    def __repr__(self):
+        return f"MemoryCollection({self.name!r})"
+
+    # ------------------------------------------------------------------ filtros
+
+    def _text_fields(self) -> List[str]:
+        for spec in self.indexes.values():
+            fields = [field for field, kind in spec["key"] if kind == "text"]
+            if fields:
+                return fields
+        return []
+
+    def _text_score(self, document: Dict[str, Any], search: str) -> float:
+        fields = self._text_fields()
+        if not fields:
+            raise OperationFailure("text index required for $text query", code=27)
+        terms = [_fold(term) for term in re.findall(r"\w+", search) if len(term) > 2]
+        weights = next(
+            (spec.get("weights", {}) for spec in self.indexes.values() if any(k == "text" for _, k in spec["key"])),
+            {},
+        )
+        score = 0.0
+        for field in fields:
+            value = _get_path(document, field)
+            if value is _MISSING:
+                continue
+            text = _fold(" ".join(value) if isinstance(value, list) else str(value))
+            words = re.findall(r"\w+", text)
+            for term in terms:
+                stem = term[:max(3, len(term) - 2)] if len(term) > 4 else term
+                hits = sum(1 for word in words if word.startswith(stem))
+                score += hits * weights.get(field, 1)
+        return score
+
+    def _matches(self, document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+        for key, condition in (query or {}).items():
+            if key == "$or":
+                if not any(self._matches(document, sub) for sub in condition):
+                    return False
+            elif key == "$and":
+                if not all(self._matches(document, sub) for sub in condition):
+                    return False
+            elif key == "$nor":
+                if any(self._matches(document, sub) for sub in condition):
+                    return False
+            elif key == "$text":
+                if self._text_score(document, condition["$search"]) <= 0:
+                    return False
+            else:
+                value = _get_path(document, key)
+                if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+                    if not _match_operators(value, condition):
+                        return False
+                elif not _equals(value, condition):
+                    return False
+        return True
+
+    # ------------------------------------------------------------------ updates
+
+    def _apply_update(self, document: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+        if not any(key.startswith("$") for key in update):
+            preserved_id = document.get("_id")
+            document.clear()
+            document.update(copy.deepcopy(update))
+            if preserved_id is not None:
+                document["_id"] = preserved_id
+            return
+
+        for operator, fields in update.items():
+            for path, value in fields.items():
+                current = _get_path(document, path)
+                if operator == "$set":
+                    _set_path(document, path, copy.deepcopy(value))
+                elif operator == "$setOnInsert":
+                    if inserting:
+                        _set_path(document, path, copy.deepcopy(value))
+                elif operator == "$unset":
+                    _unset_path(document, path)
+                elif operator == "$inc":
+                    _set_path(document, path, (0 if current is _MISSING else current) + value)
+                elif operator == "$max":
+                    if current is _MISSING or value > current:
+                        _set_path(document, path, value)
+                elif operator == "$min":
+                    if current is _MISSING or value < current:
+                        _set_path(document, path, value)
+                elif operator == "$push":
+                    items = current if isinstance(current, list) else []
+                    if isinstance(value, dict) and "$each" in value:
+                        items = items + list(value["$each"])
+                        if "$slice" in value:
+                            limit = value["$slice"]
+                            items = items[limit:] if limit < 0 else items[:limit]
+                    else:
+                        items = items + [value]
+                    _set_path(document, path, items)
+                elif operator == "$addToSet":
+                    items = current if isinstance(current, list) else []
+                    for item in (value["$each"] if isinstance(value, dict) and "$each" in value else [value]):
+                        if item not in items:
+                            items = items + [item]
+                    _set_path(document, path, items)
+                elif operator == "$pull":
+                    if isinstance(current, list):
+                        _set_path(document, path, [item for item in current if item != value])
+                elif operator == "$currentDate":
+                    _set_path(document, path, datetime.utcnow())
+                else:
+                    raise OperationFailure(f"Operador de update não suportado: {operator}")
+
+    def _check_unique(self, document: Dict[str, Any], ignore: Optional[Dict[str, Any]] = None) -> None:
+        for name, spec in self.indexes.items():
+            if not spec.get("unique"):
+                continue
+            fields = [field for field, _ in spec["key"]]
+            values = tuple(_get_path(document, field) for field in fields)
+            if all(value is _MISSING for value in values):
+                continue
+            for other in self.documents:
+                if other is ignore or other is document:
+                    continue
+                if tuple(_get_path(other, field) for field in fields) == values:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+
+    def _upsert_document(self, query: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+        document = {
+            key: value for key, value in query.items()
+            if not key.startswith("$") and not (isinstance(value, dict) and any(k.startswith("$") for k in value))
+        }
+        self._apply_update(document, update, inserting=True)
+        document.setdefault("_id", ObjectId())
+        self._check_unique(document)
+        self.documents.append(document)
+        return document
+
+    # ------------------------------------------------------------------ API Motor
+
+    async def insert_one(self, document: Dict[str, Any], **kwargs) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        stored = copy.deepcopy(document)
+        self._check_unique(stored)
+        self.documents.append(stored)
+        self.database._emit(self.name, "insert", stored)
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True, **kwargs) -> InsertManyResult:
+        ids = []
+        for document in documents:
+            await self.insert_one(document)
+            ids.append(document["_id"])
+        return InsertManyResult(ids, True)
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs) -> "MemoryCursor":
+        return MemoryCursor(self, query or {}, projection, **kwargs)
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs):
+        results = await self.find(query, projection, **kwargs).limit(1).to_list(1)
+        return results[0] if results else None
+
+    def _first_match(self, query, sort=None) -> Optional[Dict[str, Any]]:
+        matches = [doc for doc in self.documents if self._matches(doc, query)]
+        if sort:
+            matches = MemoryCursor._sorted(matches, sort)
+        return matches[0] if matches else None
+
+    async def update_one(self, query, update, upsert: bool = False, **kwargs) -> UpdateResult:
+        document = self._first_match(query)
+        if document is None:
+            if upsert:
+                created = self._upsert_document(query, update)
+                self.database._emit(self.name, "insert", created)
+                return UpdateResult({"n": 1, "nModified": 0, "upserted": created["_id"]}, True)
+            return UpdateResult({"n": 0, "nModified": 0}, True)
+        before = copy.deepcopy(document)
+        self._apply_update(document, update, inserting=False)
+        self._check_unique(document)
+        self.database._emit(self.name, "update", document)
+        return UpdateResult({"n": 1, "nModified": int(before != document)}, True)
+
+    async def update_many(self, query, update, upsert: bool = False, **kwargs) -> UpdateResult:
+        matches = [doc for doc in self.documents if self._matches(doc, query)]
+        if not matches and upsert:
+            return await self.update_one(query, update, upsert=True)
+        for document in matches:
+            self._apply_update(document, update, inserting=False)
+            self.database._emit(self.name, "update", document)
+        return UpdateResult({"n": len(matches), "nModified": len(matches)}, True)
+
+    async def replace_one(self, query, replacement, upsert: bool = False, **kwargs) -> UpdateResult:
+        return await self.update_one(query, replacement, upsert=upsert)
+
+    async def delete_one(self, query, **kwargs) -> DeleteResult:
+        document = self._first_match(query)
+        if document is None:
+            return DeleteResult({"n": 0}, True)
+        self.documents.remove(document)
+        self.database._emit(self.name, "delete", document)
+        return DeleteResult({"n": 1}, True)
+
+    async def delete_many(self, query, **kwargs) -> DeleteResult:
+        matches = [doc for doc in self.documents if self._matches(doc, query)]
+        for document in matches:
+            self.documents.remove(document)
+            self.database._emit(self.name, "delete", document)
+        return DeleteResult({"n": len(matches)}, True)
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE, **kwargs):
+        document = self._first_match(query, sort)
+        if document is None:
+            if not upsert:
+                return None
+            created = self._upsert_document(query, update)
+            self.database._emit(self.name, "insert", created)
+            return MemoryCursor._project(created, projection) if return_document == ReturnDocument.AFTER else None
+        before = copy.deepcopy(document)
+        self._apply_update(document, update, inserting=False)
+        self.database._emit(self.name, "update", document)
+        result = document if return_document == ReturnDocument.AFTER else before
+        return MemoryCursor._project(result, projection)
+
+    async def find_one_and_delete(self, query, projection=None, sort=None, **kwargs):
+        document = self._first_match(query, sort)
+        if document is None:
+            return None
+        self.documents.remove(document)
+        self.database._emit(self.name, "delete", document)
+        return MemoryCursor._project(document, projection)
+
+    async def count_documents(self, query, **kwargs) -> int:
+        return sum(1 for doc in self.documents if self._matches(doc, query))
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self.documents)
+
+    async def distinct(self, key, query=None, **kwargs) -> List[Any]:
+        values = []
+        for document in self.documents:
+            if not self._matches(document, query):
+                continue
+            value = _get_path(document, key)
+            for item in (value if isinstance(value, list) else [value]):
+                if item is not _MISSING and item not in values:
+                    values.append(item)
+        return values
+
+    async def bulk_write(self, requests, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+        write_errors = []
+        for index, request in enumerate(requests):
+            try:
+                await self._bulk_operation(request, counts)
+            except DuplicateKeyError as e:
+                # Como no MongoDB: erro por operação; com ordered=False as demais continuam
+                write_errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": request._doc})
+                if ordered:
+                    break
+        if write_errors:
+            raise BulkWriteError({**counts, "writeErrors": write_errors, "writeConcernErrors": []})
+        return BulkWriteResult(counts, True)
+
+    async def _bulk_operation(self, request, counts: Dict[str, Any]) -> None:
+        if isinstance(request, InsertOne):
+            await self.insert_one(request._doc)
+            counts["nInserted"] += 1
+        elif isinstance(request, (UpdateOne, ReplaceOne)):
+            result = await self.update_one(request._filter, request._doc, upsert=bool(request._upsert))
+            if result.upserted_id is not None:
+                counts["nUpserted"] += 1
+                counts["upserted"].append({"index": 0, "_id": result.upserted_id})
+            else:
+                counts["nMatched"] += result.matched_count
+                counts["nModified"] += result.modified_count
+        elif isinstance(request, UpdateMany):
+            result = await self.update_many(request._filter, request._doc, upsert=bool(request._upsert))
+            counts["nMatched"] += result.matched_count
+            counts["nModified"] += result.modified_count
+        elif isinstance(request, DeleteOne):
+            counts["nRemoved"] += (await self.delete_one(request._filter)).deleted_count
+        elif isinstance(request, DeleteMany):
+            counts["nRemoved"] += (await self.delete_many(request._filter)).deleted_count
+        else:
+            raise OperationFailure(f"Operação de bulk não suportada: {type(request).__name__}")
+
+    async def create_index(self, keys, name: Optional[str] = None, unique: bool = False, **kwargs) -> str:
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        keys = list(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        self.indexes[name] = {"key": keys, "unique": unique, **kwargs}
+        return name
+
+    async def create_indexes(self, models, **kwargs) -> List[str]:
+        names = []
+        for model in models:
+            document = model.document
+            names.append(await self.create_index(list(document["key"].items()), **{k: v for k, v in document.items() if k != "key"}))
+        return names
+
+    async def index_information(self) -> Dict[str, Any]:
+        return copy.deepcopy(self.indexes)
+
+    async def drop(self) -> None:
+        self.documents.clear()
+        self.indexes = {"_id_": {"key": [("_id", 1)], "unique": True}}
+
+    async def rename(self, new_name: str, dropTarget: bool = False, **kwargs) -> None:
+        """renameCollection: troca atômica (com dropTarget) como no MongoDB"""
+        collections = self.database.collections
+        target = collections.get(new_name)
+        if target is not None and self.database._exists(target) and not dropTarget:
+            raise OperationFailure("target namespace exists", code=48)
+        collections.pop(self.name, None)
+        self.name = new_name
+        collections[new_name] = self
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs) -> "MemoryCursor":
+        documents = [copy.deepcopy(doc) for doc in self.documents]
+        for stage in pipeline:
+            (operator, spec), = stage.items()
+            if operator == "$match":
+                documents = [doc for doc in documents if self._matches(doc, spec)]
+            elif operator == "$unwind":
+                path = spec if isinstance(spec, str) else spec["path"]
+                field = path.lstrip("$")
+                unwound = []
+                for doc in documents:
+                    for item in _get_path(doc, field) if isinstance(_get_path(doc, field), list) else []:
+                        clone = copy.deepcopy(doc)
+                        _set_path(clone, field, item)
+                        unwound.append(clone)
+                documents = unwound
+            elif operator == "$group":
+                groups: Dict[Any, Dict[str, Any]] = {}
+                for doc in documents:
+                    key_spec = spec["_id"]
+                    key = _get_path(doc, key_spec.lstrip("$")) if isinstance(key_spec, str) else key_spec
+                    key = None if key is _MISSING else key
+                    group = groups.setdefault(repr(key), {"_id": key})
+                    for field, accumulator in spec.items():
+                        if field == "_id":
+                            continue
+                        (acc, expression), = accumulator.items()
+                        value = expression if not isinstance(expression, str) else _get_path(doc, expression.lstrip("$"))
+                        if acc == "$sum":
+                            group[field] = group.get(field, 0) + (value if value is not _MISSING else 0)
+                        elif acc == "$max":
+                            group[field] = value if field not in group else max(group[field], value)
+                        elif acc == "$min":
+                            group[field] = value if field not in group else min(group[field], value)
+                        else:
+                            raise OperationFailure(f"Acumulador não suportado: {acc}")
+                documents = list(groups.values())
+            elif operator == "$sort":
+                documents = MemoryCursor._sorted(documents, list(spec.items()))
+            elif operator == "$limit":
+                documents = documents[:spec]
+            elif operator == "$project":
+                documents = [MemoryCursor._project(doc, spec) for doc in documents]
+            else:
+                raise OperationFailure(f"Estágio de agregação não suportado: {operator}")
+        cursor = MemoryCursor(self, {}, None)
+        cursor._preloaded = documents
+        return cursor
+
+    def watch(self, *args, **kwargs):
+        return self.database.watch(*args, **kwargs)
+
+
+class MemoryCursor:
+    def __init__(self, collection: MemoryCollection, query, projection, sort=None, limit: int = 0, skip: int = 0, **kwargs):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort: List[Tuple[str, Any]] = list(sort or [])
+        self._limit = limit
+        self._skip = skip
+        self._preloaded: Optional[List[Dict[str, Any]]] = None
+        self._iterator = None
+
+    def sort(self, key_or_list, direction=None) -> "MemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction or 1)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    @staticmethod
+    def _sort_key(value):
+        if value is _MISSING or value is None:
+            return (0, 0)
+        if isinstance(value, (int, float)):
+            return (1, value)
+        if isinstance(value, str):
+            return (2, value)
+        if isinstance(value, datetime):
+            return (3, value)
+        return (4, str(value))
+
+    @classmethod
+    def _sorted(cls, documents, sort):
+        result = list(documents)
+        for field, direction in reversed(sort):
+            if isinstance(direction, dict):  # {"$meta": "textScore"}
+                result.sort(key=lambda doc: doc.get("__score", 0), reverse=True)
+            else:
+                result.sort(key=lambda doc: cls._sort_key(_get_path(doc, field)), reverse=direction == -1)
+        return result
+
+    @staticmethod
+    def _project(document, projection):
+        if document is None:
+            return None
+        document = copy.deepcopy(document)
+        score = document.pop("__score", None)
+        if not projection:
+            return document
+        if isinstance(projection, (list, tuple)):
+            projection = {field: 1 for field in projection}
+
+        meta_fields = {k: v for k, v in projection.items() if isinstance(v, dict)}
+        plain = {k: v for k, v in projection.items() if not isinstance(v, dict)}
+        include_id = plain.pop("_id", 1)
+        if any(plain.values()):
+            result = {}
+            for field in plain:
+                value = _get_path(document, field)
+                if value is not _MISSING:
+                    _set_path(result, field, value)
+            if include_id and "_id" in document:
+                result["_id"] = document["_id"]
+        else:
+            result = document
+            for field in plain:
+                _unset_path(result, field)
+            if not include_id:
+                result.pop("_id", None)
+        for field in meta_fields:
+            result[field] = score or 0.0
+        return result
+
+    def _materialize(self) -> List[Dict[str, Any]]:
+        if self._preloaded is not None:
+            documents = self._preloaded
+        else:
+            documents = []
+            text_search = self.query.get("$text")
+            for document in self.collection.documents:
+                if self.collection._matches(document, self.query):
+                    if text_search:
+                        document = dict(document)
+                        document["__score"] = self.collection._text_score(document, text_search["$search"])
+                    documents.append(document)
+        if self._sort:
+            documents = self._sorted(documents, self._sort)
+        if self._skip:
+            documents = documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [self._project(document, self.projection) for document in documents]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        documents = self._materialize()
+        return documents[:length] if length else documents
+
+    def __aiter__(self):
+        self._iterator = iter(self._materialize())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryDatabase:
+    def __init__(self, name: str = "test_db", client: Optional["MemoryClient"] = None):
+        self.name = name
+        self.client = client
+        self.collections: Dict[str, MemoryCollection] = {}
+        self.listeners = []
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(self, name)
+        return self.collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs) -> MemoryCollection:
+        return self[name]
+
+    async def list_collection_names(self, **kwargs) -> List[str]:
+        return list(self.collections)
+
+    def _exists(self, collection: MemoryCollection) -> bool:
+        # Como no MongoDB: a coleção passa a existir ao receber dados, índices ou create_collection
+        return collection.options is not None or bool(collection.documents) or len(collection.indexes) > 1
+
+    def list_collections(self, filter: Optional[Dict[str, Any]] = None, **kwargs) -> MemoryCursor:
+        infos = []
+        for name, collection in self.collections.items():
+            if not self._exists(collection) or (filter and filter.get("name", name) != name):
+                continue
+            options = collection.options or {}
+            infos.append({
+                "name": name,
+                "type": "timeseries" if "timeseries" in options else "collection",
+                "options": copy.deepcopy(options),
+            })
+        cursor = MemoryCursor(None, {}, None)
+        cursor._preloaded = infos
+        return cursor
+
+    async def create_collection(self, name: str, **kwargs) -> MemoryCollection:
+        if name in self.collections and self._exists(self.collections[name]):
+            raise CollectionInvalid(f"collection {name} already exists")
+        collection = self[name]
+        collection.options = kwargs
+        return collection
+
+    async def drop_collection(self, name: str) -> None:
+        self.collections.pop(name, None)
+
+    async def command(self, command, *args, **kwargs) -> Dict[str, Any]:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name in ("ping", "isMaster", "ismaster", "hello"):
+            return {"ok": 1.0}
+        if name == "collMod" and isinstance(command, dict):
+            collection = self[command["collMod"]]
+            collection.options = {**(collection.options or {}), **{k: v for k, v in command.items() if k != "collMod"}}
+            return {"ok": 1.0}
+        raise OperationFailure(f"Comando não suportado no backend em memória: {name}")
+
+    def watch(self, pipeline=None, **kwargs) -> "MemoryChangeStream":
+        if not (self.client and self.client.replica_set):
+            # Sem replica set: mesmo erro que um mongod standalone devolve
+            raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+        return MemoryChangeStream(self, pipeline or [])
+
+    def _emit(self, collection: str, operation: str, document: Dict[str, Any]) -> None:
+        for listener in self.listeners:
+            listener(collection, operation, document)
+
+
+class MemoryChangeStream:
+    """
+    Change stream do banco: recebe as escritas pelos listeners do
+    MemoryDatabase. Só entende o $match por ns.coll ($in ou igualdade).
+    """
+
+    _tokens = itertools.count(1)
+
+    def __init__(self, database: MemoryDatabase, pipeline: List[Dict[str, Any]]):
+        self.database = database
+        self.collections: Optional[set] = None
+        for stage in pipeline:
+            wanted = stage.get("$match", {}).get("ns.coll")
+            if wanted is not None:
+                self.collections = set(wanted["$in"]) if isinstance(wanted, dict) else {wanted}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.database.listeners.append(self._on_write)
+
+    def _on_write(self, collection: str, operation: str, document: Dict[str, Any]) -> None:
+        if self.collections is not None and collection not in self.collections:
+            return
+        self.queue.put_nowait({
+            "_id": {"_data": f"{next(self._tokens):016x}"},
+            "operationType": operation,
+            "ns": {"db": self.database.name, "coll": collection},
+            "documentKey": {"_id": document.get("_id")},
+        })
+
+    def close(self) -> None:
+        if self._on_write in self.database.listeners:
+            self.database.listeners.remove(self._on_write)
+
+    async def __aenter__(self) -> "MemoryChangeStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class MemoryClient:
+    """
+    Substituto do AsyncIOMotorClient: cada nome de banco é isolado.
+    replica_set=True habilita change streams (db.watch), como num replica set
+    de um nó; o padrão se comporta como um mongod standalone.
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, *args, replica_set: bool = False, **kwargs):
+        self.databases: Dict[str, MemoryDatabase] = {}
+        self.replica_set = replica_set
+        self.closed = False
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self.databases:
+            self.databases[name] = MemoryDatabase(name, self)
+        return self.databases[name]
+
+    def get_database(self, name: str, **kwargs) -> MemoryDatabase:
+        return self[name]
+
+    async def drop_database(self, name: str) -> None:
+        self.databases.pop(name, None)
+
+    def close(self) -> None:
+        self.closed = True
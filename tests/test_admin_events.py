@@ -0,0 +1,120 @@
+"""
+Eventos ao vivo do painel administrativo (SSE em /api/admin/events)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import server
+from tests.test_crud import PORTFOLIO_ITEM
+
+pytestmark = pytest.mark.anyio
+
+CONTACT = {
+    "name": "Lead de Teste",
+    "email": "lead@empresa.com",
+    "company": "Empresa Teste",
+    "phone": "11999999999",
+    "message": "Quero uma proposta para o meu e-commerce.",
+}
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if "event" in fields:
+            events.append({"id": fields["id"], "type": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+@pytest.fixture
+def short_streams(monkeypatch):
+    # A conexão termina sozinha para que o ASGITransport devolva o corpo
+    monkeypatch.setattr(server, "ADMIN_EVENTS_MAX_STREAM_SECONDS", 0.3)
+    monkeypatch.setattr(server, "ADMIN_EVENTS_HEARTBEAT_SECONDS", 0.1)
+
+
+async def open_stream(api, **kwargs):
+    response = await api.get("/api/admin/events", **kwargs)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return response
+
+
+async def test_events_require_admin(api, user_headers):
+    assert (await api.get("/api/admin/events")).status_code == 401
+    assert (await api.get("/api/admin/events", headers=user_headers)).status_code == 403
+    assert (await api.post("/api/admin/events/ticket", headers=user_headers)).status_code == 403
+
+
+async def test_access_token_is_not_a_ticket(api, admin_headers):
+    token = admin_headers["Authorization"].split()[1]
+    assert (await api.get("/api/admin/events", params={"ticket": token})).status_code == 401
+    ticket = (await api.post("/api/admin/events/ticket", headers=admin_headers)).json()["ticket"]
+    assert (await api.get("/api/admin/users", headers={"Authorization": f"Bearer {ticket}"})).status_code == 401
+
+
+async def test_stream_pushes_new_leads_and_content_changes(api, admin_headers, short_streams):
+    async def write_while_streaming():
+        await asyncio.sleep(0.05)
+        await api.post("/api/contact", json=CONTACT)
+        created = (await api.post("/api/portfolio", json=PORTFOLIO_ITEM, headers=admin_headers)).json()
+        await api.delete(f"/api/portfolio/{created['id']}", headers=admin_headers)
+
+    ticket = (await api.post("/api/admin/events/ticket", headers=admin_headers)).json()["ticket"]
+    writer = asyncio.create_task(write_while_streaming())
+    response = await open_stream(api, params={"ticket": ticket})
+    await writer
+
+    assert response.text.startswith("retry: 3000")
+    assert ": ping" in response.text
+    events = parse_events(response.text)
+    assert [event["type"] for event in events] == ["contact.created", "portfolio.created", "portfolio.deleted"]
+    assert events[0]["data"]["email"] == CONTACT["email"]
+    assert events[2]["data"] == {"id": events[1]["data"]["id"]}
+
+
+async def test_reconnect_replays_missed_events(api, admin_headers, short_streams):
+    first = parse_events((await open_stream(api, headers=admin_headers)).text)
+    assert first == []
+    await api.post("/api/testimonials", json={
+        "name": "Cliente", "position": "CEO", "company": "Empresa", "avatar": "https://placehold.co/100x100",
+        "quote": "Depoimento de teste.", "rating": 5, "project": "Projeto",
+    }, headers=admin_headers)
+    marker = server.admin_events.publish("portfolio.updated", {"id": "x"})
+
+    replayed = parse_events((await open_stream(api, headers={**admin_headers, "Last-Event-ID": f"{server.admin_events.boot_id}-0"})).text)
+    assert [event["type"] for event in replayed] == ["testimonial.created", "portfolio.updated"]
+    assert replayed[-1]["id"] == marker.id
+
+    unknown = parse_events((await open_stream(api, headers={**admin_headers, "Last-Event-ID": "outro-worker-7"})).text)
+    assert [event["type"] for event in unknown] == ["resync"]
+
+
+async def test_slow_subscriber_gets_resync():
+    bus = server.EventBus(max_queue=2)
+    subscription = bus.subscribe()
+    for number in range(5):
+        bus.publish("contact.created", {"n": number})
+    event = await subscription.next(timeout=0.1)
+    assert event.type == "resync"
+    assert subscription.dropped == 5
+    assert (await subscription.next(timeout=0.01)) is None
+    bus.publish("contact.created", {"n": 5})
+    assert (await subscription.next(timeout=0.1)).data == {"n": 5}
+
+
+async def test_only_writes_from_other_workers_are_relayed(app):
+    bus = server.admin_events
+    bus.publish("portfolio.created", {"id": "local"}, document_key="local-id")
+    server.relay_remote_admin_events("portfolio", "insert", {"_id": "local-id"})
+    server.relay_remote_admin_events("portfolio", "update", {"_id": "remote-id"})
+    server.relay_remote_admin_events("contact_submissions", "update", {"_id": "crm-sync"})
+    server.relay_remote_admin_events("users", "update", {"_id": "user"})
+    assert [(event.type, event.data) for event in bus.replay] == [
+        ("portfolio.created", {"id": "local"}),
+        ("portfolio.changed", {"operation": "update"}),
+    ]
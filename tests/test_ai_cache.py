@@ -0,0 +1,68 @@
+"""
+Geração de estratégias e cache de IA (cenários de ai_cache_test.py), com o
+Gemini de teste em processo (GEMINI_BACKEND=fake)
+"""
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+REQUEST = {"industry": "E-commerce", "objective": "Aumentar vendas online"}
+
+
+async def test_cache_health_is_public(api):
+    response = await api.get("/api/v1/ai/cache/health")
+    assert response.status_code == 200
+
+
+async def test_generate_strategy_requires_auth(api):
+    response = await api.post("/api/v1/ai/generate-strategy", json=REQUEST)
+    assert response.status_code in (401, 403)
+
+
+async def test_first_call_misses_and_second_hits(api, user_headers):
+    first = await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    assert first.status_code == 200
+    assert first.json()["cached"] is False
+    assert "E-commerce" in first.json()["strategy"]
+
+    second = await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    assert second.status_code == 200
+    assert second.json()["cached"] is True
+    assert second.json()["strategy"] == first.json()["strategy"]
+
+
+async def test_cache_key_ignores_case_and_spaces(api, user_headers):
+    await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    variant = {"industry": "  e-commerce ", "objective": "AUMENTAR VENDAS ONLINE"}
+    response = await api.post("/api/v1/ai/generate-strategy", json=variant, headers=user_headers)
+    assert response.json()["cached"] is True
+
+
+async def test_cache_stats(api, user_headers):
+    await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    stats = (await api.get("/api/v1/ai/cache/stats", headers=user_headers)).json()
+    assert stats["total_entries"] == 1
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+async def test_clear_cache_forces_new_generation(api, user_headers):
+    await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    cleared = await api.delete("/api/v1/ai/cache/clear", headers=user_headers)
+    assert cleared.status_code == 200
+    response = await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    assert response.json()["cached"] is False
+
+
+async def test_cache_is_persisted_and_reloaded(api, user_headers):
+    await api.post("/api/v1/ai/generate-strategy", json=REQUEST, headers=user_headers)
+    assert await server.db.ai_strategy_cache.count_documents({}) == 1
+
+    reloaded = server.AIStrategyCache(ttl_hours=24)
+    assert await reloaded.load(server.db.ai_strategy_cache) == 1
+    assert (await reloaded.get(REQUEST["industry"], REQUEST["objective"])) is not None
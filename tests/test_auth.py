@@ -0,0 +1,78 @@
+"""
+Autenticação: cadastro, login, token JWT e rotas protegidas
+(cenários de auth_basic_test.py, login_test.py e protected_endpoints_test.py)
+"""
+
+import pytest
+
+from tests.conftest import ADMIN, USER
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_health_is_public(api):
+    response = await api.get("/api/health")
+    assert response.status_code == 200
+
+
+async def test_register_returns_token_and_user(api):
+    response = await api.post("/api/auth/register", json=USER)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["token_type"] == "bearer"
+    assert body["user"]["email"] == USER["email"]
+    assert body["user"]["role"] == "user"
+    assert "hashed_password" not in body["user"]
+
+
+async def test_register_rejects_duplicate_email(api):
+    assert (await api.post("/api/auth/register", json=USER)).status_code == 200
+    response = await api.post("/api/auth/register", json=USER)
+    assert response.status_code == 400
+
+
+async def test_register_rejects_invalid_role(api):
+    response = await api.post("/api/auth/register", json={**USER, "role": "superuser"})
+    assert response.status_code == 422
+
+
+async def test_login_with_valid_credentials(api):
+    await api.post("/api/auth/register", json=ADMIN)
+    response = await api.post("/api/auth/login", json={"email": ADMIN["email"], "password": ADMIN["password"]})
+    assert response.status_code == 200
+    assert response.json()["user"]["role"] == "admin"
+
+
+async def test_login_with_wrong_password(api):
+    await api.post("/api/auth/register", json=USER)
+    response = await api.post("/api/auth/login", json={"email": USER["email"], "password": "Errada@123"})
+    assert response.status_code == 401
+
+
+async def test_login_with_unknown_email(api):
+    response = await api.post("/api/auth/login", json={"email": "ninguem@vertextarget.com", "password": "Qualquer@123"})
+    assert response.status_code == 401
+
+
+async def test_token_from_login_opens_protected_route(api):
+    await api.post("/api/auth/register", json=ADMIN)
+    login = await api.post("/api/auth/login", json={"email": ADMIN["email"], "password": ADMIN["password"]})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = await api.get("/api/admin/users", headers=headers)
+    assert response.status_code == 200
+    assert [user["email"] for user in response.json()] == [ADMIN["email"]]
+
+
+async def test_protected_route_without_token(api):
+    response = await api.get("/api/admin/users")
+    assert response.status_code in (401, 403)
+
+
+async def test_protected_route_with_invalid_token(api):
+    response = await api.get("/api/admin/users", headers={"Authorization": "Bearer token.invalido.123"})
+    assert response.status_code == 401
+
+
+async def test_admin_route_forbidden_for_regular_user(api, user_headers):
+    response = await api.get("/api/admin/users", headers=user_headers)
+    assert response.status_code == 403
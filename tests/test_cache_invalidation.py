@@ -0,0 +1,100 @@
+"""
+Invalidação dos caches entre workers: change stream com replica set e TTL
+curto sem ele
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+import server
+from cache_invalidation import ChangeStreamInvalidator
+from tests.conftest import READY_TIMEOUT_SECONDS
+from tests.memory_mongo import MemoryClient
+from tests.test_crud import PORTFOLIO_ITEM
+
+pytestmark = pytest.mark.anyio
+
+
+async def wait_until(condition):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + READY_TIMEOUT_SECONDS
+    while not condition():
+        assert loop.time() < deadline, "condição não atingida a tempo"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def database():
+    # Replica set de um nó em memória: db.watch funciona como no mongod com --replSet
+    client = MemoryClient(replica_set=True)
+    return client, client[f"vertextarget_test_rs_{uuid.uuid4().hex[:8]}"]
+
+
+async def test_standalone_falls_back_to_short_ttl():
+    standalone = MemoryClient()["vertextarget_test_standalone"]
+    invalidator = ChangeStreamInvalidator(["portfolio"])
+    assert await invalidator.start(standalone) is False
+    assert invalidator.supported is False
+    await invalidator.stop()
+
+    server.apply_cache_ttls(False)
+    assert server.response_cache.ttl_seconds == min(server.RESPONSE_CACHE_TTL_SECONDS, server.CACHE_FALLBACK_TTL_SECONDS)
+    assert server.user_cache.ttl_seconds == min(server.USER_CACHE_TTL_SECONDS, server.CACHE_FALLBACK_TTL_SECONDS)
+
+
+async def test_invalidator_dispatches_watched_collections(database):
+    _, db = database
+    events = []
+    invalidator = ChangeStreamInvalidator(["portfolio"])
+    invalidator.add_handler(lambda collection, operation, key: events.append((collection, operation)))
+    assert await invalidator.start(db) is True
+    try:
+        await db.contact_submissions.insert_one({"id": "ignorado"})
+        await db.portfolio.insert_one({"id": "1"})
+        await db.portfolio.delete_one({"id": "1"})
+        await wait_until(lambda: len(events) == 2)
+        assert events == [("portfolio", "insert"), ("portfolio", "delete")]
+    finally:
+        await invalidator.stop()
+    assert invalidator.active is False
+
+
+async def test_write_from_other_worker_invalidates_response_cache(api):
+    assert (await api.get("/api/ready")).json()["cache_invalidation"] == "change_stream"
+    assert server.response_cache.ttl_seconds == server.RESPONSE_CACHE_TTL_SECONDS
+    assert (await api.get("/api/portfolio")).json() == []
+
+    # Escrita feita por "outro worker": direto no banco, sem passar pelos handlers
+    await server.db.portfolio.insert_one({**PORTFOLIO_ITEM, "id": "de-outro-worker"})
+    await wait_until(lambda: not server.response_cache.entries)
+    listed = (await api.get("/api/portfolio")).json()
+    assert [item["id"] for item in listed] == ["de-outro-worker"]
+
+
+async def test_role_change_from_other_process_invalidates_user_cache(api, user_headers):
+    assert (await api.get("/api/v1/ai/cache/stats", headers=user_headers)).status_code == 200
+    assert len(server.user_cache.entries) == 1
+    user_id = next(iter(server.user_cache.entries))
+
+    # Como o update_admin_role.py, rodando em outro processo
+    await server.db.users.update_one({"id": user_id}, {"$set": {"role": "admin"}})
+    await wait_until(lambda: user_id not in server.user_cache.entries)
+    response = await api.get("/api/admin/users", headers=user_headers)
+    assert response.status_code == 200
+
+
+async def test_invalidation_during_user_read_is_not_overwritten(api, user_headers, monkeypatch):
+    users = server.db.users
+    find_one = users.find_one
+
+    async def find_one_then_demote(*args, **kwargs):
+        document = await find_one(*args, **kwargs)
+        # O change stream entrega a mudança de role enquanto a leitura estava em andamento
+        server.user_cache.invalidate(object_id=document["_id"])
+        return document
+
+    monkeypatch.setattr(users, "find_one", find_one_then_demote)
+    assert (await api.get("/api/v1/ai/cache/stats", headers=user_headers)).status_code == 200
+    assert server.user_cache.entries == {}
@@ -0,0 +1,131 @@
+"""
+content_agent.py: geração em paralelo, validação, novas tentativas por item
+e gravação idempotente por vaga (hash do prompt)
+"""
+
+import pytest
+
+import content_agent
+import server
+from gemini_stub import FakeGenerativeModel
+from tests.test_crud import PORTFOLIO_ITEM
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingModel:
+    """Gemini de teste que registra os prompts e pode estragar as primeiras respostas de uma tarefa"""
+
+    def __init__(self, broken_area=None, broken_times=0):
+        self.model = FakeGenerativeModel()
+        self.prompts = []
+        self.broken_area = broken_area
+        self.broken_times = broken_times
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        response = self.model.generate_content(prompt, **kwargs)
+        if self.broken_area and f"ÁREA: {self.broken_area}" in prompt and self.broken_times:
+            self.broken_times -= 1
+            response.text = '```json\n{"title": "", "category": "x"}\n```'
+        return response
+
+
+async def run_agent(model, regenerate=False):
+    stored = None if regenerate else await content_agent.load_stored_items(server.db)
+    report = await content_agent.generate_content(model, concurrency=3, max_attempts=3, stored=stored)
+    await content_agent.save_content(server.db, report)
+    return report
+
+
+async def test_generates_validates_and_upserts(api):
+    model = RecordingModel()
+    report = await run_agent(model)
+    assert report.complete
+    assert len(model.prompts) == 5
+    assert report.written["portfolio"] == {"inserted": 3, "updated": 0, "unchanged": 0, "removed": 0}
+
+    portfolio = (await api.get("/api/portfolio")).json()
+    testimonials = (await api.get("/api/testimonials")).json()
+    assert sorted(item["category"] for item in portfolio) == sorted(content_agent.PORTFOLIO_AREAS)
+    assert {item["project"] for item in testimonials} <= {item["title"] for item in portfolio}
+
+    stored = await server.db.portfolio.find_one({"id": portfolio[0]["id"]})
+    area = next(entry for entry in report.portfolio if entry.item.title == stored["title"])
+    assert stored["slot"] == area.slot and stored["generated_by"] == "content_agent"
+    facets = (await api.get("/api/portfolio/facets")).json()
+    assert len(facets["categories"]) == 3
+
+
+async def test_rerun_reuses_stored_slots_without_calling_gemini(app):
+    await run_agent(RecordingModel())
+    before = await server.db.portfolio.find({}, {"_id": 0}).to_list(None)
+
+    model = RecordingModel()
+    report = await run_agent(model)
+    assert model.prompts == []
+    assert report.complete and all(entry.reused for entry in report.portfolio + report.testimonials)
+    assert report.written["portfolio"] == {"inserted": 0, "updated": 0, "unchanged": 3, "removed": 0}
+    assert report.written["testimonials"] == {"inserted": 0, "updated": 0, "unchanged": 2, "removed": 0}
+    assert await server.db.portfolio.find({}, {"_id": 0}).to_list(None) == before
+
+
+async def test_regenerate_updates_slots_in_place(app):
+    await run_agent(RecordingModel())
+    ids = sorted(item["id"] for item in await server.db.portfolio.find().to_list(None))
+
+    model = RecordingModel()
+    report = await run_agent(model, regenerate=True)
+    assert len(model.prompts) == 5
+    assert report.written["portfolio"] == {"inserted": 0, "updated": 3, "unchanged": 0, "removed": 0}
+    assert sorted(item["id"] for item in await server.db.portfolio.find().to_list(None)) == ids
+
+
+async def test_new_content_replaces_previous_generation(app, monkeypatch):
+    await run_agent(RecordingModel())
+    # Outro contexto -> outros prompts -> outro conteúdo gerado pelo Gemini de teste
+    monkeypatch.setattr(content_agent, "AGENCY_CONTEXT", content_agent.AGENCY_CONTEXT + "Segunda execução.\n")
+    report = await run_agent(RecordingModel())
+    assert report.written["portfolio"]["inserted"] == 3
+    assert report.written["portfolio"]["removed"] == 3
+    assert await server.db.portfolio.count_documents({}) == 3
+
+
+async def test_only_rejected_items_are_retried(app):
+    model = RecordingModel(broken_area="Desenvolvimento Web/Mobile", broken_times=1)
+    report = await run_agent(model)
+    assert report.complete
+    retried = [entry for entry in report.portfolio if entry.attempts > 1]
+    assert [entry.key for entry in retried] == ["portfolio:Desenvolvimento Web/Mobile"]
+    assert "title" in retried[0].errors[0]
+    assert len(model.prompts) == 6
+    assert "A resposta anterior foi rejeitada" in model.prompts[-3]
+
+
+async def test_incomplete_run_keeps_previous_content(app):
+    await server.db.portfolio.insert_one(server.PortfolioItem.model_validate(PORTFOLIO_ITEM).model_dump())
+    first = await run_agent(RecordingModel())
+    assert first.written["portfolio"]["removed"] == 0
+
+    partial = await run_agent(RecordingModel(broken_area="Marketing Digital de Performance", broken_times=3), regenerate=True)
+    assert not partial.complete
+    assert partial.written["portfolio"]["updated"] == 2
+    assert partial.written["portfolio"]["removed"] == 0
+    # Nada é removido: o item do painel e os da execução anterior continuam no site
+    assert await server.db.portfolio.count_documents({}) == 4
+    assert await server.db.portfolio.count_documents({"slot": {"$exists": False}}) == 1
+
+
+async def test_content_from_the_previous_agent_is_replaced(app):
+    # A versão anterior gravava a resposta do Gemini como veio: sem id nem generated_by
+    await server.db.portfolio.insert_one(dict(PORTFOLIO_ITEM))
+    await server.db.testimonials.insert_one({"name": "Antigo", "quote": "Depoimento da versão anterior.", "project": "x"})
+    await server.db.portfolio.insert_one(server.PortfolioItem.model_validate(PORTFOLIO_ITEM).model_dump())
+
+    report = await run_agent(RecordingModel())
+    assert report.legacy_adopted == 2
+    assert report.written["portfolio"]["removed"] == 1
+    assert report.written["testimonials"]["removed"] == 1
+    # Só o item do painel sobra além dos gerados agora
+    assert await server.db.portfolio.count_documents({}) == 4
+    assert await server.db.portfolio.count_documents({"generated_by": {"$exists": False}}) == 1
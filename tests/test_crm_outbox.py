@@ -0,0 +1,49 @@
+"""
+Outbox do CRM: uma resposta que chega depois do lease não sobrescreve o
+lote que outro dispatcher reivindicou, e o lote é relido por um índice
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from crm_outbox import CRMOutboxDispatcher, new_outbox_marker
+from tests.memory_mongo import MemoryDatabase
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_late_response_does_not_overwrite_a_reclaimed_batch():
+    db = MemoryDatabase()
+    await db.contact_submissions.insert_one({"id": "lead-1", "name": "Maria", "crm_sync": new_outbox_marker("lead-1")})
+    stale, current = CRMOutboxDispatcher("http://crm.test"), CRMOutboxDispatcher("http://crm.test")
+    await stale.start(db)
+    await current.start(db)
+
+    async def slow_crm(request):
+        # O lease do primeiro dispatcher expira durante a requisição e outro reivindica o lead
+        if request.headers.get("x-dispatcher") == "stale":
+            await db.contact_submissions.update_one({"id": "lead-1"}, {"$set": {"crm_sync.locked_until": datetime.utcnow() - timedelta(seconds=1)}})
+            assert len(await current._claim_batch()) == 1
+        return httpx.Response(500)
+
+    try:
+        for dispatcher, name in ((stale, "stale"), (current, "current")):
+            await dispatcher.http_client.aclose()
+            dispatcher.http_client = httpx.AsyncClient(transport=httpx.MockTransport(slow_crm), headers={"x-dispatcher": name})
+        assert await stale.dispatch_once() == 0
+    finally:
+        await asyncio.gather(stale.stop(), current.stop())
+
+    lead = await db.contact_submissions.find_one({"id": "lead-1"})
+    assert lead["crm_sync"]["status"] == "in_flight"
+    assert lead["crm_sync"]["locked_until"] > datetime.utcnow()
+
+
+async def test_batch_id_is_indexed():
+    db = MemoryDatabase()
+    await CRMOutboxDispatcher(None).start(db)
+    indexes = await db.contact_submissions.index_information()
+    assert [("crm_sync.batch_id", 1)] in [index["key"] for index in indexes.values()]
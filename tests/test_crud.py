@@ -0,0 +1,223 @@
+"""
+CRUD do portfólio e dos depoimentos (cenários de cms_crud_test.py e admin_crud_test.py)
+"""
+
+import asyncio
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+PORTFOLIO_ITEM = {
+    "title": "Plataforma E-commerce Teste",
+    "category": "E-commerce",
+    "image": "https://placehold.co/600x400",
+    "metric": "+150% vendas",
+    "description": "Plataforma de e-commerce criada pelos testes automatizados.",
+    "technologies": ["React", "FastAPI", "MongoDB"],
+    "results": {"vendas": "+150%"},
+    "challenge": "Desafio de teste",
+    "solution": "Solução de teste",
+    "outcome": "Resultado de teste",
+}
+
+TESTIMONIAL = {
+    "name": "Cliente Teste",
+    "position": "CEO",
+    "company": "Empresa Teste",
+    "avatar": "https://placehold.co/100x100",
+    "quote": "Depoimento criado pelos testes automatizados.",
+    "rating": 5,
+    "project": "Plataforma E-commerce Teste",
+}
+
+
+@pytest.fixture
+async def portfolio_item(api, admin_headers):
+    response = await api.post("/api/portfolio", json=PORTFOLIO_ITEM, headers=admin_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+async def testimonial(api, admin_headers):
+    response = await api.post("/api/testimonials", json=TESTIMONIAL, headers=admin_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+# Portfólio
+
+async def test_portfolio_starts_empty(api):
+    response = await api.get("/api/portfolio")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_create_portfolio_item(api, portfolio_item):
+    assert portfolio_item["title"] == PORTFOLIO_ITEM["title"]
+    assert portfolio_item["id"]
+    listed = (await api.get("/api/portfolio")).json()
+    assert [item["id"] for item in listed] == [portfolio_item["id"]]
+
+
+async def test_create_portfolio_item_requires_auth(api):
+    response = await api.post("/api/portfolio", json=PORTFOLIO_ITEM)
+    assert response.status_code in (401, 403)
+
+
+async def test_create_portfolio_item_rejects_invalid_data(api, admin_headers):
+    response = await api.post("/api/portfolio", json={"title": "Sem os outros campos"}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+async def test_update_portfolio_item(api, admin_headers, portfolio_item):
+    response = await api.put(f"/api/portfolio/{portfolio_item['id']}", json={"metric": "+300% vendas"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["metric"] == "+300% vendas"
+    assert response.json()["title"] == PORTFOLIO_ITEM["title"]
+
+
+async def test_concurrent_updates_keep_facet_counts(api, admin_headers, portfolio_item):
+    # Cada atualização calcula a diferença sobre a versão que substituiu
+    await asyncio.gather(*[
+        api.put(f"/api/portfolio/{portfolio_item['id']}", json={"category": category}, headers=admin_headers)
+        for category in ("FinTech", "HealthTech", "FinTech")
+    ])
+    stored = await server.db.portfolio.find_one({"id": portfolio_item["id"]})
+    facets = (await api.get("/api/portfolio/facets")).json()
+    assert {facet["value"]: facet["count"] for facet in facets["categories"]} == {stored["category"]: 1}
+
+
+async def test_failed_facet_update_is_repaired_by_a_rebuild(api, admin_headers, portfolio_item, monkeypatch):
+    async def failing_bulk_write(*args, **kwargs):
+        raise RuntimeError("mongo indisponível")
+
+    monkeypatch.setattr(server.db.portfolio_facets, "bulk_write", failing_bulk_write)
+    response = await api.put(f"/api/portfolio/{portfolio_item['id']}", json={"category": "FinTech"}, headers=admin_headers)
+    assert response.status_code == 200
+    facets = (await api.get("/api/portfolio/facets")).json()
+    assert {facet["value"]: facet["count"] for facet in facets["categories"]} == {"FinTech": 1}
+
+
+async def test_update_unknown_portfolio_item(api, admin_headers):
+    response = await api.put("/api/portfolio/nao-existe", json={"metric": "x"}, headers=admin_headers)
+    assert response.status_code == 404
+
+
+async def test_delete_portfolio_item(api, admin_headers, portfolio_item):
+    response = await api.delete(f"/api/portfolio/{portfolio_item['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert (await api.get("/api/portfolio")).json() == []
+    again = await api.delete(f"/api/portfolio/{portfolio_item['id']}", headers=admin_headers)
+    assert again.status_code == 404
+
+
+async def test_portfolio_category_filter_and_facets(api, admin_headers, portfolio_item):
+    await api.post("/api/portfolio", json={**PORTFOLIO_ITEM, "title": "App FinTech", "category": "FinTech"}, headers=admin_headers)
+    filtered = (await api.get("/api/portfolio", params={"category": "FinTech"})).json()
+    assert [item["title"] for item in filtered] == ["App FinTech"]
+    facets = (await api.get("/api/portfolio/facets")).json()
+    assert {"E-commerce", "FinTech"} <= {facet["value"] for facet in facets["categories"]}
+
+
+async def test_facets_rebuild_on_demand(api, admin_headers, user_headers, portfolio_item):
+    # Escrita fora da API (como o seed): só o rebuild sob demanda corrige as facetas
+    await server.db.portfolio.insert_one({**PORTFOLIO_ITEM, "id": "importado", "category": "Importado"})
+    assert (await api.post("/api/admin/portfolio/facets/rebuild", headers=user_headers)).status_code == 403
+    response = await api.post("/api/admin/portfolio/facets/rebuild", headers=admin_headers)
+    assert response.status_code == 200
+    facets = (await api.get("/api/portfolio/facets")).json()
+    assert {facet["value"]: facet["count"] for facet in facets["categories"]} == {"E-commerce": 1, "Importado": 1}
+    assert {facet["value"]: facet["count"] for facet in facets["technologies"]}["React"] == 2
+
+
+async def test_concurrent_facet_rebuilds_swap_whole_collections(api, portfolio_item):
+    await asyncio.gather(*[server.rebuild_portfolio_facets() for _ in range(3)])
+    assert await server.db.portfolio_facets.count_documents({"kind": "category"}) == 1
+    assert [name for name in await server.db.list_collection_names() if name.startswith("portfolio_facets_")] == []
+
+
+# Depoimentos
+
+async def test_create_and_list_testimonial(api, testimonial):
+    listed = (await api.get("/api/testimonials")).json()
+    assert [item["id"] for item in listed] == [testimonial["id"]]
+
+
+async def test_create_testimonial_rejects_invalid_rating(api, admin_headers):
+    response = await api.post("/api/testimonials", json={**TESTIMONIAL, "rating": 9}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+async def test_update_testimonial(api, admin_headers, testimonial):
+    response = await api.put(f"/api/testimonials/{testimonial['id']}", json={"rating": 4}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["rating"] == 4
+
+
+async def test_delete_testimonial(api, admin_headers, testimonial):
+    response = await api.delete(f"/api/testimonials/{testimonial['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert (await api.get("/api/testimonials")).json() == []
+
+
+async def test_delete_testimonial_requires_auth(api, testimonial):
+    response = await api.delete(f"/api/testimonials/{testimonial['id']}")
+    assert response.status_code in (401, 403)
+
+
+# Busca
+
+async def _create(api, admin_headers, path, base, **fields):
+    response = await api.post(path, json={**base, **fields}, headers=admin_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_search_ranks_portfolio_and_testimonials_together(api, admin_headers):
+    item = await _create(api, admin_headers, "/api/portfolio", PORTFOLIO_ITEM, title="Loja Shopify Headless")
+    quote = await _create(api, admin_headers, "/api/testimonials", TESTIMONIAL, quote="A migração para Shopify foi tranquila.")
+    await _create(api, admin_headers, "/api/portfolio", PORTFOLIO_ITEM, title="Aplicativo de Delivery")
+
+    response = await api.get("/api/search", params={"q": "shopify"})
+    assert response.status_code == 200
+    body = response.json()
+    # Título (peso 10) pesa mais que a citação (peso 4)
+    assert [(hit["type"], hit["id"]) for hit in body["results"]] == [("portfolio", item["id"]), ("testimonial", quote["id"])]
+    assert body["results"][0]["score"] > body["results"][1]["score"]
+    assert body["total"] == 2
+    assert body["results"][1]["highlights"]["quote"] == "A migração para <mark>Shopify</mark> foi tranquila."
+
+
+async def test_search_limit_applies_per_collection_and_overall(api, admin_headers):
+    for n in range(3):
+        await _create(api, admin_headers, "/api/portfolio", PORTFOLIO_ITEM, title=f"Shopify {n}")
+    await _create(api, admin_headers, "/api/testimonials", TESTIMONIAL, quote="Projeto Shopify entregue no prazo.")
+
+    scoped = (await api.get("/api/search", params={"q": "shopify", "scope": "portfolio", "limit": 2})).json()
+    assert scoped["total"] == 2
+    assert {hit["type"] for hit in scoped["results"]} == {"portfolio"}
+
+    merged = (await api.get("/api/search", params={"q": "shopify", "limit": 2})).json()
+    assert [hit["type"] for hit in merged["results"]] == ["portfolio", "portfolio"]
+
+    everything = (await api.get("/api/search", params={"q": "shopify"})).json()
+    assert everything["total"] == 4
+
+    assert (await api.get("/api/search", params={"q": "shopify", "limit": 51})).status_code == 422
+
+
+async def test_search_highlights_escape_html(api, admin_headers):
+    await _create(
+        api, admin_headers, "/api/portfolio", PORTFOLIO_ITEM,
+        description='<script>alert("x")</script> Integração Shopify <b>completa</b>',
+    )
+    hit = (await api.get("/api/search", params={"q": "shopify"})).json()["results"][0]
+    snippet = hit["highlights"]["description"]
+    assert "<mark>Shopify</mark>" in snippet
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in snippet
+    assert "&lt;b&gt;completa&lt;/b&gt;" in snippet
+    assert "<script>" not in snippet and "<b>" not in snippet
@@ -0,0 +1,121 @@
+"""
+Fila de jobs: notificação de contato criada a partir do marcador gravado
+no próprio contato (nunca antes dele), lease renovado durante a execução,
+resultado de uma tentativa que perdeu o lease descartado, limpeza dos jobs
+finalizados e falhas permanentes sem novas tentativas
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+from jobs import JobQueue
+from notifications import build_contact_notification, make_contact_notification_handler
+from tests.memory_mongo import MemoryDatabase
+from tests.test_admin_events import CONTACT
+from write_buffer import DURABILITY_ENQUEUE, WriteBehindBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_contact_notification_is_relayed_from_the_marker(api):
+    response = await api.post("/api/contact", json=CONTACT)
+    assert response.status_code == 200
+
+    await server.job_queue.relay_pending()
+    await server.job_queue.relay_pending()  # repasse repetido não duplica o job
+
+    contact = await server.db.contact_submissions.find_one({"id": response.json()["id"]})
+    jobs = await server.db.jobs.find({"type": "contact_notification"}).to_list(None)
+    assert contact["notification"]["status"] == "enqueued"
+    assert [job["id"] for job in jobs] == [contact["notification"]["job_id"]]
+    assert jobs[0]["payload"]["email"] == CONTACT["email"]
+
+
+async def test_no_job_before_the_buffered_contact_is_written(api, monkeypatch):
+    buffer = WriteBehindBuffer(enabled=True, flush_interval_seconds=60, durability=DURABILITY_ENQUEUE)
+    await buffer.start(server.db)
+    monkeypatch.setattr(server, "write_buffer", buffer)
+
+    assert (await api.post("/api/contact", json=CONTACT)).status_code == 200
+    await server.job_queue.relay_pending()
+    assert await server.db.jobs.count_documents({}) == 0
+
+    await buffer.stop()
+    await server.job_queue.relay_pending()
+    assert await server.db.jobs.count_documents({"type": "contact_notification"}) == 1
+
+
+async def test_lease_is_renewed_while_a_slow_handler_runs():
+    queue = JobQueue(workers=1, lease_seconds=0.06, poll_interval_seconds=0.01)
+    calls = []
+
+    async def slow_send(payload):
+        calls.append(payload)
+        await asyncio.sleep(0.2)  # mais de 3 leases, como um envio SMTP lento
+
+    queue.register("contact_notification", slow_send)
+    await queue.start(MemoryDatabase())
+    await queue.enqueue("contact_notification", {"n": 1})
+    while not calls:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.12)
+    assert await queue._claim() is None  # outro worker não reivindica o job em execução
+    await queue.stop()
+
+    job = await queue.collection.find_one({})
+    assert calls == [{"n": 1}]
+    assert job["status"] == "done" and job["attempts"] == 1
+    assert job["finished_at"] == job["completed_at"]
+
+
+async def test_stale_worker_does_not_overwrite_a_reclaimed_job():
+    queue = JobQueue(workers=1, lease_seconds=60, poll_interval_seconds=0.01)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_send(payload):
+        started.set()
+        await release.wait()
+
+    queue.register("contact_notification", slow_send)
+    await queue.start(MemoryDatabase())
+    await queue.enqueue("contact_notification", {"n": 1})
+    await started.wait()
+    # O lease se perdeu (ex.: processo pausado) e outro worker reivindicou o job
+    await queue.collection.update_one({}, {"$set": {"locked_until": datetime.utcnow() - timedelta(seconds=1)}})
+    reclaimed = await queue._claim()
+    release.set()
+    await queue.stop()
+
+    job = await queue.collection.find_one({})
+    assert reclaimed["attempts"] == 2
+    assert job["status"] == "running" and job["attempts"] == 2
+    assert "completed_at" not in job
+
+
+async def test_finished_jobs_expire(app):
+    indexes = await server.db.jobs.index_information()
+    ttl = [index.get("expireAfterSeconds") for index in indexes.values() if index["key"] == [("finished_at", 1)]]
+    assert ttl == [server.JOB_RETENTION_DAYS * 24 * 3600]
+
+
+async def test_line_breaks_in_the_name_do_not_break_the_notification():
+    message = build_contact_notification({**CONTACT, "name": "Maria\r\nBcc: x@example.com"}, "site@example.com", ["admin@example.com"])
+    assert message["Subject"] == "Novo contato pelo site: Maria Bcc: x@example.com"
+    assert message["Bcc"] is None
+
+
+async def test_permanent_errors_are_not_retried():
+    queue = JobQueue(workers=1, poll_interval_seconds=0.01)
+    queue.register("contact_notification", make_contact_notification_handler(None, "site@example.com", ["admin@example.com"]))
+    await queue.start(MemoryDatabase())
+    await queue.enqueue("contact_notification", {"name": "Sem email"})
+    while (await queue.collection.find_one({}))["status"] != "failed":
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    job = await queue.collection.find_one({})
+    assert job["attempts"] == 1
+    assert job["last_error"].startswith("PermanentJobError")
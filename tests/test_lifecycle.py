@@ -0,0 +1,95 @@
+"""
+Ciclo de vida: 503 até o aquecimento terminar (exceto liveness/readiness),
+erros não transitórios abortam o aquecimento e o encerramento drena o
+buffer de escrita antes de fechar o banco
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from pymongo.errors import OperationFailure
+
+import server
+from write_buffer import DURABILITY_ENQUEUE, WriteBehindBuffer
+
+pytestmark = pytest.mark.anyio
+
+INDEX_OPTIONS_CONFLICT = 85
+
+
+def client_for(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def wait_for(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, f"condição não atingida: fase {server.readiness.phase}"
+        await asyncio.sleep(0.01)
+
+
+async def test_requests_get_503_until_warm_up_finishes(server_state, monkeypatch):
+    release = asyncio.Event()
+    prewarm = server.prewarm_connection_pool
+
+    async def slow_prewarm():
+        await release.wait()
+        return await prewarm()
+
+    monkeypatch.setattr(server, "prewarm_connection_pool", slow_prewarm)
+    async with server.lifespan(server.app), client_for(server.app) as api:
+        await wait_for(lambda: server.readiness.phase == "conectando")
+        starting = await api.get("/api/portfolio")
+        assert starting.status_code == 503
+        assert starting.headers["retry-after"] == "5"
+        assert starting.json()["phase"] == "conectando"
+        # Liveness e readiness respondem mesmo antes de o aquecimento terminar
+        assert (await api.get("/api/health")).status_code == 200
+        ready = await api.get("/api/ready")
+        assert ready.status_code == 503 and ready.json()["status"] == "starting"
+
+        release.set()
+        await wait_for(lambda: server.readiness.ready)
+        assert (await api.get("/api/portfolio")).status_code == 200
+        assert (await api.get("/api/ready")).json()["status"] == "ready"
+
+
+async def test_non_transient_error_aborts_warm_up(server_state, monkeypatch):
+    attempts = []
+
+    async def conflicting_text_index():
+        attempts.append(1)
+        raise OperationFailure("An equivalent index already exists with different options", code=INDEX_OPTIONS_CONFLICT)
+
+    monkeypatch.setattr(server, "ensure_search_indexes", conflicting_text_index)
+    async with server.lifespan(server.app), client_for(server.app) as api:
+        await wait_for(lambda: server.readiness.phase == "falhou")
+        ready = (await api.get("/api/ready")).json()
+        assert ready["attempts"] == 1
+        assert ready["last_error"].startswith("fase indices: OperationFailure")
+    assert attempts == [1]
+
+
+async def test_warm_up_before_serving_fails_startup_on_non_transient_error(server_state, monkeypatch):
+    async def conflicting_text_index():
+        raise OperationFailure("An equivalent index already exists with different options", code=INDEX_OPTIONS_CONFLICT)
+
+    monkeypatch.setattr(server, "ensure_search_indexes", conflicting_text_index)
+    monkeypatch.setattr(server, "WARM_UP_BEFORE_SERVING", True)
+    with pytest.raises(OperationFailure):
+        async with server.lifespan(server.app):
+            pass
+
+
+async def test_shutdown_drains_the_write_buffer(server_state, monkeypatch):
+    buffer = WriteBehindBuffer(enabled=True, flush_interval_seconds=60, durability=DURABILITY_ENQUEUE)
+    monkeypatch.setattr(server, "write_buffer", buffer)
+    async with server.lifespan(server.app), client_for(server.app) as api:
+        await wait_for(lambda: server.readiness.ready)
+        assert (await api.post("/api/status", json={"client_name": "encerramento"})).status_code == 200
+        assert await server_state.status_checks.count_documents({"client_name": "encerramento"}) == 0
+
+    assert not server.readiness.ready and server.readiness.phase == "encerrando"
+    assert await server_state.status_checks.count_documents({"client_name": "encerramento"}) == 1
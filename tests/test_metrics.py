@@ -0,0 +1,73 @@
+"""
+Métricas: GET /metrics só com token (404 sem METRICS_TOKEN, 401 com token
+errado) e PrometheusMiddleware rotulando pelo template da rota
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import server
+from metrics import HTTPMetrics, MetricsRegistry, PrometheusMiddleware
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = "token-de-metricas"
+
+
+@pytest.fixture
+def metrics_on(monkeypatch):
+    monkeypatch.setattr(server, "METRICS_ENABLED", True)
+    monkeypatch.setattr(server, "METRICS_TOKEN", TOKEN)
+
+
+async def test_metrics_are_not_served_without_a_token(api, monkeypatch):
+    monkeypatch.setattr(server, "METRICS_ENABLED", True)
+    monkeypatch.setattr(server, "METRICS_TOKEN", None)
+    assert (await api.get("/metrics")).status_code == 404
+    assert (await api.get("/metrics", headers={"Authorization": "Bearer "})).status_code == 404
+
+
+async def test_metrics_disabled_returns_404(api, monkeypatch):
+    monkeypatch.setattr(server, "METRICS_ENABLED", False)
+    monkeypatch.setattr(server, "METRICS_TOKEN", TOKEN)
+    assert (await api.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})).status_code == 404
+
+
+async def test_metrics_require_the_token(api, metrics_on):
+    assert (await api.get("/metrics")).status_code == 401
+    assert (await api.get("/metrics", headers={"Authorization": "Bearer outro"})).status_code == 401
+
+    response = await api.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "vertextarget_http_request_duration_seconds" in response.text
+
+
+async def test_middleware_labels_requests_by_route_template():
+    registry = MetricsRegistry(namespace="teste")
+    http_metrics = HTTPMetrics(registry)
+    app = FastAPI()
+
+    @app.get("/itens/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    async def metrics():
+        return {}
+
+    app.add_middleware(PrometheusMiddleware, http_metrics=http_metrics)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for item_id in ("a", "b", "c"):
+            await client.get(f"/itens/{item_id}")
+        await client.get("/nao-existe")
+        await client.get("/metrics")
+
+    text = registry.render().decode()
+    assert 'teste_http_requests_total{method="GET",route="/itens/{item_id}",status="2xx"} 3' in text
+    assert 'teste_http_requests_total{method="GET",route="<unmatched>",status="4xx"} 1' in text
+    # Nem o path bruto nem o próprio /metrics viram rótulos
+    assert 'route="/itens/a"' not in text
+    assert 'route="/metrics"' not in text
+    assert 'teste_http_requests_in_flight{method="GET"} 0' in text
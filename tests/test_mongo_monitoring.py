@@ -0,0 +1,160 @@
+"""
+Monitoramento do MongoDB: opções do pool lidas do ambiente, contadores do
+PoolMetricsListener, formato das consultas lentas sem valores, top-N da
+janela e os endpoints /api/admin/db/*
+"""
+
+import sys
+import time
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from mongo_monitoring import PoolMetricsListener, SlowQueryLog, build_client_options, command_shape, redact_shape
+
+pytestmark = pytest.mark.anyio
+
+
+def test_client_options_from_environment(monkeypatch):
+    monkeypatch.setitem(sys.modules, "snappy", None)  # biblioteca não instalada
+    options = build_client_options({
+        "MONGO_MAX_POOL_SIZE": "50",
+        "MONGO_MIN_POOL_SIZE": "5",
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": "2000",
+        "MONGO_SOCKET_TIMEOUT_MS": "",
+        "MONGO_COMPRESSORS": "snappy, lz4, zlib",
+        "MONGO_ZLIB_LEVEL": "6",
+        "MONGO_READ_PREFERENCE": "secondaryPreferred",
+    })
+    assert options == {
+        "maxPoolSize": 50,
+        "minPoolSize": 5,
+        "waitQueueTimeoutMS": 2000,
+        "compressors": "zlib",
+        "zlibCompressionLevel": 6,
+        "readPreference": "secondaryPreferred",
+    }
+
+
+def test_unset_options_keep_driver_defaults(monkeypatch):
+    monkeypatch.setitem(sys.modules, "snappy", None)
+    assert build_client_options({}) == {}
+    # Sem nenhum compressor disponível, nem o nível do zlib é enviado
+    assert build_client_options({"MONGO_COMPRESSORS": "snappy", "MONGO_ZLIB_LEVEL": "6"}) == {}
+
+
+def test_pool_listener_counts_connections_and_waits():
+    listener = PoolMetricsListener()
+    address = ("localhost", 27017)
+    for _ in range(3):
+        listener.connection_created(SimpleNamespace(address=address))
+    listener.connection_closed(SimpleNamespace(address=address))
+    for duration in (0.0005, 0.03, 2.0):
+        listener.connection_checked_out(SimpleNamespace(address=address, duration=duration))
+    listener.connection_checked_in(SimpleNamespace(address=address))
+    listener.connection_check_out_failed(SimpleNamespace(address=address, duration=6.0))
+
+    snapshot = listener.snapshot()
+    assert snapshot["connections_open"] == 2
+    assert snapshot["checked_out"] == 2
+    assert snapshot["checkouts_total"] == 3
+    assert snapshot["checkout_failures"] == 1
+    wait = snapshot["checkout_wait"]
+    assert wait["count"] == 4
+    assert wait["max_ms"] == 6000.0
+    # Histograma cumulativo: cada faixa conta as esperas até o seu limite
+    assert wait["buckets_ms"] == {
+        "le_1": 1, "le_5": 1, "le_10": 1, "le_50": 2, "le_100": 2, "le_500": 2, "le_1000": 2, "le_5000": 3,
+    }
+
+
+def test_pool_listener_measures_wait_without_event_duration():
+    # pymongo < 4.7: a espera é medida desde o check_out_started da mesma thread
+    listener = PoolMetricsListener()
+    listener.connection_check_out_started(SimpleNamespace(address=None))
+    listener.connection_checked_out(SimpleNamespace(address=None))
+    listener.connection_checked_out(SimpleNamespace(address=None))  # sem início registrado: não conta
+    assert listener.snapshot()["checkout_wait"]["count"] == 1
+
+
+async def test_pool_stats_require_admin(api, admin_headers, user_headers):
+    assert (await api.get("/api/admin/db/pool", headers=user_headers)).status_code == 403
+    response = await api.get("/api/admin/db/pool", headers=admin_headers)
+    assert response.status_code == 200
+    assert {"options", "pool"} <= set(response.json())
+    assert "connections_open" in response.json()["pool"]
+
+
+_request_ids = count()
+
+
+def run_command(log, command_name, command, duration_ms):
+    """Passa um comando pelo listener como o pymongo faria (início e fim)"""
+    request_id = next(_request_ids)
+    log.started(SimpleNamespace(command_name=command_name, command=command, connection_id=("localhost", 27017), request_id=request_id))
+    log.succeeded(SimpleNamespace(connection_id=("localhost", 27017), request_id=request_id, duration_micros=int(duration_ms * 1000)))
+
+
+def test_filter_shape_has_no_values():
+    shape = redact_shape({"email": "a@b.com", "age": {"$gt": 30}, "$or": [{"role": "admin"}, {"tags": {"$in": ["x", "y"]}}]})
+    assert shape == {"email": "?", "age": {"$gt": "?"}, "$or": [{"role": "?"}, {"tags": {"$in": ["?"]}}]}
+
+
+def test_pipeline_shape_redacts_literals_in_expression_stages():
+    shape = command_shape("aggregate", {"aggregate": "portfolio", "pipeline": [
+        {"$match": {"category": "FinTech"}},
+        {"$project": {"title": 1, "badge": {"$literal": "segredo"}}},
+        {"$group": {"_id": "$category", "pagos": {"$sum": {"$cond": [{"$eq": ["$status", "pago"]}, 1, 0]}}}},
+        {"$sort": {"pagos": -1}},
+        {"$unwind": "$technologies"},
+        {"$count": "total"},
+    ]})
+    assert shape["pipeline"] == [
+        {"$match": {"category": "?"}},
+        {"$project": {"title": "?", "badge": {"$literal": "?"}}},
+        {"$group": {"_id": "$category", "pagos": {"$sum": {"$cond": [{"$eq": ["$status", "?"]}, "?", "?"]}}}},
+        {"$sort": {"pagos": -1}},
+        {"$unwind": "$technologies"},
+        {"$count": "total"},
+    ]
+
+
+def test_top_shapes_are_ranked_by_total_time_within_the_window(monkeypatch):
+    log = SlowQueryLog(threshold_ms=10, top_n=2, window_seconds=60)
+    run_command(log, "find", {"find": "users", "filter": {"email": "a@b.com"}}, 5)  # abaixo do limite
+    run_command(log, "find", {"find": "users", "filter": {"email": "c@d.com"}}, 30)
+    run_command(log, "find", {"find": "users", "filter": {"email": "e@f.com"}}, 30)
+    run_command(log, "find", {"find": "portfolio", "filter": {"category": "x"}}, 50)
+
+    started = time.time()
+    monkeypatch.setattr(time, "time", lambda: started - 120)
+    run_command(log, "count", {"count": "jobs", "query": {"status": "pending"}}, 500)  # fora da janela
+    monkeypatch.undo()
+
+    top = log.top()
+    assert [(entry["collection"], entry["count"], entry["total_ms"]) for entry in top] == [("users", 2, 60.0), ("portfolio", 1, 50.0)]
+    assert top[0]["shape"] == {"filter": {"email": "?"}}
+    assert len(log.top(limit=1)) == 1
+    users = next(stats for stats in log.by_command() if stats["collection"] == "users")
+    assert users["count"] == 3
+
+
+async def test_slow_query_endpoints(api, admin_headers, user_headers, monkeypatch):
+    log = SlowQueryLog(threshold_ms=10)
+    monkeypatch.setattr(server, "slow_query_log", log)
+    run_command(log, "find", {"find": "portfolio", "filter": {"title": "Projeto secreto"}}, 25)
+
+    assert (await api.get("/api/admin/db/slow-queries", headers=user_headers)).status_code == 403
+    assert (await api.delete("/api/admin/db/slow-queries", headers=user_headers)).status_code == 403
+
+    response = await api.get("/api/admin/db/slow-queries", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["threshold_ms"] == 10
+    assert [entry["shape"] for entry in body["slow_queries"]] == [{"filter": {"title": "?"}}]
+    assert "Projeto secreto" not in response.text
+
+    assert (await api.delete("/api/admin/db/slow-queries", headers=admin_headers)).status_code == 200
+    assert (await api.get("/api/admin/db/slow-queries", headers=admin_headers)).json()["slow_queries"] == []
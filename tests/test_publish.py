@@ -0,0 +1,75 @@
+"""
+Publicação do portfólio e dos depoimentos como JSON estático versionado
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+import server
+from publish import StaticContentPublisher
+from tests.test_crud import PORTFOLIO_ITEM
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def publisher(tmp_path, monkeypatch):
+    static_publisher = StaticContentPublisher(str(tmp_path), keep_versions=2, debounce_seconds=0.01,
+                                              render=server.render_static_content)
+    monkeypatch.setattr(server, "static_publisher", static_publisher)
+    return static_publisher
+
+
+async def wait_for_publish(publisher, count):
+    for _ in range(200):
+        manifest = publisher.read_manifest()
+        if manifest and manifest["files"]["portfolio"]["count"] == count:
+            return manifest
+        await asyncio.sleep(0.01)
+    pytest.fail("conteúdo não foi publicado a tempo")
+
+
+async def test_publish_is_versioned_and_idempotent(tmp_path):
+    publisher = StaticContentPublisher(str(tmp_path))
+    first = publisher.publish({"portfolio": b'[{"id":"1"}]'})
+    path = first.manifest["files"]["portfolio"]["path"]
+    assert path.startswith("portfolio.") and first.changed
+    assert gzip.decompress((tmp_path / f"{path}.gz").read_bytes()) == b'[{"id":"1"}]'
+
+    again = publisher.publish({"portfolio": b'[{"id":"1"}]'})
+    assert not again.changed
+    assert again.manifest == first.manifest
+
+
+async def test_old_versions_are_pruned(tmp_path):
+    publisher = StaticContentPublisher(str(tmp_path), keep_versions=2)
+    paths = [publisher.publish({"portfolio": f'[{{"id":"{n}"}}]'.encode()}).manifest["files"]["portfolio"]["path"]
+             for n in range(4)]
+    remaining = sorted(p.name for p in tmp_path.glob("portfolio.*.json"))
+    assert paths[-1] in remaining
+    assert len(remaining) == 2
+    assert len(list(tmp_path.glob("portfolio.*.json.gz"))) == 2
+
+
+async def test_writes_publish_the_same_bytes_as_the_api(api, admin_headers, publisher):
+    await api.post("/api/portfolio", json=PORTFOLIO_ITEM, headers=admin_headers)
+    manifest = await wait_for_publish(publisher, 1)
+
+    served_manifest = await api.get("/content/manifest.json")
+    assert served_manifest.json() == manifest
+    assert "max-age=60" in served_manifest.headers["cache-control"]
+
+    published = await api.get(f"/content/{manifest['files']['portfolio']['path']}", headers={"Accept-Encoding": "gzip"})
+    assert published.headers["content-encoding"] == "gzip"
+    assert "immutable" in published.headers["cache-control"]
+    from_api = await api.get("/api/portfolio", headers={"Accept-Encoding": "identity"})
+    assert published.content == from_api.content
+    assert json.loads(published.content)[0]["title"] == PORTFOLIO_ITEM["title"]
+
+
+async def test_unknown_files_are_not_served(api, publisher):
+    assert (await api.get("/content/..%2Fsecret.json")).status_code == 404
+    assert (await api.get("/content/portfolio.000000000000.json")).status_code == 404
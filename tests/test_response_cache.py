@@ -0,0 +1,77 @@
+"""
+Cache das listas públicas: chave só com os filtros declarados, tamanho
+limitado, sem dados antigos após invalidação e If-None-Match (com um
+ETag por codificação)
+"""
+
+import pytest
+from starlette.requests import Request
+
+import server
+from compression import PrecompressedResponseCache
+from tests.test_crud import portfolio_item  # noqa: F401 (fixture)
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_unknown_query_params_share_the_entry(api, portfolio_item):
+    await api.get("/api/portfolio")
+    for n in range(5):
+        assert (await api.get("/api/portfolio", params={"x": n})).status_code == 200
+    await api.get("/api/portfolio", params=[("technology", "React"), ("technology", "FastAPI")])
+    await api.get("/api/portfolio", params=[("technology", "FastAPI"), ("technology", "React"), ("technology", "React")])
+    assert sorted(server.response_cache.entries) == [
+        "/api/portfolio?",
+        "/api/portfolio?technology=FastAPI&technology=React",
+    ]
+
+
+async def test_filters_are_length_limited(api):
+    assert (await api.get("/api/portfolio", params={"technology": "x" * 101})).status_code == 422
+    assert (await api.get("/api/portfolio", params=[("technology", str(n)) for n in range(11)])).status_code == 422
+
+
+async def test_cache_size_is_bounded():
+    cache = PrecompressedResponseCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.store(name, b"[]")
+    cache.get("a")
+    cache.store("c", b"[]")
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.evictions == 1
+
+
+async def test_store_after_invalidation_is_not_cached():
+    cache = PrecompressedResponseCache()
+    generation = cache.generation  # lida antes da consulta ao banco
+    cache.invalidate("/api/portfolio")  # escrita concluída durante a consulta
+    entry = cache.store("/api/portfolio?", b"[]", generation=generation)
+    assert entry.variants["identity"] == b"[]"
+    assert cache.entries == {}
+
+
+async def test_if_none_match_returns_304(api):
+    first = await api.get("/api/testimonials")
+    etag = first.headers["etag"]
+    cached = await api.get("/api/testimonials", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert (await api.get("/api/testimonials", headers={"If-None-Match": '"outro"'})).status_code == 200
+
+
+async def test_each_encoding_has_its_own_etag():
+    cache = PrecompressedResponseCache(minimum_size=0)
+    entry = cache.store("/api/portfolio?", b'[{"title": "Projeto"}]' * 50)
+
+    def respond(**headers):
+        scope = {"type": "http", "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]}
+        return cache.respond(Request(scope), entry)
+
+    identity, gzipped = respond(accept_encoding="identity"), respond(accept_encoding="gzip")
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert len({identity.headers["etag"], gzipped.headers["etag"]}) == 2
+    # A tag de qualquer variante revalida; o 304 traz a tag da variante que o cliente receberia
+    revalidated = respond(accept_encoding="gzip", if_none_match=identity.headers["etag"])
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == gzipped.headers["etag"]
@@ -0,0 +1,75 @@
+"""
+Server-Timing: com o middleware e a ServerTimingRoute (SERVER_TIMING_ENABLED),
+uma rota autenticada informa auth, db (alimentada pelo ServerTimingListener
+através do ContextVar), serialize e total
+"""
+
+import asyncio
+import re
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+import server
+from server_timing import ServerTimingListener, ServerTimingMiddleware, ServerTimingRoute
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def timed_app(app):
+    """As rotas reais do server, montadas como com SERVER_TIMING_ENABLED=true (lido na importação)"""
+    timing_app = FastAPI()
+    router = APIRouter(prefix="/api", route_class=ServerTimingRoute)
+    router.add_api_route(
+        "/contact", server.get_contact_submissions, methods=["GET"],
+        response_model=List[server.ContactSubmissionResponse],
+    )
+    timing_app.include_router(router)
+    timing_app.add_middleware(ServerTimingMiddleware)
+    return timing_app
+
+
+@pytest.fixture
+def mongo_command_events(monkeypatch):
+    """
+    O MongoDB em memória não emite eventos de comando: a busca do usuário
+    chama o ServerTimingListener numa thread com cópia do contexto, como o Motor
+    """
+    listener = ServerTimingListener()
+    users = server.db.users
+    find_one = users.find_one
+
+    async def find_one_with_event(*args, **kwargs):
+        document = await find_one(*args, **kwargs)
+        await asyncio.to_thread(listener.succeeded, SimpleNamespace(duration_micros=2500))
+        return document
+
+    monkeypatch.setattr(users, "find_one", find_one_with_event)
+
+
+def parse_server_timing(value: str) -> dict:
+    entries = {}
+    for entry in value.split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+async def test_authenticated_route_reports_each_phase(timed_app, admin_headers, mongo_command_events):
+    transport = httpx.ASGITransport(app=timed_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/contact", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.headers["timing-allow-origin"] == "*"
+    timings = parse_server_timing(response.headers["server-timing"])
+    assert list(timings) == ["auth", "db", "serialize", "total"]
+    assert timings["db"] == {"dur": "2.5", "desc": '"1 comandos"'}
+    durations = {name: float(params["dur"]) for name, params in timings.items()}
+    assert durations["total"] >= durations["auth"] >= 0
+    assert all(re.fullmatch(r"\d+\.\d", params["dur"]) for params in timings.values())
+
@@ -0,0 +1,150 @@
+"""
+Status checks legados: coleção time-series com retenção e rollups por cliente
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+import server
+from status_rollups import StatusRollups
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_status_checks_collection_is_time_series(app):
+    infos = await server.db.list_collections(filter={"name": "status_checks"}).to_list(1)
+    assert infos[0]["type"] == "timeseries"
+    assert infos[0]["options"]["timeseries"]["metaField"] == "client_name"
+    assert infos[0]["options"]["expireAfterSeconds"] == server.STATUS_CHECK_RETENTION_DAYS * 24 * 3600
+
+
+async def test_existing_regular_collection_gets_ttl_index(app):
+    await server.db.drop_collection("status_checks")
+    await server.db.status_checks.insert_one({"id": "antigo", "client_name": "legado", "timestamp": datetime.utcnow()})
+    await server.ensure_status_checks_collection()
+    indexes = await server.db.status_checks.index_information()
+    assert indexes["timestamp_1"]["expireAfterSeconds"] == server.STATUS_CHECK_RETENTION_DAYS * 24 * 3600
+
+
+async def test_list_returns_newest_first(api):
+    for name in ("primeiro", "segundo", "terceiro"):
+        assert (await api.post("/api/status", json={"client_name": name})).status_code == 200
+    await server.write_buffer.flush()
+    listed = (await api.get("/api/status", params={"limit": 2})).json()
+    assert [item["client_name"] for item in listed] == ["terceiro", "segundo"]
+
+
+async def test_summary_counts_per_client(api):
+    for name in ("site", "site", "app"):
+        await api.post("/api/status", json={"client_name": name})
+    summary = (await api.get("/api/status/summary", params={"window_minutes": 30})).json()
+    assert summary["granularity"] == "minute"
+    assert summary["total"] == 3
+    assert [(client["client_name"], client["count"]) for client in summary["clients"]] == [("site", 2), ("app", 1)]
+
+
+async def test_long_window_uses_hourly_rollups(api):
+    await api.post("/api/status", json={"client_name": "site"})
+    summary = (await api.get("/api/status/summary", params={"window_minutes": 7 * 24 * 60})).json()
+    assert summary["granularity"] == "hour"
+    assert summary["total"] == 1
+
+
+async def test_backfill_runs_once(app):
+    now = datetime.utcnow()
+    await server.db.status_checks.insert_many([
+        {"id": "a", "client_name": "legado", "timestamp": now - timedelta(minutes=5)},
+        {"id": "b", "client_name": "legado", "timestamp": now - timedelta(minutes=4)},
+    ])
+    await server.db.status_check_rollups.delete_many({})
+    rollups = StatusRollups()
+    await rollups.ensure_indexes(server.db)
+    assert await rollups.backfill(server.db.status_checks) == 2
+    assert await rollups.backfill(server.db.status_checks) == 0
+    summary = await rollups.summary(timedelta(minutes=10))
+    assert summary["clients"][0]["count"] == 2
+
+
+async def test_interrupted_backfill_is_repeated_without_double_counting(app):
+    now = datetime.utcnow()
+    await server.db.status_checks.insert_many([
+        {"id": "a", "client_name": "legado", "timestamp": now - timedelta(minutes=5)},
+        {"id": "b", "client_name": "legado", "timestamp": now - timedelta(minutes=4)},
+    ])
+    await server.db.status_check_rollups.delete_many({})
+    rollups = StatusRollups()
+    await rollups.ensure_indexes(server.db)
+    await rollups.backfill(server.db.status_checks)
+    # Processo morreu antes de gravar o marcador: a próxima inicialização refaz o backfill
+    await server.db.status_check_rollups.delete_one({"_id": "backfill"})
+    assert await rollups.backfill(server.db.status_checks) == 2
+    summary = await rollups.summary(timedelta(minutes=10))
+    assert summary["clients"][0]["count"] == 2
+
+
+async def test_backfill_does_not_recount_live_checks_from_another_worker(app):
+    await server.db.status_check_rollups.delete_many({})
+    await server.db.status_checks.insert_one({"id": "antigo", "client_name": "site", "timestamp": datetime.utcnow() - timedelta(minutes=5)})
+    first, second = StatusRollups(), StatusRollups()
+    await first.ensure_indexes(server.db)
+    await second.ensure_indexes(server.db)
+    await first.backfill(server.db.status_checks)
+
+    # O primeiro worker já atende; o segundo ainda está no backfill (não viu o marcador)
+    await server.db.status_check_rollups.delete_one({"_id": "backfill"})
+    live = datetime.utcnow()
+    await server.db.status_checks.insert_one({"id": "novo", "client_name": "site", "timestamp": live})
+    first.record("site", live)
+    await first.flush()
+    await second.backfill(server.db.status_checks)
+
+    assert second.cutoff == first.cutoff
+    summary = await second.summary(timedelta(minutes=10))
+    assert summary["clients"][0]["count"] == 2
+
+
+async def test_stop_during_flush_keeps_counters(app, monkeypatch):
+    rollups = StatusRollups(flush_interval_seconds=0.01)
+    await rollups.ensure_indexes(server.db)
+    collection = rollups.collection
+    started = asyncio.Event()
+    bulk_write = collection.bulk_write
+
+    async def slow_bulk_write(operations, **kwargs):
+        started.set()
+        await asyncio.sleep(0.05)
+        return await bulk_write(operations, **kwargs)
+
+    monkeypatch.setattr(collection, "bulk_write", slow_bulk_write)
+    await rollups.start(server.db)
+    rollups.record("site", datetime.utcnow())
+    await started.wait()
+    await rollups.stop()
+    assert rollups.pending == {}
+    assert (await rollups.summary(timedelta(minutes=10)))["total"] == 1
+
+
+@pytest.fixture
+def flaky_rollup_indexes(monkeypatch):
+    """A primeira criação de índices dos rollups falha, como um MongoDB instável no deploy"""
+    attempts = []
+    ensure_indexes = StatusRollups.ensure_indexes
+
+    async def flaky(self, db, *args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise AutoReconnect("mongo indisponível")
+        await ensure_indexes(self, db, *args, **kwargs)
+
+    monkeypatch.setattr(StatusRollups, "ensure_indexes", flaky)
+    return attempts
+
+
+async def test_rollup_errors_during_warm_up_are_retried(flaky_rollup_indexes, app):
+    # O app só fica pronto se a falha entrou no ciclo de novas tentativas do aquecimento
+    assert server.readiness.ready
+    assert server.readiness.attempts == 2
+    assert len(flaky_rollup_indexes) == 2
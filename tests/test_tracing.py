@@ -0,0 +1,152 @@
+"""
+Tracing: leitura do traceparent, amostragem determinística pelo trace_id,
+spans da TracingMiddleware exportados pelo JSONFileExporter configurado via
+build_tracer_from_env e limites do BatchSpanProcessor
+"""
+
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from tracing import (
+    KIND_CLIENT, KIND_SERVER, BatchSpanProcessor, JSONFileExporter, Tracer, TracingMiddleware,
+    build_tracer_from_env, parse_traceparent,
+)
+
+pytestmark = pytest.mark.anyio
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class ListExporter:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def export(self, spans):
+        if self.fail:
+            raise ConnectionError("coletor fora do ar")
+        self.batches.append([span.name for span in spans])
+
+    async def shutdown(self):
+        pass
+
+
+def test_parse_valid_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f" 00-{TRACE_ID}-{PARENT_ID}-00 ") == (TRACE_ID, PARENT_ID, False)
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    "lixo",
+    f"00-{TRACE_ID}-{PARENT_ID}",
+    f"00-{TRACE_ID[:-1]}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{PARENT_ID}0-01",
+    f"00-{TRACE_ID}-{PARENT_ID}-zz",
+])
+def test_parse_invalid_traceparent(header):
+    assert parse_traceparent(header) is None
+
+
+def test_sampling_is_stable_per_trace_id():
+    tracer = Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=0.5)
+    low, high = "3" + "0" * 31, "c" + "0" * 31
+    assert all(tracer._should_sample(low) for _ in range(10))
+    assert not any(tracer._should_sample(high) for _ in range(10))
+    # Outro serviço com a mesma razão chega à mesma decisão
+    other = Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=0.5)
+    assert other._should_sample(low) and not other._should_sample(high)
+    assert not Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=0.0)._should_sample("0" * 32)
+
+
+def test_incoming_sampling_flag_wins_over_ratio():
+    tracer = Tracer(BatchSpanProcessor(ListExporter()), sample_ratio=0.0)
+    span = tracer.start_root("GET", f"00-{TRACE_ID}-{PARENT_ID}-01")
+    assert span.trace_id == TRACE_ID and span.parent_id == PARENT_ID
+    assert tracer.start_root("GET", f"00-{TRACE_ID}-{PARENT_ID}-00") is None
+    assert Tracer().start_root("GET", f"00-{TRACE_ID}-{PARENT_ID}-01") is None
+
+
+def test_disabled_by_default():
+    assert not build_tracer_from_env({}).enabled
+    assert not build_tracer_from_env({"TRACING_ENABLED": "no"}).enabled
+
+
+async def test_middleware_spans_are_written_by_the_json_exporter(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = build_tracer_from_env({
+        "TRACING_ENABLED": "true",
+        "TRACING_EXPORTER": "json",
+        "TRACING_FILE": str(path),
+        "TRACING_SAMPLE_RATIO": "0",
+    })
+    assert isinstance(tracer.processor.exporter, JSONFileExporter)
+    app = FastAPI()
+
+    @app.get("/itens/{item_id}")
+    async def get_item(item_id: str):
+        with tracer.span("mongo.find", kind=KIND_CLIENT, collection="itens") as span:
+            span.set_attribute("db.rows", 1)
+        return {"id": item_id}
+
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/itens/a")  # razão 0 e sem traceparent: não amostrado
+        await client.get("/itens/b", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        await client.get("/itens/c", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"})
+    await tracer.stop()
+
+    spans = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [span["name"] for span in spans] == ["mongo.find", "GET /itens/{item_id}"]
+    child, root = spans
+    assert {child["trace_id"], root["trace_id"]} == {TRACE_ID}
+    assert root["parent_id"] == PARENT_ID and child["parent_id"] == root["span_id"]
+    assert root["kind"] == KIND_SERVER
+    assert root["attributes"] == {
+        "http.method": "GET", "http.target": "/itens/b", "http.status_code": 200, "http.route": "/itens/{item_id}",
+    }
+    assert child["attributes"] == {"collection": "itens", "db.rows": 1}
+    assert root["duration_ms"] >= child["duration_ms"] >= 0
+
+
+async def test_errors_inside_a_span_are_recorded():
+    processor = BatchSpanProcessor(ListExporter())
+    tracer = Tracer(processor, sample_ratio=1.0)
+    root = tracer.start_root("GET")
+    token = tracer.activate(root)
+    with pytest.raises(ValueError):
+        with tracer.span("calculo"):
+            raise ValueError("entrada inválida")
+    tracer.deactivate(token)
+    tracer.finish_root(root)
+
+    child = processor.queue[0].to_dict()
+    assert child["status"] == "error"
+    assert child["status_message"] == "ValueError: entrada inválida"
+    # Fora de um trace amostrado o span é nulo
+    with tracer.span("solto") as span:
+        span.set_attribute("ignorado", True)
+    assert len(processor.queue) == 2
+
+
+async def test_batch_processor_drops_when_full_and_on_export_failure():
+    exporter = ListExporter()
+    processor = BatchSpanProcessor(exporter, max_queue_size=3, max_batch_size=2)
+    tracer = Tracer(processor, sample_ratio=1.0)
+    for name in ("a", "b", "c", "d"):
+        tracer.finish_root(tracer.start_root(name))
+    assert processor.dropped == 1
+
+    await processor.flush()
+    assert exporter.batches == [["a", "b"], ["c"]]
+    assert processor.exported == 3 and not processor.queue
+
+    exporter.fail = True
+    tracer.finish_root(tracer.start_root("e"))
+    await processor.flush()
+    assert processor.dropped == 2 and not processor.queue
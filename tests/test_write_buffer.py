@@ -0,0 +1,75 @@
+"""
+Buffer de escrita: nada se perde no stop(), mesmo com um flush em andamento
+"""
+
+import asyncio
+
+import pytest
+
+from write_buffer import DURABILITY_ENQUEUE, DURABILITY_FLUSH, WriteBehindBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowCollection:
+    def __init__(self, delay):
+        self.delay = delay
+        self.documents = []
+        self.started = asyncio.Event()
+
+    async def insert_many(self, documents, ordered=True):
+        self.started.set()
+        await asyncio.sleep(self.delay)
+        self.documents.extend(documents)
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+
+
+class SlowDatabase(dict):
+    def __init__(self, delay=0.05):
+        super().__init__(leads=SlowCollection(delay))
+
+
+@pytest.mark.parametrize("durability", [DURABILITY_FLUSH, DURABILITY_ENQUEUE])
+async def test_stop_during_flush_writes_everything(durability):
+    db = SlowDatabase()
+    buffer = WriteBehindBuffer(enabled=True, flush_interval_seconds=0.01, durability=durability)
+    await buffer.start(db)
+
+    request = asyncio.create_task(buffer.insert("leads", {"n": 1}))
+    await db["leads"].started.wait()  # o lote já saiu de pending e está em insert_many
+    await buffer.stop()
+
+    await asyncio.wait_for(request, timeout=1)
+    assert db["leads"].documents == [{"n": 1}]
+
+
+async def test_stop_waits_for_size_triggered_flushes():
+    db = SlowDatabase()
+    buffer = WriteBehindBuffer(enabled=True, max_batch_size=2, flush_interval_seconds=10,
+                               durability=DURABILITY_ENQUEUE)
+    await buffer.start(db)
+    for n in range(4):
+        await buffer.insert("leads", {"n": n})
+    await buffer.stop()
+    assert sorted(document["n"] for document in db["leads"].documents) == [0, 1, 2, 3]
+    assert not buffer._flush_tasks
+
+
+async def test_cancelled_batch_returns_to_the_buffer():
+    db = SlowDatabase(delay=10)
+    buffer = WriteBehindBuffer(enabled=True, flush_interval_seconds=10)
+    buffer.db = db
+    request = asyncio.create_task(buffer.insert("leads", {"n": 1}))
+    await asyncio.sleep(0)
+    flush = asyncio.create_task(buffer.flush())
+    await db["leads"].started.wait()
+    flush.cancel()
+    await asyncio.gather(flush, return_exceptions=True)
+
+    assert [write.document for write in buffer.buffers["leads"].pending] == [{"n": 1}]
+    db["leads"].delay = 0
+    await buffer.flush()
+    await asyncio.wait_for(request, timeout=1)
+    assert db["leads"].documents == [{"n": 1}]